@@ -0,0 +1,129 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional
+
+
+class Overloaded(Exception):
+    """입장 제어로 거절된 요청
+
+    - queue_full: 대기열이 가득 참 → 429
+    - deadline: 요청 마감(또는 최대 대기 시간) 안에 차례가 오지 않음 → 503
+    """
+
+    def __init__(self, name: str, reason: str, retry_after: int):
+        super().__init__(f"{name} 처리 요청이 많습니다. {retry_after}초 후에 다시 시도해 주세요. ({reason})")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = 429 if reason == "queue_full" else 503
+
+
+class AdmissionController:
+    """동시 실행 수와 대기열 길이를 제한하는 비동기 입장 제어기
+
+    - 실행 중인 작업이 max_concurrency개 미만이면 바로 실행
+    - 아니면 최대 max_queue개까지 도착 순서대로 대기하고, 넘치면 바로 Overloaded(queue_full)
+    - 대기는 요청 마감(timeout)과 max_wait 중 짧은 시간까지만 하고, 넘기면 Overloaded(deadline)
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait: Optional[float] = None):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self.active = 0
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "deadline": 0}
+        self.wait_seconds = 0.0
+        # 슬롯 점유 시간의 지수 이동 평균 (Retry-After 추정용)
+        self.service_seconds = 5.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def retry_after(self) -> int:
+        """지금 대기열 끝에 선다면 차례가 오기까지 걸릴 시간 추정치(초, 1~60)"""
+        estimate = self.service_seconds * (len(self._waiters) + 1) / self.max_concurrency
+        return int(min(60, max(1, math.ceil(estimate))))
+
+    def _reject(self, reason: str):
+        self.rejected[reason] += 1
+        raise Overloaded(self.name, reason, self.retry_after())
+
+    def check(self):
+        """지금 대기열이 가득 찼으면 바로 거절합니다. (스트리밍 응답을 시작하기 전에 호출)"""
+        if self.active >= self.max_concurrency and len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """실행 슬롯을 얻을 때까지 최대 timeout초 기다립니다."""
+        started = time.monotonic()
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        if self.max_wait is not None:
+            timeout = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        if timeout is not None and timeout <= 0:
+            self._reject("deadline")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # release()가 슬롯을 넘겨주면 waiter가 완료됨 (active는 그대로 유지)
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            # 마감과 같은 시점에 release()가 슬롯을 넘겨줬으면(Python 3.12+) 그대로 입장
+            if not (waiter.done() and not waiter.cancelled()):
+                self._discard(waiter)
+                self._reject("deadline")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 슬롯을 넘겨받은 직후 취소됨: 다음 대기자에게 넘김
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        self.admitted += 1
+        self.wait_seconds += time.monotonic() - started
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self):
+        """슬롯을 반환합니다. 대기자가 있으면 가장 먼저 온 대기자에게 바로 넘깁니다."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None):
+        await self.acquire(timeout)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.service_seconds = 0.8 * self.service_seconds + 0.2 * (time.monotonic() - started)
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "total_wait_seconds": round(self.wait_seconds, 3),
+            "avg_service_seconds": round(self.service_seconds, 3),
+        }
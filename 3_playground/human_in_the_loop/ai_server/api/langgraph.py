@@ -1,14 +1,28 @@
+import os
+import time
 import uuid
 import json
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional
 from langgraph.types import Command
 from semiconductor.graph import graph
+from api.admission import AdmissionController, Overloaded
 
 router = APIRouter()
 
+# 그래프 실행(LLM 호출 여러 번) 입장 제어 설정
+# - GRAPH_MAX_CONCURRENCY: 동시에 실행할 run 수, GRAPH_MAX_QUEUE: 대기열 길이 (넘치면 429)
+# - GRAPH_MAX_WAIT: 대기열에서 기다리는 최대 시간(초, 넘기면 error 이벤트 + retry_after)
+# - REQUEST_DEADLINE: 요청 하나의 기본 마감(초, X-Request-Deadline 헤더로 더 짧게 지정 가능)
+GRAPH_MAX_CONCURRENCY = int(os.getenv("GRAPH_MAX_CONCURRENCY", "8"))
+GRAPH_MAX_QUEUE = int(os.getenv("GRAPH_MAX_QUEUE", "32"))
+GRAPH_MAX_WAIT = float(os.getenv("GRAPH_MAX_WAIT", "15"))
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30"))
+
+run_admission = AdmissionController("graph", GRAPH_MAX_CONCURRENCY, GRAPH_MAX_QUEUE, max_wait=GRAPH_MAX_WAIT)
+
 # ─── Request / Response Models ─────────────────────────────
 
 class RunStreamRequest(BaseModel):
@@ -46,6 +60,15 @@ def extract_interrupt_value(interrupt_obj):
     return str(interrupt_obj)
 
 
+def request_deadline(request: Request) -> float:
+    """요청 마감(초): X-Request-Deadline 헤더 값과 REQUEST_DEADLINE 중 작은 값"""
+    header = request.headers.get("x-request-deadline")
+    try:
+        return min(REQUEST_DEADLINE, float(header)) if header else REQUEST_DEADLINE
+    except ValueError:
+        return REQUEST_DEADLINE
+
+
 # ─── Endpoints ─────────────────────────────────────────────
 
 @router.post("/threads")
@@ -71,11 +94,22 @@ async def get_thread_state(thread_id: str):
 
 
 @router.post("/threads/{thread_id}/runs/stream")
-async def stream_run(thread_id: str, body: RunStreamRequest):
+async def stream_run(thread_id: str, body: RunStreamRequest, request: Request):
     config = {"configurable": {"thread_id": thread_id}}
     if body.config:
         config["configurable"].update(body.config.get("configurable", {}))
 
+    # 대기열이 이미 가득 찼으면 스트림을 열기 전에 429 + Retry-After로 거절
+    try:
+        run_admission.check()
+    except Overloaded as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"detail": str(e), "reason": e.reason, "retry_after": e.retry_after},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    deadline = time.monotonic() + request_deadline(request)
+
     async def event_generator():
         try:
             # resume vs initial run
@@ -87,23 +121,27 @@ async def stream_run(thread_id: str, body: RunStreamRequest):
                 yield f"event: error\ndata: {safe_dumps({'error': 'No input or command provided'})}\n\n"
                 return
 
-            async for chunk in graph.astream(
-                stream_input,
-                config=config,
-                stream_mode="updates",
-            ):
-                # chunk: {"node_name": {...}} or {"__interrupt__": [Interrupt(...)]}
-                if "__interrupt__" in chunk:
-                    # __interrupt__는 Interrupt 객체 리스트 → value만 추출
-                    interrupts = chunk["__interrupt__"]
-                    interrupt_data = [extract_interrupt_value(i) for i in interrupts]
-                    yield f"event: updates\ndata: {safe_dumps({'__interrupt__': interrupt_data})}\n\n"
-                else:
-                    # 일반 노드 업데이트
-                    yield f"event: updates\ndata: {safe_dumps(chunk)}\n\n"
+            async with run_admission.slot(timeout=deadline - time.monotonic()):
+                async for chunk in graph.astream(
+                    stream_input,
+                    config=config,
+                    stream_mode="updates",
+                ):
+                    # chunk: {"node_name": {...}} or {"__interrupt__": [Interrupt(...)]}
+                    if "__interrupt__" in chunk:
+                        # __interrupt__는 Interrupt 객체 리스트 → value만 추출
+                        interrupts = chunk["__interrupt__"]
+                        interrupt_data = [extract_interrupt_value(i) for i in interrupts]
+                        yield f"event: updates\ndata: {safe_dumps({'__interrupt__': interrupt_data})}\n\n"
+                    else:
+                        # 일반 노드 업데이트
+                        yield f"event: updates\ndata: {safe_dumps(chunk)}\n\n"
 
             yield "event: end\ndata: {}\n\n"
 
+        except Overloaded as e:
+            # 마감 안에 차례가 오지 않음: 클라이언트가 retry_after초 뒤 다시 시도
+            yield f"event: error\ndata: {safe_dumps({'error': str(e), 'reason': e.reason, 'retry_after': e.retry_after})}\n\n"
         except Exception as e:
             import traceback
             traceback.print_exc()
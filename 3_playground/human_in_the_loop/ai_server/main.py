@@ -7,7 +7,7 @@ load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.langgraph import router as langgraph_router
+from api.langgraph import router as langgraph_router, run_admission
 
 app = FastAPI(title="LangGraph Agent Server")
 
@@ -23,7 +23,7 @@ app.add_middleware(
 # Health check endpoint
 @app.get("/ok")
 def health_check():
-    return {"status": "ok"}
+    return {"status": "ok", "admission": run_admission.stats()}
 
 # Include LangGraph router
 app.include_router(langgraph_router)
@@ -0,0 +1,166 @@
+"""벤치마크용 가짜 임베딩/채팅 모델
+
+OpenAI를 호출하지 않고 결정적인(deterministic) 결과를 돌려주며, 지연 시간을 설정할 수 있습니다.
+각 호출의 소요 시간은 StageRecorder에 단계별로 기록됩니다.
+"""
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import hashlib
+import re
+import time
+
+import numpy as np
+
+_TOKEN = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+class StageRecorder:
+    """단계별 소요 시간(초)을 모아 두는 기록기"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.enabled = True
+
+    def record(self, stage: str, seconds: float):
+        if self.enabled:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def reset(self):
+        self.samples = {}
+
+
+class FakeEmbeddings(Embeddings):
+    """단어 해시 기반의 결정적인 가짜 임베딩
+
+    단어마다 해시로 고정된 난수 벡터를 만들어 더하므로, 같은 단어를 공유하는 텍스트끼리 유사도가 높아
+    검색 결과가 실제와 비슷하게 분포합니다.
+
+    Args:
+        dim: 벡터 차원 (text-embedding-3-small과 같은 1536 기본)
+        latency: 호출당 지연 시간(초)
+        per_text_latency: 텍스트당 추가 지연 시간(초)
+    """
+
+    def __init__(
+        self,
+        dim: int = 1536,
+        latency: float = 0.0,
+        per_text_latency: float = 0.0,
+        recorder: Optional[StageRecorder] = None,
+    ):
+        self.dim = dim
+        self.latency = latency
+        self.per_text_latency = per_text_latency
+        self.recorder = recorder
+        self.calls = 0
+        self._token_vectors: Dict[str, np.ndarray] = {}
+
+    def _token_vector(self, token: str) -> np.ndarray:
+        vector = self._token_vectors.get(token)
+        if vector is None:
+            seed = int.from_bytes(hashlib.md5(token.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            self._token_vectors[token] = vector
+        return vector
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN.findall(text.lower()) or [text]:
+            vector += self._token_vector(token)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def _delay(self, count: int) -> float:
+        return self.latency + self.per_text_latency * count
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        self.calls += 1
+        time.sleep(self._delay(len(texts)))
+        vectors = [self._embed(text) for text in texts]
+        if self.recorder:
+            self.recorder.record("embed", time.perf_counter() - start)
+        return vectors
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        self.calls += 1
+        await asyncio.sleep(self._delay(len(texts)))
+        vectors = [self._embed(text) for text in texts]
+        if self.recorder:
+            self.recorder.record("embed", time.perf_counter() - start)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeChatModel(BaseChatModel):
+    """설정한 지연 후 고정된 형식의 답변을 돌려주는 가짜 채팅 모델
+
+    first_token_latency 후 첫 토큰을, 이후 token_latency 간격으로 output_tokens개의 토큰을 생성합니다.
+    """
+
+    first_token_latency: float = 0.0
+    token_latency: float = 0.0
+    output_tokens: int = 50
+    recorder: Optional[Any] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-bench-chat"
+
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        query = str(messages[-1].content) if messages else ""
+        digest = hashlib.md5(query.encode("utf-8")).hexdigest()
+        return [f"답변{digest[i % len(digest)]} " for i in range(self.output_tokens)]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        start = time.perf_counter()
+        time.sleep(self.first_token_latency + self.token_latency * max(0, self.output_tokens - 1))
+        message = AIMessage(content="".join(self._tokens(messages)))
+        if self.recorder:
+            self.recorder.record("llm", time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        start = time.perf_counter()
+        await asyncio.sleep(self.first_token_latency + self.token_latency * max(0, self.output_tokens - 1))
+        message = AIMessage(content="".join(self._tokens(messages)))
+        if self.recorder:
+            self.recorder.record("llm", time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        start = time.perf_counter()
+        for i, token in enumerate(self._tokens(messages)):
+            await asyncio.sleep(self.first_token_latency if i == 0 else self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        if self.recorder:
+            self.recorder.record("llm", time.perf_counter() - start)
@@ -0,0 +1,154 @@
+"""축소/양자화 벡터 저장 방식별 recall 대 크기 리포트
+
+VectorStorageConfig(src/quantization.py)의 (차원, 양자화, oversample) 조합마다
+1차 검색(축소/양자화 벡터) → 원본 벡터 재정렬 결과가 원본 벡터 정확 검색 top-k와 얼마나 겹치는지(recall@k)와
+행당 벡터 크기(인덱스/테이블)를 계산합니다. 1차 검색은 정확 검색으로 계산하므로 ANN 인덱스 자체의 오차는 포함하지 않습니다.
+
+실제 임베딩으로 측정하려면 ingest.py --local-snapshot으로 만든 스냅샷을 사용합니다.
+(저장된 벡터 일부를 질의로 쓰고 자기 자신은 정답/후보에서 제외) 스냅샷이 없으면 합성 코퍼스와 가짜 임베딩을 사용합니다.
+
+    python bench/quantization_report.py --snapshot src/local_index
+    python bench/quantization_report.py --dims 1536,768,512,256 --oversample 1,4,8 --output quant_report.json
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from quantization import QUANTIZATIONS, VectorStorageConfig
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def load_snapshot(path: str, num_queries: int, seed: int):
+    """스냅샷 벡터와, 그중 질의로 쓸 행 번호를 반환합니다."""
+    from local_store import VECTORS_FILE
+
+    docs = normalize(np.load(os.path.join(path, VECTORS_FILE)).astype(np.float32))
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(docs), size=min(num_queries, len(docs)), replace=False)
+    return docs, docs[rows], rows
+
+
+def build_synthetic(num_docs: int, num_queries: int, seed: int):
+    """합성 NCS 코퍼스/질의를 가짜 임베딩으로 벡터화합니다."""
+    from fakes import FakeEmbeddings
+    from run_bench import build_corpus, build_queries
+
+    embeddings = FakeEmbeddings()
+    corpus = build_corpus(num_docs, seed)
+    queries = build_queries(num_queries, seed, repeat_ratio=0.0)
+    docs = normalize(np.asarray(embeddings.embed_documents([body for body, _ in corpus]), dtype=np.float32))
+    query_vectors = normalize(np.asarray(embeddings.embed_documents([q["query"] for q in queries]), dtype=np.float32))
+    return docs, query_vectors, None
+
+
+def first_pass_scores(docs: np.ndarray, queries: np.ndarray, config: VectorStorageConfig) -> np.ndarray:
+    """1차 검색 점수(클수록 가까움). pgvector의 halfvec 코사인 / binary_quantize 해밍 거리와 같은 순서를 냅니다."""
+    d = config.search_dimensions
+    doc_part = normalize(docs[:, :d])
+    query_part = normalize(queries[:, :d])
+    if config.quantization == "halfvec":
+        doc_part = doc_part.astype(np.float16).astype(np.float32)
+        query_part = query_part.astype(np.float16).astype(np.float32)
+    elif config.quantization == "binary":
+        # 부호 비트 일치 수 - 불일치 수 = d - 2 * 해밍 거리
+        doc_part = np.where(doc_part > 0, 1.0, -1.0).astype(np.float32)
+        query_part = np.where(query_part > 0, 1.0, -1.0).astype(np.float32)
+    return query_part @ doc_part.T
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def evaluate(docs, queries, self_rows, config: VectorStorageConfig, k: int, exact_top: np.ndarray, full_scores) -> float:
+    """재정렬 후 recall@k (원본 벡터 정확 검색 top-k 대비)"""
+    scores = first_pass_scores(docs, queries, config)
+    if self_rows is not None:
+        scores[np.arange(len(queries)), self_rows] = -np.inf
+    candidates = top_k(scores, k * config.oversample)
+    rerank = np.take_along_axis(full_scores, candidates, axis=1)
+    order = rerank.argsort(axis=1)[:, ::-1][:, :k]
+    result = np.take_along_axis(candidates, order, axis=1)
+
+    hits = sum(len(set(a) & set(b)) for a, b in zip(result.tolist(), exact_top.tolist()))
+    return hits / exact_top.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="축소/양자화 벡터 저장 방식별 recall 대 크기 비교")
+    parser.add_argument("--snapshot", help="ingest.py --local-snapshot으로 만든 스냅샷 경로 (없으면 합성 데이터)")
+    parser.add_argument("--docs", type=int, default=5000, help="합성 문서 수")
+    parser.add_argument("--queries", type=int, default=200, help="질의 수")
+    parser.add_argument("--k", type=int, default=4, help="검색 결과 수 (서버 기본값 4)")
+    parser.add_argument("--dims", default="1536,1024,768,512,256", help="1차 검색 차원 목록")
+    parser.add_argument("--quantization", default=",".join(QUANTIZATIONS), help="양자화 방식 목록")
+    parser.add_argument("--oversample", default="1,2,4,8", help="후보 배수 목록")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        docs, queries, self_rows = load_snapshot(args.snapshot, args.queries, args.seed)
+    else:
+        docs, queries, self_rows = build_synthetic(args.docs, args.queries, args.seed)
+    full_dimensions = docs.shape[1]
+
+    full_scores = queries @ docs.T
+    if self_rows is not None:
+        full_scores[np.arange(len(queries)), self_rows] = -np.inf
+    exact_top = top_k(full_scores, args.k)
+    full_bytes = VectorStorageConfig(full_dimensions=full_dimensions).bytes_per_row()["index"]
+
+    results = []
+    for dims in (int(x) for x in args.dims.split(",")):
+        if dims > full_dimensions:
+            continue
+        for quantization in args.quantization.split(","):
+            for oversample in (int(x) for x in args.oversample.split(",")):
+                config = VectorStorageConfig(dims, quantization, full_dimensions=full_dimensions, oversample=oversample)
+                size = config.bytes_per_row()
+                results.append({
+                    **config.to_dict(),
+                    "recall_at_k": round(evaluate(docs, queries, self_rows, config, args.k, exact_top, full_scores), 4),
+                    "index_bytes_per_row": size["index"],
+                    "table_bytes_per_row": size["table"],
+                    "index_reduction": round(full_bytes / size["index"], 1),
+                    "index_mb": round(size["index"] * len(docs) / 1024 / 1024, 2),
+                })
+
+    print(f"{'dims':>5} {'quant':>8} {'over':>4} {'recall@' + str(args.k):>9} {'idx B/row':>10} {'x smaller':>9} {'table B/row':>11}")
+    for r in results:
+        print(
+            f"{r['dimensions']:>5} {r['quantization']:>8} {r['oversample']:>4} {r['recall_at_k']:>9.4f} "
+            f"{r['index_bytes_per_row']:>10} {r['index_reduction']:>9.1f} {r['table_bytes_per_row']:>11}"
+        )
+
+    report = {
+        "source": args.snapshot or "synthetic",
+        "docs": len(docs),
+        "queries": len(queries),
+        "k": args.k,
+        "full_dimensions": full_dimensions,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
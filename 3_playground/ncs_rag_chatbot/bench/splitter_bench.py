@@ -0,0 +1,144 @@
+"""분할기 비교/벤치마크: RecursiveCharacterTextSplitter vs FastRecursiveSplitter
+
+두 분할기의 청크가 같은지(본문, start_index) 확인하고 처리 시간을 비교합니다.
+--pdf-dir을 주면 해당 폴더의 PDF 페이지를, 없으면 합성 NCS 텍스트를 사용합니다.
+
+    python bench/splitter_bench.py
+    python bench/splitter_bench.py --pdf-dir "../assets/실습 NCS파일" --chunk-size 1000 --chunk-overlap 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from splitter import FastRecursiveSplitter, token_length_function
+
+WORDS = [
+    "능력단위", "수행준거", "학습모듈", "평가", "요구사항", "분석", "설계", "구현", "테스트", "품질",
+    "관리", "아키텍처", "인터페이스", "데이터", "프로세스", "SW", "NCS", "2001020101_16v4", "작업", "지식",
+]
+
+
+def synthetic_pages(count: int, seed: int) -> list:
+    """PDF 추출 텍스트와 비슷한 합성 페이지 (문단/줄바꿈/긴 공백 없는 줄/반복 문단 포함)"""
+    rng = random.Random(seed)
+    pages = []
+    for page in range(count):
+        paragraphs = []
+        for _ in range(rng.randint(2, 12)):
+            lines = []
+            for _ in range(rng.randint(1, 15)):
+                kind = rng.random()
+                if kind < 0.05:
+                    # 공백 없이 긴 줄 (표, URL 등)
+                    lines.append("".join(rng.choice(WORDS) for _ in range(rng.randint(50, 400))))
+                else:
+                    lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40))))
+            paragraphs.append("\n".join(lines))
+        if paragraphs and rng.random() < 0.2:
+            # 머리글/바닥글처럼 반복되는 문단
+            paragraphs.append(paragraphs[0])
+        sep = rng.choice(["\n\n", "\n\n\n", "\n \n"])
+        pages.append(Document(page_content=sep.join(paragraphs), metadata={"source": "synthetic.pdf", "page": page}))
+    return pages
+
+
+def pdf_pages(pdf_dir: str) -> list:
+    from loader import DocumentLoader
+
+    pages = []
+    for root, _, files in os.walk(pdf_dir):
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                pages.extend(DocumentLoader(os.path.join(root, name)).load())
+    return pages
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분할기 결과 비교 및 속도 측정")
+    parser.add_argument("--pdf-dir", help="PDF 폴더 (없으면 합성 텍스트 사용)")
+    parser.add_argument("--pages", type=int, default=2000, help="합성 페이지 수")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--tokens", action="store_true", help="길이를 tiktoken 토큰 수로 측정")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 측정 횟수 (최소값 사용)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    pages = pdf_pages(args.pdf_dir) if args.pdf_dir else synthetic_pages(args.pages, args.seed)
+    length_function = token_length_function() if args.tokens else len
+
+    reference = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        length_function=length_function,
+        add_start_index=True,
+    )
+    fast = FastRecursiveSplitter(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        length_function=length_function,
+    )
+
+    ref_time, ref_docs = timed(lambda: reference.split_documents(pages), args.repeat)
+    fast_time, fast_docs = timed(lambda: fast.split_documents(pages), args.repeat)
+
+    # 본문 비교 + start_index 비교
+    # (RecursiveCharacterTextSplitter는 text.find()로 start_index를 추정하므로, 같은 청크가 반복되는 페이지에서는
+    #  앞쪽 위치를, 길이 함수가 토큰 수면 -1을 가리킬 수 있음. FastRecursiveSplitter는 실제 오프셋이므로 원문과 일치하는지도 함께 확인)
+    content_mismatch = sum(1 for a, b in zip(ref_docs, fast_docs) if a.page_content != b.page_content)
+    content_mismatch += abs(len(ref_docs) - len(fast_docs))
+    index_diff = sum(
+        1 for a, b in zip(ref_docs, fast_docs)
+        if a.page_content == b.page_content and a.metadata["start_index"] != b.metadata["start_index"]
+    )
+    offsets_valid = all(
+        page.page_content[doc.metadata["start_index"]:].startswith(doc.page_content)
+        for page, doc in _pair_with_pages(pages, fast)
+    )
+
+    chars = sum(len(p.page_content) for p in pages)
+    print(json.dumps({
+        "pages": len(pages),
+        "chars": chars,
+        "chunks": {"reference": len(ref_docs), "fast": len(fast_docs)},
+        "content_mismatch": content_mismatch,
+        "start_index_diff": index_diff,
+        "fast_offsets_valid": offsets_valid,
+        "seconds": {"reference": round(ref_time, 4), "fast": round(fast_time, 4)},
+        "speedup": round(ref_time / fast_time, 2) if fast_time else None,
+        "mchars_per_s": {
+            "reference": round(chars / ref_time / 1e6, 2),
+            "fast": round(chars / fast_time / 1e6, 2),
+        },
+    }, ensure_ascii=False, indent=2))
+    if content_mismatch or not offsets_valid:
+        sys.exit(1)
+
+
+def _pair_with_pages(pages, splitter):
+    for page in pages:
+        for doc in splitter.lazy_split_documents([page]):
+            yield page, doc
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+from langchain_core.embeddings import Embeddings
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Deque, List, Optional
+import asyncio
+import math
+import time
+
+# 요청 단위 마감 시각 (time.monotonic() 기준, None이면 제한 없음)
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def set_deadline(seconds: Optional[float]):
+    """현재 요청의 마감 시각을 지금부터 seconds초 뒤로 설정합니다. (None이면 제한 없음)"""
+    return _deadline.set(None if seconds is None else time.monotonic() + seconds)
+
+
+def remaining() -> Optional[float]:
+    """현재 요청의 마감까지 남은 시간(초). 마감이 없으면 None."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class Overloaded(Exception):
+    """입장 제어로 거절된 요청
+
+    - queue_full: 대기열이 가득 참 → 429
+    - deadline: 요청 마감(또는 최대 대기 시간) 안에 차례가 오지 않음 → 503
+    """
+
+    def __init__(self, name: str, reason: str, retry_after: int):
+        super().__init__(f"{name} 처리 요청이 많습니다. {retry_after}초 후에 다시 시도해 주세요. ({reason})")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = 429 if reason == "queue_full" else 503
+
+
+class AdmissionObserver:
+    """AdmissionController의 상태 변화를 받는 훅 (기본은 아무것도 하지 않음, metrics.AdmissionMetrics 참고)"""
+
+    def update(self, name: str, active: int, queued: int):
+        pass
+
+    def admitted(self, name: str, waited: float):
+        pass
+
+    def rejected(self, name: str, reason: str):
+        pass
+
+
+class AdmissionController:
+    """동시 실행 수와 대기열 길이를 제한하는 비동기 입장 제어기 (LLM/임베딩 호출 공용)
+
+    - 실행 중인 호출이 max_concurrency개 미만이면 바로 실행
+    - 아니면 최대 max_queue개까지 도착 순서대로 대기하고, 넘치면 바로 Overloaded(queue_full)
+    - 대기는 요청 마감(set_deadline 또는 acquire의 timeout)과 max_wait 중 먼저 오는 시각까지만 하고,
+      넘기면 Overloaded(deadline)
+    실행 수를 제한해 과부하에서도 입장한 요청의 지연 시간이 예측 가능하게 유지되고,
+    처리할 수 없는 요청은 공급자 rate limit 오류 대신 Retry-After와 함께 빨리 거절됩니다.
+
+    observer를 넘기면 실행/대기 수, 대기 시간, 거절을 알려 줍니다. (없으면 stats()로만 확인)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait: Optional[float] = None,
+        service_seconds: float = 1.0,
+        observer: Optional[AdmissionObserver] = None,
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self.active = 0
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "deadline": 0}
+        self.wait_seconds = 0.0
+        # 슬롯 점유 시간의 지수 이동 평균 (Retry-After 추정용, service_seconds는 초기 추정치)
+        self.service_seconds = service_seconds
+        self.observer = observer or AdmissionObserver()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._update()
+
+    def _update(self):
+        self.observer.update(self.name, self.active, len(self._waiters))
+
+    def retry_after(self) -> int:
+        """지금 대기열 끝에 선다면 차례가 오기까지 걸릴 시간 추정치(초, 1~60)"""
+        estimate = self.service_seconds * (len(self._waiters) + 1) / self.max_concurrency
+        return int(min(60, max(1, math.ceil(estimate))))
+
+    def _reject(self, reason: str):
+        self.rejected[reason] += 1
+        self.observer.rejected(self.name, reason)
+        raise Overloaded(self.name, reason, self.retry_after())
+
+    def check(self):
+        """지금 대기열이 가득 찼으면 바로 거절합니다. (스트리밍 응답을 시작하기 전에 호출)"""
+        if self.active >= self.max_concurrency and len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """실행 슬롯을 얻을 때까지 기다립니다. 대기열이 가득 찼거나 마감을 넘기면 Overloaded를 발생시킵니다.
+
+        timeout을 주면 요청 마감(set_deadline)과 max_wait 중 가장 짧은 시간까지만 기다립니다.
+        """
+        started = time.monotonic()
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self._admitted(0.0)
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        limits = [t for t in (timeout, remaining(), self.max_wait) if t is not None]
+        timeout = min(limits) if limits else None
+        if timeout is not None and timeout <= 0:
+            self._reject("deadline")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update()
+        try:
+            # release()가 슬롯을 넘겨주면 waiter가 완료됨 (active는 그대로 유지)
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            # 마감과 같은 시점에 release()가 슬롯을 넘겨줬으면(Python 3.12+) 그대로 입장
+            if not (waiter.done() and not waiter.cancelled()):
+                self._discard(waiter)
+                self._reject("deadline")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 슬롯을 넘겨받은 직후 취소됨: 다음 대기자에게 넘김
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        self._admitted(time.monotonic() - started)
+
+    def _admitted(self, waited: float):
+        self.admitted += 1
+        self.wait_seconds += waited
+        self.observer.admitted(self.name, waited)
+        self._update()
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._update()
+
+    def release(self):
+        """슬롯을 반환합니다. 대기자가 있으면 가장 먼저 온 대기자에게 바로 넘깁니다."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update()
+                return
+        self.active -= 1
+        self._update()
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None):
+        """async with controller.slot(): 안에서 LLM/임베딩을 호출합니다."""
+        await self.acquire(timeout)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.service_seconds = 0.8 * self.service_seconds + 0.2 * (time.monotonic() - started)
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "total_wait_seconds": round(self.wait_seconds, 3),
+            "avg_service_seconds": round(self.service_seconds, 3),
+        }
+
+
+class AdmittedEmbeddings(Embeddings):
+    """임베딩 모델의 비동기 호출을 AdmissionController 슬롯 안에서 실행하는 래퍼
+
+    질의 임베딩 캐시(QueryEmbeddingCache) 아래에 두면 캐시 적중은 슬롯을 쓰지 않습니다.
+    """
+
+    def __init__(self, underlying: Embeddings, controller: AdmissionController):
+        self.underlying = underlying
+        self.controller = controller
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        async with self.controller.slot():
+            return await self.underlying.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        async with self.controller.slot():
+            return await self.underlying.aembed_query(text)
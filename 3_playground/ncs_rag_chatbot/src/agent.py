@@ -1,8 +1,11 @@
 from langchain.agents import create_agent
 from langchain.chat_models import init_chat_model
+from langchain_core.messages import AIMessage, ToolMessage
+from metrics import AGENT_ROUNDS, record_stage, record_usage
 from typing import List
 import sys
 import io
+import time
 
 # Windows 콘솔 인코딩 문제 해결
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -30,25 +33,69 @@ class ChatAgent:
         else:
             self.system_prompt = system_prompt
 
-    def create_agent(self, tools: List):
-        """모델과 도구를 결합하여 에이전트를 생성합니다."""
-        self.agent = create_agent(self.model, tools, system_prompt=self.system_prompt)
-    
+    def create_agent(self, tools: List, prefetcher=None):
+        """모델과 도구를 결합하여 에이전트를 생성합니다.
+
+        Args:
+            tools: 에이전트 도구 목록
+            prefetcher: 추측 검색에 쓸 ToolBuilder (speculative=True로 생성한 것, 없으면 추측 검색 안 함)
+        """
+        system_prompt = self.system_prompt
+        if any(getattr(t, "name", None) == "retrieve_context_multi" for t in tools):
+            # 여러 표현/분류로 검색해야 할 때 도구 호출 왕복을 줄이도록 안내
+            system_prompt += (
+                "\n\n여러 표현이나 여러 분류로 검색해야 하면 retrieve_context를 여러 번 호출하지 말고 "
+                "retrieve_context_multi로 한 번에 검색해줘."
+            )
+        self.agent = create_agent(self.model, tools, system_prompt=system_prompt)
+        self.prefetcher = prefetcher
+
     async def run(self, query: str):
-        """사용자 질의를 처리하고 답변을 생성합니다. (Async)"""
+        """사용자 질의를 처리하고 답변을 생성합니다. (Async)
+
+        prefetcher가 있으면 첫 모델 호출과 동시에 원래 질의로 필터 없는 검색을 시작하고,
+        모델이 같은 질의로 도구를 호출하면 그 결과를 재사용합니다.
+        """
         if not hasattr(self, 'agent'):
             raise ValueError("Agent has not been created. Call create_agent() first.")
 
+        prefetcher = getattr(self, "prefetcher", None)
+        if prefetcher is not None:
+            prefetcher.prefetch(query)
+        try:
+            return await self._run(query)
+        finally:
+            if prefetcher is not None:
+                prefetcher.discard(query)
+
+    async def _run(self, query: str):
+        """에이전트를 스트리밍으로 실행하고 마지막 메시지를 반환합니다."""
         print(f"User Query: {query}")
         print("--- Agent Response ---")
         
         last_message = None
+        tool_rounds = 0
+        started = last_event = time.perf_counter()
         # astream을 사용하여 비동기 스트리밍 처리
         async for event in self.agent.astream(
             {"messages": [{"role": "user", "content": query}]},
             stream_mode="values",
         ):
-            event["messages"][-1].pretty_print()
-            last_message = event["messages"][-1]
-        
+            # 이벤트 사이 간격 = 직전에 실행된 노드(모델 호출 또는 도구 실행)의 소요 시간
+            now = time.perf_counter()
+            message = event["messages"][-1]
+            if isinstance(message, AIMessage):
+                record_stage("agent_llm", now - last_event)
+                record_usage(message, source="agent")
+                if message.tool_calls:
+                    tool_rounds += 1
+            elif isinstance(message, ToolMessage):
+                record_stage("agent_tool", now - last_event)
+            last_event = now
+
+            message.pretty_print()
+            last_message = message
+
+        record_stage("agent_total", time.perf_counter() - started)
+        AGENT_ROUNDS.observe(tool_rounds)
         return last_message
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import json
+import time
+
+import numpy as np
+
+
+def filter_key(filt: Optional[dict]) -> str:
+    """필터 딕셔너리를 캐시 버킷 키(정렬된 JSON)로 변환합니다."""
+    return json.dumps(filt or {}, sort_keys=True, ensure_ascii=False)
+
+
+def _normalize(vector: List[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+class SemanticAnswerCache:
+    """질의 벡터와 필터로 이전 답변을 찾아주는 시맨틱 답변 캐시
+
+    같은 필터 안에서 코사인 유사도가 threshold 이상인 이전 질의가 있으면
+    저장된 답변과 출처를 그대로 반환합니다. 항목은 ttl초가 지나면 만료되고,
+    max_size를 넘으면 가장 오래 사용되지 않은 항목부터 삭제됩니다.
+    적재로 테이블이 바뀌면(generation 변경) 전체를 비웁니다.
+    필터 버킷별로 정규화된 벡터를 하나의 행렬로 모아 두고 행렬-벡터 곱 한 번으로 유사도를 계산합니다.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl: float = 600.0,
+        max_size: int = 500,
+        check_interval: float = 5.0,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.generation: Optional[int] = None
+        self._last_check = 0.0
+        # (필터 키, 항목 ID) -> (만료 시각, 정규화된 벡터, 응답)
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, np.ndarray, dict]]" = OrderedDict()
+        # 필터 키 -> 항목 키 목록 (행렬의 행 순서)
+        self._buckets: Dict[str, List[Tuple[str, int]]] = {}
+        # 필터 키 -> 정규화된 벡터 행렬 (항목이 바뀌면 지우고 다음 조회 때 다시 만듦)
+        self._matrices: Dict[str, np.ndarray] = {}
+        self._next_id = 0
+
+    def clear(self):
+        """모든 항목을 삭제합니다."""
+        self._entries.clear()
+        self._buckets.clear()
+        self._matrices.clear()
+
+    async def sync_generation(self, fetch_generation: Callable[[], Awaitable[int]]):
+        """테이블 generation을 check_interval 간격으로 확인하고, 바뀌었으면 캐시를 비웁니다."""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        generation = await fetch_generation()
+        if self.generation is not None and generation != self.generation:
+            self.clear()
+        self.generation = generation
+
+    def _remove(self, entry_key: Tuple[str, int]):
+        self._entries.pop(entry_key, None)
+        fkey = entry_key[0]
+        bucket = self._buckets.get(fkey)
+        if bucket is not None and entry_key in bucket:
+            bucket.remove(entry_key)
+            self._matrices.pop(fkey, None)
+            if not bucket:
+                del self._buckets[fkey]
+
+    def _matrix(self, fkey: str) -> np.ndarray:
+        matrix = self._matrices.get(fkey)
+        if matrix is None:
+            matrix = np.stack([self._entries[entry_key][1] for entry_key in self._buckets[fkey]])
+            self._matrices[fkey] = matrix
+        return matrix
+
+    def lookup(self, vector: List[float], filt: Optional[dict]) -> Optional[dict]:
+        """유사한 이전 질의의 응답을 찾습니다. 없으면 None을 반환합니다."""
+        fkey = filter_key(filt)
+        query = _normalize(vector)
+        now = time.monotonic()
+
+        for entry_key in list(self._buckets.get(fkey, ())):
+            if self._entries[entry_key][0] < now:
+                self._remove(entry_key)
+
+        best_key = None
+        if fkey in self._buckets:
+            scores = self._matrix(fkey) @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                best_key = self._buckets[fkey][best]
+
+        if best_key is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][2]
+
+    def store(self, vector: List[float], filt: Optional[dict], response: dict):
+        """질의 벡터와 필터에 대한 응답을 저장합니다."""
+        fkey = filter_key(filt)
+        entry_key = (fkey, self._next_id)
+        self._next_id += 1
+
+        self._entries[entry_key] = (time.monotonic() + self.ttl, _normalize(vector), response)
+        self._buckets.setdefault(fkey, []).append(entry_key)
+        self._matrices.pop(fkey, None)
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def stats(self) -> dict:
+        """캐시 적중/미스 카운터를 반환합니다."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
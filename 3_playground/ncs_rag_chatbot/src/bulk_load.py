@@ -0,0 +1,154 @@
+from pgvector.asyncpg import register_vector
+from sqlalchemy.ext.asyncio import AsyncEngine
+from quantization import FULL_EMBEDDING_COLUMN, VectorStorageConfig, truncate_embedding
+from vector_store import CONTENT_COLUMN, EMBEDDING_COLUMN, ID_COLUMN, METADATA_JSON_COLUMN
+from typing import List, Optional
+import asyncpg
+import json
+import time
+import uuid
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    # vector/halfvec 컬럼을 binary COPY로 보낼 수 있도록 pgvector 코덱 등록
+    # (SQLAlchemy 풀의 연결은 벡터를 문자열로 바인딩하므로 별도 풀에서만 등록)
+    await register_vector(conn)
+
+
+class CopyWriter:
+    """binary COPY로 벡터 테이블에 행을 쓰는 대량 적재기 (PGVectorStore.aadd_embeddings 대체)
+
+    행마다 INSERT를 보내는 대신 (id, 본문, 임베딩, 메타데이터 컬럼, JSON 메타데이터)를 batch_size행 단위의
+    binary COPY로 보냅니다.
+    - upsert=False: 테이블에 바로 COPY (새로 만든 테이블처럼 ID 충돌이 없을 때, 가장 빠름)
+    - upsert=True: 세션 임시 테이블에 COPY한 뒤 INSERT ... SELECT ... ON CONFLICT(기본 키)로 합침
+      (기본 키 컬럼을 그대로 쓰므로 (langchain_id, 파티션 키)가 기본 키인 파티션 테이블에도 동작)
+    축소 차원 저장(VectorStorageConfig)이면 임베딩을 잘라 저장하고 원본은 embedding_full 컬럼에 씁니다.
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        table_name: str,
+        metadata_columns: List[str],
+        primary_key: List[str],
+        storage: Optional[VectorStorageConfig] = None,
+        batch_size: int = 1000,
+        upsert: bool = True,
+    ):
+        self.pool = pool
+        self.table_name = table_name
+        self.metadata_columns = [col for col in metadata_columns if col != FULL_EMBEDDING_COLUMN]
+        self.primary_key = primary_key or [ID_COLUMN]
+        self.storage = storage
+        self.batch_size = max(1, batch_size)
+        self.upsert = upsert
+
+        self.columns = [ID_COLUMN, CONTENT_COLUMN, EMBEDDING_COLUMN] + self.metadata_columns
+        if storage is not None and storage.dimensions:
+            self.columns.append(FULL_EMBEDDING_COLUMN)
+        self.columns.append(METADATA_JSON_COLUMN)
+
+        self.rows = 0
+        self.copies = 0
+        self.busy = 0.0
+
+    @classmethod
+    async def create(
+        cls,
+        async_engine: AsyncEngine,
+        table_name: str,
+        metadata_columns: List[str],
+        storage: Optional[VectorStorageConfig] = None,
+        batch_size: int = 1000,
+        upsert: bool = True,
+        pool_size: int = 4,
+    ) -> "CopyWriter":
+        """SQLAlchemy 엔진과 같은 DB에 COPY 전용 asyncpg 풀을 만들고, 테이블의 기본 키를 조회합니다."""
+        dsn = async_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        pool = await asyncpg.create_pool(dsn, min_size=1, max_size=max(1, pool_size), init=_init_connection)
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT a.attname FROM pg_index i "
+                "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) "
+                "WHERE i.indrelid = $1::regclass AND i.indisprimary",
+                f'"{table_name}"',
+            )
+        return cls(
+            pool, table_name, metadata_columns, [row["attname"] for row in rows],
+            storage=storage, batch_size=batch_size, upsert=upsert,
+        )
+
+    async def aclose(self):
+        await self.pool.close()
+
+    def _record(self, doc_id: str, content: str, embedding: List[float], metadata: dict) -> tuple:
+        """PGVectorStore.aadd_embeddings와 같은 규칙으로 행을 만듭니다. (메타데이터 컬럼이 아닌 값은 JSON 컬럼으로)"""
+        extra = dict(metadata)
+        values = [uuid.UUID(str(doc_id)), content]
+        if self.storage is not None and self.storage.dimensions:
+            values.append(truncate_embedding(embedding, self.storage.dimensions))
+        else:
+            values.append(embedding)
+        for col in self.metadata_columns:
+            value = extra.pop(col, None)
+            values.append(json.dumps(value) if isinstance(value, dict) else value)
+        if self.storage is not None and self.storage.dimensions:
+            values.append(embedding)
+        extra.pop(FULL_EMBEDDING_COLUMN, None)
+        values.append(json.dumps(extra))
+        return tuple(values)
+
+    def _merge_sql(self, stage: str) -> str:
+        columns = ", ".join(f'"{col}"' for col in self.columns)
+        conflict = ", ".join(f'"{col}"' for col in self.primary_key)
+        updates = ", ".join(
+            f'"{col}" = EXCLUDED."{col}"' for col in self.columns if col not in self.primary_key
+        )
+        return (
+            f'INSERT INTO "{self.table_name}" ({columns}) SELECT {columns} FROM "{stage}" '
+            f"ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
+        )
+
+    async def _copy(self, conn: asyncpg.Connection, records: List[tuple]):
+        if not self.upsert:
+            await conn.copy_records_to_table(self.table_name, records=records, columns=self.columns)
+            return
+
+        stage = f"{self.table_name}_copy_stage"
+        async with conn.transaction():
+            # 세션 임시 테이블 (커밋 시 비워지므로 연결마다 한 번만 만들어짐)
+            await conn.execute(
+                f'CREATE TEMP TABLE IF NOT EXISTS "{stage}" '
+                f'(LIKE "{self.table_name}" INCLUDING DEFAULTS) ON COMMIT DELETE ROWS'
+            )
+            await conn.copy_records_to_table(stage, records=records, columns=self.columns)
+            await conn.execute(self._merge_sql(stage))
+
+    async def aadd_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs,
+    ) -> List[str]:
+        """미리 계산한 임베딩을 batch_size행 단위의 binary COPY로 씁니다."""
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = [str(i) for i in ids] if ids else [str(uuid.uuid4()) for _ in texts]
+        records = [self._record(*row) for row in zip(ids, texts, embeddings, metadatas)]
+
+        started = time.perf_counter()
+        async with self.pool.acquire() as conn:
+            for i in range(0, len(records), self.batch_size):
+                await self._copy(conn, records[i:i + self.batch_size])
+                self.copies += 1
+        self.busy += time.perf_counter() - started
+        self.rows += len(records)
+        return ids
+
+    def summary(self) -> str:
+        rate = self.rows / self.busy if self.busy > 0 else 0.0
+        mode = "upsert" if self.upsert else "direct"
+        return f"  copy   {self.copies:>6} COPYs  {self.rows:>8} rows  busy {self.busy:8.1f}s  {rate:8.1f} rows/s ({mode})"
@@ -0,0 +1,211 @@
+from langchain_core.documents import Document
+from typing import Callable, List, Optional, Tuple
+import math
+
+# 인접 청크 사이에 허용하는 간격(문자 수). 분할기가 청크 경계의 공백/구분자를 제거하므로 약간의 간격을 허용합니다.
+ADJACENT_GAP = 2
+# 마지막 세그먼트를 잘라서라도 넣을 최소 남은 토큰 수
+MIN_TRUNCATE_TOKENS = 64
+
+
+def _tiktoken_counter(model_name: str):
+    """tiktoken 기반 (토큰 수 계산, 토큰 단위 자르기) 함수를 반환합니다. 사용할 수 없으면 None."""
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken 미설치 또는 인코딩 파일을 내려받을 수 없는 환경
+        return None
+
+    def count(text: str) -> int:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def truncate(text: str, max_tokens: int) -> str:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+    return count, truncate
+
+
+def _approx_count(text: str) -> int:
+    # 한글은 대략 글자당 1토큰, 영문은 4글자당 1토큰
+    return math.ceil(sum(1 if ord(ch) > 0x7F else 0.25 for ch in text))
+
+
+def _approx_truncate(text: str, max_tokens: int) -> str:
+    total = 0.0
+    for i, ch in enumerate(text):
+        total += 1 if ord(ch) > 0x7F else 0.25
+        if total > max_tokens:
+            return text[:i]
+    return text
+
+
+def _counter_truncate(count_tokens: Callable[[str], int]) -> Callable[[str, int], str]:
+    """토큰 수 계산 함수로 max_tokens 안에 들어가는 가장 긴 앞부분을 이분 탐색하는 자르기 함수를 만듭니다."""
+
+    def truncate(text: str, max_tokens: int) -> str:
+        if count_tokens(text) <= max_tokens:
+            return text
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if count_tokens(text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return text[:low]
+
+    return truncate
+
+
+def _suffix_prefix_overlap(a: str, b: str, min_overlap: int = 20) -> int:
+    """a의 끝과 b의 시작이 겹치는 가장 긴 길이를 반환합니다. (min_overlap 미만이면 0)"""
+    for size in range(min(len(a), len(b)), min_overlap - 1, -1):
+        if a.endswith(b[:size]):
+            return size
+    return 0
+
+
+class _Segment:
+    """같은 source/page 안에서 이어 붙인 청크 구간"""
+
+    def __init__(self, doc: Document, rank: int, start: Optional[int]):
+        self.doc = doc
+        self.rank = rank
+        self.start = start
+        self.text = doc.page_content
+        self.ids = [doc.id] if doc.id else []
+
+    @property
+    def end(self) -> Optional[int]:
+        return None if self.start is None else self.start + len(self.text)
+
+    def try_merge(self, doc: Document, rank: int, start: int) -> bool:
+        """start_index 기준으로 겹치거나 인접한 청크면 이어 붙이고 True를 반환합니다."""
+        text = doc.page_content
+        if self.start is None or start > self.end + ADJACENT_GAP:
+            return False
+
+        if start + len(text) <= self.end and self.text[start - self.start:start - self.start + len(text)] == text:
+            # 이미 포함된 구간 (중복 청크)
+            merged = self.text
+        elif start >= self.end:
+            # 인접 청크: 사이 간격은 공백 하나로
+            merged = self.text + (" " if start > self.end else "") + text
+        else:
+            overlap = self.end - start
+            if self.text[-overlap:] == text[:overlap]:
+                merged = self.text + text[overlap:]
+            else:
+                # 적재 시 본문이 정리(null byte 제거 등)되어 오프셋이 어긋난 경우 텍스트로 겹침을 찾음
+                overlap = _suffix_prefix_overlap(self.text, text)
+                if not overlap:
+                    return False
+                merged = self.text + text[overlap:]
+
+        self.text = merged
+        self.rank = min(self.rank, rank)
+        if doc.id:
+            self.ids.append(doc.id)
+        return True
+
+    def to_document(self) -> Document:
+        metadata = dict(self.doc.metadata)
+        if self.start is not None:
+            metadata["start_index"] = self.start
+        if len(self.ids) > 1:
+            metadata["merged_ids"] = self.ids
+        return Document(id=self.doc.id, page_content=self.text, metadata=metadata)
+
+
+class ContextAssembler:
+    """검색된 청크를 LLM 프롬프트용 참고 문서로 정리하는 클래스
+
+    1. 같은 source/page의 청크를 start_index 순으로 정렬해, 겹치거나(chunk_overlap) 인접한 청크를 하나로 합칩니다.
+       이미 포함된 구간의 청크는 버립니다.
+    2. 합친 구간을 검색 순위(구성 청크 중 가장 높은 순위) 순서로 max_tokens 안에 담습니다.
+       다 담지 못하는 구간은 남은 토큰만큼 잘라서 넣고 이후 구간은 버립니다.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 3000,
+        model_name: str = "gpt-4o-mini",
+        token_counter: Optional[Callable[[str], int]] = None,
+        token_truncator: Optional[Callable[[str, int], str]] = None,
+    ):
+        """
+        Args:
+            max_tokens: 참고 문서 전체의 최대 토큰 수
+            model_name: 토큰 수 계산에 사용할 tiktoken 인코딩의 모델 (tiktoken을 쓸 수 없으면 근사치 사용)
+            token_counter: 직접 지정할 토큰 수 계산 함수
+            token_truncator: token_counter와 짝을 이루는 (텍스트, 최대 토큰 수) 자르기 함수
+                (없으면 token_counter로 이분 탐색해 자름)
+        """
+        self.max_tokens = max_tokens
+        if token_counter is not None:
+            self.count_tokens = token_counter
+            self._truncate = token_truncator or _counter_truncate(token_counter)
+        else:
+            self.count_tokens, self._truncate = _tiktoken_counter(model_name) or (_approx_count, _approx_truncate)
+
+    @staticmethod
+    def _group_key(doc: Document) -> Tuple:
+        return doc.metadata.get("source"), doc.metadata.get("page")
+
+    def merge(self, docs: List[Document]) -> List[Document]:
+        """겹치거나 인접한 청크를 합치고 중복을 제거해 순위 순으로 반환합니다."""
+        groups = {}
+        seen_ids, seen_contents = set(), set()
+        for rank, doc in enumerate(docs):
+            if (doc.id and doc.id in seen_ids) or doc.page_content in seen_contents:
+                continue
+            seen_ids.add(doc.id)
+            seen_contents.add(doc.page_content)
+            groups.setdefault(self._group_key(doc), []).append((rank, doc))
+
+        segments: List[_Segment] = []
+        for members in groups.values():
+            positioned = sorted(
+                ((doc.metadata["start_index"], rank, doc) for rank, doc in members
+                 if isinstance(doc.metadata.get("start_index"), int)),
+                key=lambda item: (item[0], item[1]),
+            )
+            current: Optional[_Segment] = None
+            for start, rank, doc in positioned:
+                if current is None or not current.try_merge(doc, rank, start):
+                    current = _Segment(doc, rank, start)
+                    segments.append(current)
+            # start_index가 없는 청크는 그대로
+            segments.extend(
+                _Segment(doc, rank, None) for rank, doc in members
+                if not isinstance(doc.metadata.get("start_index"), int)
+            )
+
+        segments.sort(key=lambda seg: seg.rank)
+        return [seg.to_document() for seg in segments]
+
+    def assemble(self, docs: List[Document], max_tokens: Optional[int] = None) -> List[Document]:
+        """청크를 합친 뒤 토큰 예산(max_tokens) 안에 순위 순으로 담아 반환합니다."""
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        packed = []
+        used = 0
+        for doc in self.merge(docs):
+            tokens = self.count_tokens(doc.page_content)
+            if used + tokens <= budget:
+                packed.append(doc)
+                used += tokens
+                continue
+            remaining = budget - used
+            if remaining >= MIN_TRUNCATE_TOKENS:
+                packed.append(Document(
+                    id=doc.id,
+                    page_content=self._truncate(doc.page_content, remaining),
+                    metadata={**doc.metadata, "truncated": True},
+                ))
+            break
+        return packed
@@ -0,0 +1,90 @@
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Optional
+import os
+import time
+
+# 커넥션 풀 기본 설정 (환경 변수로 변경 가능)
+DEFAULT_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DEFAULT_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DEFAULT_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# 초 단위, -1이면 재생성하지 않음
+DEFAULT_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DEFAULT_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# 커넥션별 prepared statement 캐시 크기 (asyncpg, 0이면 비활성화 - pgbouncer transaction 모드 등)
+DEFAULT_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """커넥션 체크아웃 대기 시간과 대기 중인 요청 수를 기록하는 커넥션 풀"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.acquires = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connect(self):
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            # pool_size + max_overflow개가 모두 사용 중이라 pool_timeout 안에 받지 못함
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.waiting -= 1
+            self.acquires += 1
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+
+    def stats(self) -> dict:
+        """풀 상태와 체크아웃 대기 통계를 반환합니다."""
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "waiting": self.waiting,
+            "acquires": self.acquires,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": self.total_wait / self.acquires * 1000 if self.acquires else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+def create_pooled_engine(
+    connection_string: str,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+    pool_timeout: Optional[float] = None,
+    pool_recycle: Optional[int] = None,
+    pool_pre_ping: Optional[bool] = None,
+    statement_cache_size: Optional[int] = None,
+) -> AsyncEngine:
+    """풀 설정을 적용한 AsyncEngine을 생성합니다. (None인 설정은 환경 변수/기본값 사용)"""
+    return create_async_engine(
+        connection_string,
+        poolclass=MonitoredQueuePool,
+        pool_size=DEFAULT_POOL_SIZE if pool_size is None else pool_size,
+        max_overflow=DEFAULT_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        pool_timeout=DEFAULT_POOL_TIMEOUT if pool_timeout is None else pool_timeout,
+        pool_recycle=DEFAULT_POOL_RECYCLE if pool_recycle is None else pool_recycle,
+        pool_pre_ping=DEFAULT_POOL_PRE_PING if pool_pre_ping is None else pool_pre_ping,
+        connect_args={
+            "prepared_statement_cache_size": (
+                DEFAULT_STATEMENT_CACHE_SIZE if statement_cache_size is None else statement_cache_size
+            ),
+        },
+    )
+
+
+def pool_stats(engine: AsyncEngine) -> Optional[dict]:
+    """엔진의 커넥션 풀 통계를 반환합니다. (MonitoredQueuePool이 아니면 None)"""
+    pool = engine.pool
+    return pool.stats() if isinstance(pool, MonitoredQueuePool) else None
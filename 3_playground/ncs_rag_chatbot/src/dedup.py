@@ -0,0 +1,172 @@
+from typing import Dict, Iterable, Optional, Set
+import base64
+import json
+import os
+import re
+import zlib
+import numpy as np
+
+# MinHash 해시 함수 (a * x + b) mod p 의 소수 p (2^31 - 1, 32비트 x와 곱해도 uint64를 넘지 않음)
+MERSENNE_PRIME = (1 << 31) - 1
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 8
+DEFAULT_SHINGLE = 5
+DEFAULT_THRESHOLD = 0.9
+
+WHITESPACE = re.compile(r"\s+")
+
+
+class MinHasher:
+    """문자 n-gram(shingle) 집합의 MinHash 서명을 계산하는 클래스
+
+    같은 seed/num_perm이면 프로세스와 실행이 달라도 같은 서명을 만듭니다. (프로세스 풀 워커에서 계산)
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle: int = DEFAULT_SHINGLE, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle = shingle
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        """공백을 정리한 본문의 문자 n-gram 집합을 반환합니다."""
+        text = WHITESPACE.sub(" ", text).strip()
+        if len(text) <= self.shingle:
+            return {text}
+        return {text[i:i + self.shingle] for i in range(len(text) - self.shingle + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        """본문의 MinHash 서명(uint32 배열)을 반환합니다."""
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in self.shingles(text)), dtype=np.uint64
+        )
+        values = (hashes[None, :] * self._a[:, None] + self._b[:, None]) % MERSENNE_PRIME
+        return values.min(axis=1).astype(np.uint32)
+
+
+def estimate_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """두 MinHash 서명의 Jaccard 유사도 추정치"""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """MinHash + LSH(banding)로 거의 같은 청크를 찾는 인덱스
+
+    서명을 bands개 구간으로 나누어 한 구간이라도 같은 청크를 후보로 찾고,
+    서명으로 추정한 Jaccard 유사도가 threshold 이상인 후보 중 가장 비슷한 것을 대표(canonical) 청크로 반환합니다.
+    청크는 테이블에 저장된 것만 등록하며, 파일 단위로 지울 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        shingle: int = DEFAULT_SHINGLE,
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm({num_perm})은 bands({bands})의 배수여야 합니다.")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        # 청크 ID -> (파일 키, 서명)
+        self.entries: Dict[str, tuple] = {}
+        self._files: Dict[str, Set[str]] = {}
+        # (구간 번호, 구간 값) -> 청크 ID 집합
+        self._buckets: Dict[tuple, Set[str]] = {}
+
+    @property
+    def params(self) -> dict:
+        """서명 호환성을 결정하는 설정 (다르면 저장된 인덱스를 쓰지 않음)"""
+        return {"num_perm": self.num_perm, "bands": self.bands, "shingle": self.shingle}
+
+    def hasher(self) -> MinHasher:
+        return MinHasher(self.num_perm, self.shingle)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[tuple]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find(self, signature: np.ndarray) -> Optional[str]:
+        """서명과 거의 같은 등록된 청크 ID를 반환합니다. (없으면 None)"""
+        checked: Set[str] = set()
+        best_id, best_score = None, self.threshold
+        for key in self._band_keys(signature):
+            for chunk_id in self._buckets.get(key, ()):
+                if chunk_id in checked:
+                    continue
+                checked.add(chunk_id)
+                score = estimate_jaccard(signature, self.entries[chunk_id][1])
+                if score >= best_score:
+                    best_id, best_score = chunk_id, score
+        return best_id
+
+    def add(self, chunk_id: str, file_key: str, signature: np.ndarray):
+        """테이블에 저장된 청크를 등록합니다."""
+        if chunk_id in self.entries:
+            return
+        self.entries[chunk_id] = (file_key, signature)
+        self._files.setdefault(file_key, set()).add(chunk_id)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(chunk_id)
+
+    def remove_file(self, file_key: str):
+        """파일의 청크를 모두 지웁니다. (파일을 다시 적재하거나 삭제할 때)"""
+        for chunk_id in self._files.pop(file_key, ()):
+            _, signature = self.entries.pop(chunk_id)
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(chunk_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    @classmethod
+    def load(cls, path: str, manifest, threshold: float = DEFAULT_THRESHOLD, **params) -> "NearDuplicateIndex":
+        """저장된 인덱스를 읽어옵니다.
+
+        매니페스트에서 적재 완료(done)로 기록된 청크 ID만 등록하므로, 중단된 실행이 남긴 항목은 무시됩니다.
+        파일이 없거나 다른 테이블/설정용이면 빈 인덱스를 반환합니다.
+        """
+        index = cls(path, threshold=threshold, **params)
+        if not os.path.exists(path):
+            return index
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("table_name") != manifest.table_name or data.get("params") != index.params:
+            return index
+
+        valid = {key: set(manifest.chunk_ids(key)) for key in manifest.files if not manifest.is_pending(key)}
+        for chunk_id, (file_key, encoded) in data.get("entries", {}).items():
+            if chunk_id in valid.get(file_key, ()):
+                index.add(chunk_id, file_key, np.frombuffer(base64.b64decode(encoded), dtype=np.uint32))
+        return index
+
+    def save(self, table_name: str, path: Optional[str] = None):
+        """인덱스를 원자적으로(임시 파일 → rename) 저장합니다."""
+        path = path or self.path
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "table_name": table_name,
+                    "params": self.params,
+                    "entries": {
+                        chunk_id: [file_key, base64.b64encode(signature.tobytes()).decode("ascii")]
+                        for chunk_id, (file_key, signature) in self.entries.items()
+                    },
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
@@ -1,14 +1,321 @@
 from langchain_openai import OpenAIEmbeddings
+from langchain_core.embeddings import Embeddings
 from dotenv import load_dotenv
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
 
 load_dotenv()
 
+# 임베딩 캐시 기본 경로/크기 (환경 변수로 변경 가능, 경로를 빈 값으로 두면 캐시 비활성화)
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "embeddings.sqlite3")
+DEFAULT_CACHE_MAX_MB = 512
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 계산용으로 텍스트를 정규화합니다. (NFC + 공백 정리)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class CachedEmbeddings(Embeddings):
+    """SQLite에 벡터를 저장하는 영구 임베딩 캐시
+
+    (모델명, 차원, 정규화된 텍스트 해시)를 키로 float32 벡터를 저장하고,
+    캐시에 없는 텍스트만 batch_size 단위로 모아 원래 임베딩 모델에 요청합니다.
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        cache_path: str,
+        max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+        batch_size: int = 256,
+    ):
+        self.underlying = underlying
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.namespace = f"{getattr(underlying, 'model', type(underlying).__name__)}:{getattr(underlying, 'dimensions', None) or ''}"
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, nbytes INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embedding_cache_last_used ON embedding_cache(last_used)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embedding_cache").fetchone()[0]
+
+    def _key(self, text: str) -> str:
+        payload = f"{self.namespace}\x00{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]]]:
+        """캐시에서 벡터를 찾아 (키 리스트, {키: 벡터})를 반환합니다."""
+        keys = [self._key(text) for text in texts]
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+
+        with self._lock:
+            # SQLite 파라미터 개수 제한을 피하기 위해 나누어 조회
+            for i in range(0, len(unique), 500):
+                part = unique[i:i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})", part
+                ).fetchall()
+                for key, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[key] = vec.tolist()
+            if found:
+                self._conn.executemany(
+                    "UPDATE embedding_cache SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+        self.hits += sum(1 for key in keys if key in found)
+        return keys, found
+
+    def _missing(self, texts: List[str], keys: List[str], found: Dict[str, List[float]]) -> List[Tuple[str, str]]:
+        """캐시에 없는 (키, 텍스트) 목록을 중복 없이 반환합니다."""
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        self.misses += len(missing)
+        return list(missing.items())
+
+    def _store(self, pairs: List[Tuple[str, str]], vectors: List[List[float]], found: Dict[str, List[float]]):
+        """새로 계산한 벡터를 캐시에 저장하고 크기 제한을 적용합니다."""
+        now = time.time()
+        rows = []
+        for (key, _), vector in zip(pairs, vectors):
+            found[key] = vector
+            blob = array("f", vector).tobytes()
+            rows.append((key, blob, len(blob), now))
+
+        with self._lock:
+            # 그 사이 다른 프로세스가 같은 키를 저장했으면 REPLACE로 덮어쓰므로, 기존 행 크기는 빼고 더함
+            replaced = 0
+            for i in range(0, len(rows), 500):
+                part = [row[0] for row in rows[i:i + 500]]
+                placeholders = ",".join("?" * len(part))
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(nbytes), 0) FROM embedding_cache WHERE key IN ({placeholders})", part
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, vector, nbytes, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._total_bytes += sum(row[2] for row in rows) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """전체 크기가 max_bytes의 90% 이하가 될 때까지 오래된 항목을 삭제합니다. (lock 보유 상태에서 호출)"""
+        # 다른 프로세스(ingest/server)가 같은 파일을 쓰므로 실제 크기를 다시 계산
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embedding_cache").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT key, nbytes FROM embedding_cache ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            # 목표 크기까지 필요한 만큼만 삭제
+            victims, freed = [], 0
+            for key, nbytes in rows:
+                if self._total_bytes - freed <= target:
+                    break
+                victims.append((key,))
+                freed += nbytes
+            self._conn.executemany("DELETE FROM embedding_cache WHERE key = ?", victims)
+            self._total_bytes -= freed
+        self._conn.commit()
+
+    def _batches(self, pairs: List[Tuple[str, str]]):
+        for i in range(0, len(pairs), self.batch_size):
+            yield pairs[i:i + self.batch_size]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (캐시 미스만 원래 모델에 요청)"""
+        keys, found = self._lookup(texts)
+        for batch in self._batches(self._missing(texts, keys, found)):
+            vectors = self.underlying.embed_documents([text for _, text in batch])
+            self._store(batch, vectors, found)
+        return [found[key] for key in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (Async, 캐시 조회/저장은 스레드에서 수행)"""
+        keys, found = await asyncio.to_thread(self._lookup, texts)
+        for batch in self._batches(self._missing(texts, keys, found)):
+            vectors = await self.underlying.aembed_documents([text for _, text in batch])
+            await asyncio.to_thread(self._store, batch, vectors, found)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """질의 임베딩"""
+        return self.embed_documents([text])[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """질의 임베딩 (Async)"""
+        return (await self.aembed_documents([text]))[0]
+
+
+class QueryEmbeddingCache(Embeddings):
+    """질의 임베딩용 인메모리 LRU/TTL 캐시 + 동일 질의 요청 합치기(single-flight)
+
+    같은 질의가 동시에 여러 번 들어오면 원래 모델에는 한 번만 요청하고,
+    나머지 요청은 그 결과를 함께 기다립니다. 문서 임베딩은 그대로 원래 모델에 위임합니다.
+    """
+
+    def __init__(self, underlying: Embeddings, max_size: int = 2048, ttl: float = 3600.0):
+        self.underlying = underlying
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _get(self, key: str) -> Optional[List[float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, vector = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return vector
+
+    def _put(self, key: str, vector: List[float]):
+        self._entries[key] = (time.monotonic() + self.ttl, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """캐시 적중/미스 카운터를 반환합니다."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.underlying.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_text(text)
+        vector = self._get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        vector = self.underlying.embed_query(text)
+        self._put(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = normalize_text(text)
+        vector = self._get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fetch(key, text))
+            self._inflight[key] = task
+
+        # 한 요청이 취소되어도 다른 대기 요청의 업스트림 호출은 유지되도록 shield
+        return await asyncio.shield(task)
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 질의를 임베딩합니다. 캐시에 없는 질의만 모아 aembed_documents 한 번으로 요청합니다."""
+        keys = [normalize_text(text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            vector = self._get(key)
+            if vector is not None:
+                self.hits += 1
+                vectors[key] = vector
+            elif key not in missing:
+                self.misses += 1
+                missing[key] = text
+
+        if missing:
+            fetched = await self.underlying.aembed_documents(list(missing.values()))
+            for key, vector in zip(missing, fetched):
+                self._put(key, vector)
+                vectors[key] = vector
+        return [vectors[key] for key in keys]
+
+    async def _fetch(self, key: str, text: str) -> List[float]:
+        try:
+            vector = await self.underlying.aembed_query(text)
+            self._put(key, vector)
+            return vector
+        finally:
+            self._inflight.pop(key, None)
+
+
 class EmbeddingModel:
     """임베딩 모델을 관리하는 클래스"""
 
-    def __init__(self, model_name: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        model_name: str = "text-embedding-3-small",
+        cache_path: Optional[str] = None,
+        cache_max_mb: Optional[int] = None,
+    ):
         self.embeddings = OpenAIEmbeddings(model=model_name)
 
+        if cache_path is None:
+            cache_path = os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        if cache_max_mb is None:
+            cache_max_mb = int(os.getenv("EMBEDDING_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+
+        if cache_path:
+            self.embeddings = CachedEmbeddings(
+                self.embeddings,
+                cache_path=cache_path,
+                max_bytes=cache_max_mb * 1024 * 1024,
+            )
+
     def get_embeddings(self):
-        """LangChain 임베딩 객체를 반환합니다."""
+        """LangChain 임베딩 객체를 반환합니다. (영구 캐시가 켜져 있으면 캐시 래퍼)"""
         return self.embeddings
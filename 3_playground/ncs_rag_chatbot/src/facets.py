@@ -0,0 +1,164 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# (대분류, 중분류, 파일)별 청크 수/페이지 수를 기록하는 테이블 (적재 후 갱신, 분류 목록과 빈 필터 판단에 사용)
+FACETS_TABLE = "facets"
+
+# 패싯 컬럼 (필터의 이 컬럼 조건으로 결과가 없는지 판단)
+FACET_COLUMNS = ("main_category", "sub_category", "source")
+
+# (대분류, 중분류, 파일, 청크 수, 페이지 수)
+Facet = Tuple[str, str, str, int, int]
+
+
+async def arefresh_facets(engine: AsyncEngine, table_name: str) -> List[Facet]:
+    """테이블의 (대분류, 중분류, 파일)별 청크 수/페이지 수를 다시 세어 기록하고 반환합니다. (적재 후 호출)"""
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{FACETS_TABLE}" ('
+            "table_name VARCHAR NOT NULL, "
+            "main_category VARCHAR NOT NULL, "
+            "sub_category VARCHAR NOT NULL, "
+            "source VARCHAR NOT NULL, "
+            "chunk_count BIGINT NOT NULL, "
+            "page_count BIGINT NOT NULL, "
+            "updated_at TIMESTAMPTZ NOT NULL DEFAULT now(), "
+            "PRIMARY KEY (table_name, main_category, sub_category, source))"
+        ))
+        await conn.execute(
+            text(f'DELETE FROM "{FACETS_TABLE}" WHERE table_name = :table_name'),
+            {"table_name": table_name},
+        )
+        await conn.execute(
+            text(
+                f'INSERT INTO "{FACETS_TABLE}" '
+                "(table_name, main_category, sub_category, source, chunk_count, page_count) "
+                "SELECT :table_name, COALESCE(main_category, ''), COALESCE(sub_category, ''), "
+                "COALESCE(source, ''), count(*), count(DISTINCT page) "
+                f'FROM "{table_name}" GROUP BY 2, 3, 4'
+            ),
+            {"table_name": table_name},
+        )
+    return await aload_facets(engine, table_name) or []
+
+
+async def aload_facets(engine: AsyncEngine, table_name: str) -> Optional[List[Facet]]:
+    """기록된 패싯을 읽습니다. 패싯 테이블이 없으면(아직 기록한 적 없음) None."""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(
+                text(
+                    "SELECT main_category, sub_category, source, chunk_count, page_count "
+                    f'FROM "{FACETS_TABLE}" WHERE table_name = :table_name'
+                ),
+                {"table_name": table_name},
+            )
+        except ProgrammingError:
+            return None
+        return [tuple(row) for row in result]
+
+
+def local_facets(store) -> List[Facet]:
+    """로컬 벡터 저장소(LocalVectorStore)의 메타데이터로 패싯을 계산합니다."""
+    chunks: Dict[Tuple[str, str, str], int] = {}
+    pages: Dict[Tuple[str, str, str], set] = {}
+    for row in store._id_to_row.values():
+        metadata = store.metadatas[row]
+        key = tuple(str(metadata.get(col) or "") for col in FACET_COLUMNS)
+        chunks[key] = chunks.get(key, 0) + 1
+        if metadata.get("page") is not None:
+            pages.setdefault(key, set()).add(metadata["page"])
+    return [(*key, count, len(pages.get(key, ()))) for key, count in chunks.items()]
+
+
+def _allowed(cond) -> Optional[set]:
+    # $eq / $in / 값 조건만 판단 (그 밖의 연산자는 제한이 없는 것으로 봄)
+    if isinstance(cond, dict):
+        if "$eq" in cond:
+            return {cond["$eq"]}
+        if "$in" in cond:
+            return set(cond["$in"])
+        return None
+    return {cond}
+
+
+class FacetIndex:
+    """적재 시 기록한 패싯을 메모리에 들고 있는 인덱스
+
+    - categories(): {대분류: [중분류, ...]} (기존 /api/categories 형식)
+    - tree(): 분류/파일별 청크 수, 페이지 수
+    - count(filter): 필터의 대분류/중분류/파일 조건에 맞는 청크 수 (다른 조건은 무시하므로 상한값)
+    적재로 테이블이 바뀌면(generation 변경) 다시 읽습니다. 패싯 기록이 없으면 loaded=False이고 필터를 판단하지 않습니다.
+    """
+
+    def __init__(self, check_interval: float = 5.0):
+        self.check_interval = check_interval
+        self.facets: List[Facet] = []
+        self.loaded = False
+        self.generation: Optional[int] = None
+        self._last_check = 0.0
+
+    async def sync(
+        self,
+        fetch_generation: Callable[[], Awaitable[int]],
+        load: Callable[[], Awaitable[Optional[List[Facet]]]],
+    ):
+        """generation을 check_interval 간격으로 확인하고, 바뀌었으면 패싯을 다시 읽습니다."""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        generation = await fetch_generation()
+        if generation != self.generation:
+            facets = await load()
+            self.facets = facets or []
+            self.loaded = facets is not None
+            self.generation = generation
+
+    def categories(self) -> Dict[str, List[str]]:
+        categories: Dict[str, List[str]] = {}
+        for main, sub, _, _, _ in sorted(self.facets):
+            subs = categories.setdefault(main, [])
+            if sub not in subs:
+                subs.append(sub)
+        return categories
+
+    def tree(self) -> Dict[str, dict]:
+        tree: Dict[str, dict] = {}
+        for main, sub, source, chunks, pages in sorted(self.facets):
+            main_node = tree.setdefault(main, {"chunks": 0, "pages": 0, "sub_categories": {}})
+            sub_node = main_node["sub_categories"].setdefault(sub, {"chunks": 0, "pages": 0, "sources": {}})
+            sub_node["sources"][source] = {"chunks": chunks, "pages": pages}
+            for node in (main_node, sub_node):
+                node["chunks"] += chunks
+                node["pages"] += pages
+        return tree
+
+    def count(self, filter: Optional[dict]) -> Optional[int]:
+        """필터에 맞을 수 있는 청크 수 (패싯 기록이 없으면 None)"""
+        if not self.loaded:
+            return None
+        conditions = [
+            (i, _allowed(cond)) for i, col in enumerate(FACET_COLUMNS)
+            for cond in [(filter or {}).get(col)] if cond is not None
+        ]
+        return sum(
+            facet[3] for facet in self.facets
+            if all(allowed is None or facet[i] in allowed for i, allowed in conditions)
+        )
+
+    def is_empty(self, filter: Optional[dict]) -> bool:
+        """필터에 맞는 청크가 확실히 없는지 (필터가 없거나 패싯 기록이 없으면 False)"""
+        return bool(filter) and self.count(filter) == 0
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "generation": self.generation,
+            "facets": len(self.facets),
+            "chunks": sum(facet[3] for facet in self.facets),
+        }
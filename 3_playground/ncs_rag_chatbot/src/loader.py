@@ -1,11 +1,39 @@
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_upstage import UpstageDocumentParseLoader
-from typing import List
+from typing import Iterator, List, Optional, Sequence, Tuple
 from langchain_core.documents import Document
+from datetime import datetime
+import pypdf
+
+
+def _pdf_metadata(metadata: dict) -> dict:
+    """PyPDFLoader와 같은 방식으로 PDF 문서 메타데이터의 키/값을 정리합니다.
+
+    langchain_community의 비공개 함수(_purge_metadata)와 같은 규칙입니다. 이 규칙이 바뀌면 청크 해시(ID)가
+    바뀌므로 tests/test_loader.py에서 PyPDFLoader 결과와 비교합니다.
+    """
+    result = {}
+    map_key = {"page_count": "total_pages", "file_path": "source"}
+    for k, v in metadata.items():
+        if type(v) not in (str, int):
+            v = str(v)
+        k = (k[1:] if k.startswith("/") else k).lower()
+        if k in ("creationdate", "moddate"):
+            try:
+                result[k] = datetime.strptime(v.replace("'", ""), "D:%Y%m%d%H%M%S%z").isoformat("T")
+            except ValueError:
+                result[k] = v
+        elif k in map_key:
+            result[map_key[k]] = v
+            result[k] = v
+        else:
+            result[k] = v.strip() if isinstance(v, str) else v
+    return result
+
 
 class DocumentLoader:
     """기본 PDF 파일을 로드하는 클래스 (PyPDFLoader 사용)"""
-    
+
     def __init__(self, file_path: str):
         self.file_path = file_path
 
@@ -14,6 +42,58 @@ class DocumentLoader:
         loader = PyPDFLoader(self.file_path)
         return loader.load()
 
+    def page_count(self) -> int:
+        """PDF의 전체 페이지 수를 반환합니다. (본문은 읽지 않음)"""
+        with open(self.file_path, "rb") as f:
+            return len(pypdf.PdfReader(f).pages)
+
+    def _document_info(self, reader: pypdf.PdfReader) -> Tuple[dict, List[str]]:
+        doc_metadata = _pdf_metadata(
+            {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+            | dict(reader.metadata or {})
+            | {"source": self.file_path, "total_pages": len(reader.pages)}
+        )
+        # page_labels는 접근할 때마다 전체 페이지를 계산하므로 한 번만 조회
+        return doc_metadata, reader.page_labels
+
+    def document_info(self) -> Tuple[dict, List[str]]:
+        """문서 메타데이터(total_pages 포함)와 전체 페이지 라벨을 반환합니다. (본문은 읽지 않음)
+
+        파일당 한 번 계산해 lazy_load()에 넘기면 페이지 구간마다 다시 계산하지 않습니다.
+        """
+        with open(self.file_path, "rb") as f:
+            return self._document_info(pypdf.PdfReader(f))
+
+    def lazy_load(
+        self,
+        start_page: int = 0,
+        end_page: Optional[int] = None,
+        doc_metadata: Optional[dict] = None,
+        page_labels: Optional[Sequence[str]] = None,
+    ) -> Iterator[Document]:
+        """PDF 페이지를 하나씩 읽어 반환합니다. start_page ~ end_page(미포함) 범위만 읽을 수도 있습니다.
+
+        PyPDFLoader(mode="page")와 같은 본문/메타데이터를 만들므로 청크 ID가 바뀌지 않습니다.
+
+        Args:
+            doc_metadata: document_info()의 문서 메타데이터 (없으면 PDF에서 계산)
+            page_labels: start_page부터의 페이지 라벨 (doc_metadata와 함께 넘김)
+        """
+        with open(self.file_path, "rb") as f:
+            reader = pypdf.PdfReader(f)
+            if doc_metadata is None or page_labels is None:
+                doc_metadata, labels = self._document_info(reader)
+                page_labels = labels[start_page:]
+            total_pages = doc_metadata["total_pages"]
+
+            end_page = total_pages if end_page is None else min(end_page, total_pages)
+            for page_number in range(start_page, end_page):
+                text = reader.pages[page_number].extract_text(extraction_mode="plain")
+                yield Document(
+                    page_content=text.strip(),
+                    metadata=doc_metadata | {"page": page_number, "page_label": page_labels[page_number - start_page]},
+                )
+
 class UpstageLoader:
     """Upstage Document Parse Loader를 사용하는 클래스"""
 
@@ -25,3 +105,8 @@ class UpstageLoader:
         """Upstage Loader를 사용하여 문서를 로드합니다."""
         loader = UpstageDocumentParseLoader(self.file_path, split=self.split)
         return loader.load()
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Upstage Loader 결과를 하나씩 반환합니다."""
+        loader = UpstageDocumentParseLoader(self.file_path, split=self.split)
+        yield from loader.lazy_load()
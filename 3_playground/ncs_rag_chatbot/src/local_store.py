@@ -0,0 +1,346 @@
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import json
+import os
+import uuid
+
+# 비트맵 사전 필터를 지원하는 메타데이터 컬럼
+FILTER_COLUMNS = ("main_category", "sub_category", "source", "page")
+
+VECTORS_FILE = "vectors.npy"
+DOCS_FILE = "docs.json"
+
+
+class LocalVectorStore(VectorStore):
+    """NumPy 행렬 기반 인프로세스 벡터 저장소 (PGVectorStore 대체용)
+
+    - 정규화된 float32 임베딩을 한 행렬에 모아 두고, top-k 검색을 행렬곱 한 번 + argpartition으로 수행
+    - 메타데이터 컬럼 값별 비트맵(bool 배열)으로 후보 행을 먼저 거른 뒤 유사도 계산
+    - save()/load()로 디스크 스냅샷을 저장/로드 (로드 시 벡터 파일은 메모리 매핑)
+
+    유사도 점수는 PGVectorStore 기본값과 같은 코사인 거리(1 - 코사인 유사도)로 반환합니다.
+    """
+
+    def __init__(self, embedding_service: Embeddings, filter_columns: Sequence[str] = FILTER_COLUMNS):
+        self.embedding_service = embedding_service
+        self.filter_columns = tuple(filter_columns)
+        self.generation = 0
+
+        self._matrix: Optional[np.ndarray] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadatas: List[dict] = []
+        self._id_to_row: Dict[str, int] = {}
+        # 컬럼 -> 값 -> 행 비트맵
+        self._bitmaps: Dict[str, Dict[Any, np.ndarray]] = {col: {} for col in self.filter_columns}
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_service
+
+    def __len__(self) -> int:
+        return len(self._id_to_row)
+
+    @property
+    def dimension(self) -> Optional[int]:
+        """임베딩 차원 (아직 행이 없으면 None)"""
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    # ─── 저장 ─────────────────────────────────────────────
+
+    def _capacity(self) -> int:
+        return 0 if self._matrix is None else self._matrix.shape[0]
+
+    def _ensure_capacity(self, rows: int, dim: int):
+        """행렬과 비트맵이 rows개 행을 담을 수 있도록 늘립니다. (메모리 매핑 상태면 메모리로 복사)"""
+        if self._matrix is not None and self._matrix.shape[1] != dim:
+            raise ValueError(f"임베딩 차원이 다릅니다: {self._matrix.shape[1]} != {dim}")
+
+        capacity = self._capacity()
+        writable = self._matrix is not None and self._matrix.flags.writeable
+        if rows <= capacity and writable:
+            return
+
+        new_capacity = max(rows, capacity * 2, 1024)
+        matrix = np.zeros((new_capacity, dim), dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+        self._alive = self._grow(self._alive, new_capacity)
+        for values in self._bitmaps.values():
+            for value, bitmap in values.items():
+                values[value] = self._grow(bitmap, new_capacity)
+
+    @staticmethod
+    def _grow(bitmap: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.zeros(capacity, dtype=bool)
+        grown[:len(bitmap)] = bitmap[:capacity]
+        return grown
+
+    def _set_bits(self, row: int, metadata: dict, value: bool):
+        for col in self.filter_columns:
+            if col not in metadata:
+                continue
+            bitmaps = self._bitmaps[col]
+            key = metadata[col]
+            if key not in bitmaps:
+                if not value:
+                    continue
+                bitmaps[key] = np.zeros(self._capacity(), dtype=bool)
+            bitmaps[key][row] = value
+
+    def add_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """미리 계산된 임베딩을 추가합니다. 같은 ID가 있으면 덮어씁니다."""
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = [str(i) for i in ids] if ids else [str(uuid.uuid4()) for _ in texts]
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        self._ensure_capacity(self._size + len(texts), vectors.shape[1])
+
+        for text, vector, metadata, doc_id in zip(texts, vectors, metadatas, ids):
+            row = self._id_to_row.get(doc_id)
+            if row is None:
+                row = self._size
+                self._size += 1
+                self.ids.append(doc_id)
+                self.texts.append(text)
+                self.metadatas.append(dict(metadata))
+                self._id_to_row[doc_id] = row
+            else:
+                self._set_bits(row, self.metadatas[row], False)
+                self.texts[row] = text
+                self.metadatas[row] = dict(metadata)
+
+            self._matrix[row] = vector
+            self._alive[row] = True
+            self._set_bits(row, metadata, True)
+
+        self.generation += 1
+        return ids
+
+    async def aadd_embeddings(self, texts, embeddings, metadatas=None, ids=None, **kwargs) -> List[str]:
+        return self.add_embeddings(list(texts), embeddings, metadatas, ids)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(texts, self.embedding_service.embed_documents(texts), metadatas, ids)
+
+    async def aadd_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        embeddings = await self.embedding_service.aembed_documents(texts)
+        return self.add_embeddings(texts, embeddings, metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """ID에 해당하는 행을 삭제 표시합니다. (실제 공간은 save() 시 정리)"""
+        if not ids:
+            return False
+        for doc_id in ids:
+            row = self._id_to_row.pop(str(doc_id), None)
+            if row is None:
+                continue
+            self._alive[row] = False
+            self._set_bits(row, self.metadatas[row], False)
+        self.generation += 1
+        return True
+
+    async def adelete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        return self.delete(ids)
+
+    def update_metadata(self, updates: Dict[str, dict]):
+        """행의 메타데이터에 키를 덮어씁니다. 값이 None인 키는 지웁니다. (필터 컬럼은 바꾸지 않음)"""
+        for doc_id, patch in updates.items():
+            row = self._id_to_row.get(str(doc_id))
+            if row is None:
+                continue
+            for key, value in patch.items():
+                if key in self.filter_columns:
+                    raise ValueError(f"필터 컬럼은 바꿀 수 없습니다: {key}")
+                if value is None:
+                    self.metadatas[row].pop(key, None)
+                else:
+                    self.metadatas[row][key] = value
+        self.generation += 1
+
+    # ─── 검색 ─────────────────────────────────────────────
+
+    def _filter_mask(self, filter: Optional[dict]) -> np.ndarray:
+        """필터 조건을 비트맵 AND/OR로 계산해 후보 행 마스크를 만듭니다."""
+        mask = self._alive[:self._size].copy()
+        for col, cond in (filter or {}).items():
+            if col not in self._bitmaps:
+                raise ValueError(f"필터를 지원하지 않는 컬럼입니다: {col}")
+
+            if isinstance(cond, dict):
+                if "$eq" in cond:
+                    values = [cond["$eq"]]
+                elif "$in" in cond:
+                    values = list(cond["$in"])
+                else:
+                    raise ValueError(f"지원하지 않는 필터 연산자입니다: {list(cond)}")
+            else:
+                values = [cond]
+
+            col_mask = np.zeros(self._size, dtype=bool)
+            for value in values:
+                bitmap = self._bitmaps[col].get(value)
+                if bitmap is not None:
+                    col_mask |= bitmap[:self._size]
+            mask &= col_mask
+        return mask
+
+    def _top_k(self, embedding: List[float], k: int, filter: Optional[dict]) -> List[Tuple[int, float]]:
+        if self._size == 0:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        mask = self._filter_mask(filter)
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+
+        if candidates.size == self._size:
+            scores = self._matrix[:self._size] @ query
+        else:
+            scores = self._matrix[candidates] @ query
+
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def lexical_search(self, terms: Dict[str, float], k: int = 4, filter: Optional[dict] = None) -> List[Document]:
+        """검색어가 본문 또는 파일명에 포함된 문서를 가중치 합이 큰 순서로 반환합니다. (대소문자 무시)"""
+        lowered = {term.lower(): weight for term, weight in terms.items()}
+        scored = []
+        for row in np.flatnonzero(self._filter_mask(filter)):
+            text = self.texts[row].lower()
+            source = str(self.metadatas[row].get("source", "")).lower()
+            score = sum(weight for term, weight in lowered.items() if term in text or term in source)
+            if score > 0:
+                scored.append((score, int(row)))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self._to_document(row) for _, row in scored[:k]]
+
+    def _to_document(self, row: int) -> Document:
+        return Document(id=self.ids[row], page_content=self.texts[row], metadata=dict(self.metadatas[row]))
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return [(self._to_document(row), 1.0 - score) for row, score in self._top_k(embedding, k, filter)]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [self._to_document(row) for row, _ in self._top_k(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding_service.embed_query(query), k=k, filter=filter)
+
+    async def asimilarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        return self.similarity_search_by_vector(embedding, k=k, filter=filter)
+
+    async def asimilarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(embedding, k=k, filter=filter)
+
+    async def asimilarity_search(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        embedding = await self.embedding_service.aembed_query(query)
+        return self.similarity_search_by_vector(embedding, k=k, filter=filter)
+
+    # ─── 스냅샷 ───────────────────────────────────────────
+
+    def save(self, path: str):
+        """삭제된 행을 정리하고 스냅샷(벡터 .npy + 문서 .json)을 저장합니다."""
+        os.makedirs(path, exist_ok=True)
+        rows = np.flatnonzero(self._alive[:self._size])
+        matrix = self._matrix[rows] if self._matrix is not None else np.zeros((0, 0), dtype=np.float32)
+
+        np.save(os.path.join(path, VECTORS_FILE + ".tmp.npy"), matrix)
+        os.replace(os.path.join(path, VECTORS_FILE + ".tmp.npy"), os.path.join(path, VECTORS_FILE))
+
+        docs = {
+            "ids": [self.ids[r] for r in rows],
+            "texts": [self.texts[r] for r in rows],
+            "metadatas": [self.metadatas[r] for r in rows],
+        }
+        with open(os.path.join(path, DOCS_FILE + ".tmp"), "w", encoding="utf-8") as f:
+            json.dump(docs, f, ensure_ascii=False)
+        os.replace(os.path.join(path, DOCS_FILE + ".tmp"), os.path.join(path, DOCS_FILE))
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        embedding_service: Embeddings,
+        filter_columns: Sequence[str] = FILTER_COLUMNS,
+        mmap: bool = True,
+    ) -> "LocalVectorStore":
+        """스냅샷을 로드합니다. mmap=True이면 벡터 파일을 메모리 매핑(읽기 전용)으로 엽니다."""
+        store = cls(embedding_service, filter_columns)
+        matrix = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r" if mmap else None)
+        with open(os.path.join(path, DOCS_FILE), "r", encoding="utf-8") as f:
+            docs = json.load(f)
+
+        size = len(docs["ids"])
+        # 빈 저장소 스냅샷은 차원이 없는 것으로 봄 (다음 추가 때 차원이 정해짐)
+        store._matrix = matrix if matrix.size else None
+        store._size = size
+        store._alive = np.ones(size, dtype=bool)
+        store.ids = docs["ids"]
+        store.texts = docs["texts"]
+        store.metadatas = docs["metadatas"]
+        store._id_to_row = {doc_id: row for row, doc_id in enumerate(store.ids)}
+        for row, metadata in enumerate(store.metadatas):
+            store._set_bits(row, metadata, True)
+        return store
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -2,8 +2,10 @@ from embeddings import EmbeddingModel
 from vector_store import VectorStoreManager
 from tool import ToolBuilder
 from agent import ChatAgent
+from resilience import Resilience
 from dotenv import load_dotenv
 import asyncio
+import os
 
 # 환경 변수 로드
 load_dotenv()
@@ -26,14 +28,22 @@ async def main():
         metadata_columns=["main_category", "sub_category", "source", "page"],
     )
     vector_store = vector_store_manager.get_vector_store()
+    # 벡터 검색 타임아웃/재시도/헤징 (SEARCH_TIMEOUT / SEARCH_RETRIES / SEARCH_HEDGE, src/resilience.py 참고)
+    vector_store_manager.search_resilience = Resilience.from_env("search")
 
     # 2. 도구 생성 (벡터 저장소가 async 지원하므로 tool 내부에서도 비동기 호출)
-    tool_builder = ToolBuilder(vector_store)
+    # AGENT_SPECULATIVE_RETRIEVAL=true면 첫 모델 호출과 동시에 원래 질의로 검색을 미리 시작
+    speculative = os.getenv("AGENT_SPECULATIVE_RETRIEVAL", "false").lower() in ("1", "true", "yes")
+    # AGENT_MULTI_QUERY=true면 여러 (질의, 필터)를 한 번에 검색하는 retrieve_context_multi 도구도 제공
+    multi_query = os.getenv("AGENT_MULTI_QUERY", "false").lower() in ("1", "true", "yes")
+    tool_builder = ToolBuilder(
+        vector_store, manager=vector_store_manager, speculative=speculative, multi_query=multi_query
+    )
     tools = tool_builder.build_tools()
 
     # 3. 에이전트 생성 및 실행
     agent = ChatAgent()
-    agent.create_agent(tools)
+    agent.create_agent(tools, prefetcher=tool_builder if speculative else None)
     
     # 테스트 질의 (Async) - 메타데이터 필터링 테스트
     query = "IT테스트 분야에서 테스트 기획의 핵심 내용을 알려줘"
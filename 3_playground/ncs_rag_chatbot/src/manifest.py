@@ -0,0 +1,260 @@
+from langchain_core.documents import Document
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import uuid
+
+# 청크 ID 생성용 네임스페이스 (값이 바뀌면 기존 ID와 호환되지 않으므로 고정)
+CHUNK_ID_NAMESPACE = uuid.UUID("6f1c2b7e-3d5a-4c8e-9a41-0b7d2e6f5a13")
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+
+
+def file_sha256(file_path: str, block_size: int = 1 << 20) -> str:
+    """파일 내용의 SHA-256 해시를 계산합니다."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def chunk_hash(doc: Document) -> str:
+    """청크 본문과 메타데이터로 청크 해시를 계산합니다."""
+    payload = json.dumps(
+        {"content": doc.page_content, "metadata": doc.metadata},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ChunkIdAssigner:
+    """파일 하나의 청크를 순서대로 나누어 받아도 assign_chunk_ids()와 같은 ID를 만드는 클래스 (스트리밍 적재용)"""
+
+    def __init__(self, file_key: str):
+        self.file_key = file_key
+        self._seen: Dict[str, int] = {}
+
+    def assign(self, docs: List[Document]) -> List[str]:
+        ids = []
+        for doc in docs:
+            h = chunk_hash(doc)
+            occurrence = self._seen.get(h, 0)
+            self._seen[h] = occurrence + 1
+            ids.append(str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{self.file_key}:{h}:{occurrence}")))
+        return ids
+
+
+def assign_chunk_ids(file_key: str, docs: List[Document]) -> List[str]:
+    """파일 키와 청크 해시로 결정적인(deterministic) 청크 ID를 만듭니다.
+
+    같은 파일 안에 동일한 청크가 여러 번 나오면 등장 순서로 구분합니다.
+    """
+    return ChunkIdAssigner(file_key).assign(docs)
+
+
+class IngestManifest:
+    """적재된 파일 해시와 청크 ID를 기록하여 증분/재개 가능한 적재를 지원하는 클래스
+
+    파일별 상태는 다음 중 하나입니다.
+    - pending: 테이블 반영 중 (중단되었다면 기록된 ID의 행이 일부만 존재할 수 있음)
+    - done: 기록된 청크 ID가 모두 테이블에 반영됨
+
+    pending 파일의 ID는 적재 도중 계속 늘어나므로, 매니페스트 전체를 다시 쓰지 않고
+    저널 파일(<path>.pending)에 덧붙입니다. 저널은 load() 때 합쳐지고 flush() 때 비워집니다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table_name: str,
+        files: Optional[Dict[str, dict]] = None,
+        autosave: bool = True,
+    ):
+        self.path = path
+        self.table_name = table_name
+        self.files = files if files is not None else {}
+        # False이면 변경 시 자동 저장하지 않고 flush() 호출 시에만 저장
+        # (로컬 스냅샷처럼 저장 시점을 데이터와 맞춰야 하는 경우)
+        self.autosave = autosave
+
+    @classmethod
+    def load(cls, path: str, table_name: str, autosave: bool = True) -> "IngestManifest":
+        """매니페스트 파일을 읽어옵니다. 없거나 다른 테이블용이면 빈 매니페스트를 반환합니다."""
+        if not os.path.exists(path):
+            return cls(path, table_name, autosave=autosave)
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("table_name") != table_name:
+            return cls(path, table_name, autosave=autosave)
+        manifest = cls(path, table_name, data.get("files", {}), autosave=autosave)
+        manifest._replay_journal()
+        return manifest
+
+    @property
+    def journal_path(self) -> str:
+        return f"{self.path}.pending"
+
+    def _replay_journal(self):
+        """이전 실행이 저널에 덧붙인 pending ID를 합칩니다."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    # 쓰는 도중 중단된 마지막 줄 (이 줄의 ID는 아직 테이블에 쓰이지 않음)
+                    break
+                record = self.files.get(item["key"])
+                if record is not None and record.get("status") == STATUS_PENDING:
+                    known = set(record["chunk_ids"])
+                    record["chunk_ids"].extend(cid for cid in item["chunk_ids"] if cid not in known)
+
+    def save(self):
+        """autosave가 켜져 있으면 매니페스트를 저장합니다."""
+        if self.autosave:
+            self.flush()
+
+    def flush(self):
+        """매니페스트를 원자적으로(임시 파일 → rename) 저장합니다."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"table_name": self.table_name, "files": self.files},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
+        # 저널의 ID는 모두 매니페스트에 반영됨
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def reset(self):
+        """모든 파일 기록을 지웁니다. (전체 재적재 시 사용)"""
+        self.files = {}
+        self.save()
+
+    @staticmethod
+    def file_key(entry: dict) -> str:
+        """PDF 항목의 매니페스트 키(대분류/중분류/파일명)를 반환합니다."""
+        return f"{entry['main_category']}/{entry['sub_category']}/{entry['source']}"
+
+    def is_unchanged(self, entry: dict) -> bool:
+        """파일이 마지막 적재 이후 변경되지 않았는지 확인합니다.
+
+        크기와 수정 시각이 같으면 해시 계산을 생략하고, 다르면 해시로 비교합니다.
+        """
+        record = self.files.get(self.file_key(entry))
+        if record is None or record.get("status") != STATUS_DONE:
+            return False
+
+        stat = os.stat(entry["file_path"])
+        if record.get("size") == stat.st_size and record.get("mtime") == stat.st_mtime:
+            return True
+
+        if record.get("file_hash") != file_sha256(entry["file_path"]):
+            return False
+
+        # 내용은 같고 수정 시각만 바뀐 경우: 다음 실행에서 해시 계산을 건너뛰도록 갱신
+        record["size"] = stat.st_size
+        record["mtime"] = stat.st_mtime
+        return True
+
+    def removed_keys(self, pdf_entries: List[dict]) -> List[str]:
+        """매니페스트에는 있지만 더 이상 존재하지 않는 파일의 키 목록을 반환합니다."""
+        current = {self.file_key(entry) for entry in pdf_entries}
+        return [key for key in self.files if key not in current]
+
+    def chunk_ids(self, key: str) -> List[str]:
+        """파일에 기록된 청크 ID 목록을 반환합니다."""
+        record = self.files.get(key)
+        return list(record.get("chunk_ids", [])) if record else []
+
+    def is_pending(self, key: str) -> bool:
+        """이전 실행이 파일 반영 도중 중단되었는지 확인합니다."""
+        record = self.files.get(key)
+        return record is not None and record.get("status") == STATUS_PENDING
+
+    def mark_pending(self, entry: dict, chunk_ids: List[str]):
+        """파일 반영 시작을 기록합니다. chunk_ids에는 테이블에 존재할 수 있는 모든 ID를 넣습니다."""
+        key = self.file_key(entry)
+        record = self.files.get(key, {})
+        record.update({"status": STATUS_PENDING, "chunk_ids": chunk_ids})
+        self.files[key] = record
+        self.save()
+
+    def append_pending(self, entry: dict, chunk_ids: List[str]):
+        """pending 파일에 테이블에 존재할 수 있는 ID를 추가합니다. (매니페스트 전체 대신 저널에 덧붙여 저장)"""
+        key = self.file_key(entry)
+        self.files[key]["chunk_ids"].extend(chunk_ids)
+        if self.autosave:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "chunk_ids": chunk_ids}, ensure_ascii=False) + "\n")
+
+    def mark_done(
+        self, entry: dict, file_hash: str, chunk_ids: List[str], duplicates: Optional[List[list]] = None
+    ):
+        """파일 반영 완료를 기록합니다.
+
+        duplicates: 저장하지 않고 다른 청크로 대신한 중복 청크의 [대표 청크 ID, 페이지] 목록
+        """
+        stat = os.stat(entry["file_path"])
+        record = {
+            "status": STATUS_DONE,
+            "file_hash": file_hash,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "main_category": entry["main_category"],
+            "sub_category": entry["sub_category"],
+            "source": entry["source"],
+            "chunk_ids": chunk_ids,
+        }
+        if duplicates:
+            record["duplicates"] = duplicates
+        self.files[self.file_key(entry)] = record
+        self.save()
+
+    def duplicates(self, key: str) -> List[list]:
+        """파일에서 다른 청크로 대신한 중복 청크의 [대표 청크 ID, 페이지] 목록을 반환합니다."""
+        record = self.files.get(key)
+        return list(record.get("duplicates", [])) if record else []
+
+    def dependent_keys(self, keys: List[str]) -> List[str]:
+        """keys 파일의 청크를 대표 청크로 쓰는 다른 파일의 키 목록을 반환합니다.
+
+        keys 파일을 다시 적재하거나 삭제하면 대표 청크가 사라질 수 있으므로, 이 파일들도 다시 적재해야 합니다.
+        """
+        keys = set(keys)
+        owned = {cid for key in keys for cid in self.chunk_ids(key)}
+        return [
+            key for key in self.files
+            if key not in keys and any(canonical in owned for canonical, _ in self.duplicates(key))
+        ]
+
+    def provenance(self, canonical_ids) -> Dict[str, List[dict]]:
+        """대표 청크 ID별로, 그 청크로 대신한 중복 청크의 출처(대분류/중분류/파일명/페이지) 목록을 반환합니다."""
+        wanted = set(canonical_ids)
+        result: Dict[str, List[dict]] = {cid: [] for cid in wanted}
+        for record in self.files.values():
+            for canonical, page in record.get("duplicates", []):
+                if canonical in wanted:
+                    result[canonical].append({
+                        "main_category": record.get("main_category"),
+                        "sub_category": record.get("sub_category"),
+                        "source": record.get("source"),
+                        "page": page,
+                    })
+        return result
+
+    def remove(self, key: str):
+        """파일 기록을 삭제합니다."""
+        self.files.pop(key, None)
+        self.save()
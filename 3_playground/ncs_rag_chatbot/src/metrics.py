@@ -0,0 +1,248 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+import bisect
+import math
+import threading
+import time
+
+# 단계별 소요 시간(초) 히스토그램 버킷
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 개수(검색 문서 수, 도구 호출 횟수 등) 히스토그램 버킷
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+# 토큰 수 히스토그램 버킷
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 레이블이 맞지 않습니다. {sorted(labels)} != {sorted(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """누적 카운터"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """현재 값 게이지"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """버킷별 누적 개수, 합계, 개수를 기록하는 히스토그램"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 값 -> (버킷별 개수(+Inf 포함), 합계, 개수)
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """프로세스 안에서 메트릭을 모으고 Prometheus 텍스트 형식으로 출력하는 레지스트리"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """모든 메트릭을 Prometheus 텍스트 형식(0.0.4)으로 출력합니다."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram("rag_stage_seconds", "RAG 단계별 소요 시간(초)", ["stage"])
+REQUEST_SECONDS = REGISTRY.histogram("rag_request_seconds", "API 요청 처리 시간(초)", ["endpoint", "status"])
+RETRIEVED_DOCS = REGISTRY.histogram("rag_retrieved_docs", "검색으로 가져온 문서 수", ["source"], buckets=COUNT_BUCKETS)
+LLM_TOKENS = REGISTRY.histogram("rag_llm_tokens", "LLM 호출당 토큰 수", ["source", "kind"], buckets=TOKEN_BUCKETS)
+FILTER_USAGE = REGISTRY.counter("rag_filter_usage_total", "검색 필터 사용 횟수 (필터 컬럼 조합별)", ["source", "filter"])
+SEARCH_PLANS = REGISTRY.counter("rag_search_plans_total", "벡터 검색 계획 횟수 (exact/ann/default)", ["source", "mode"])
+PREFETCH_RESULTS = REGISTRY.counter("rag_prefetch_total", "에이전트 추측 검색 결과 (hit/miss/unused)", ["result"])
+TOOL_CACHE = REGISTRY.counter("rag_tool_cache_total", "도구 검색 결과 세션 메모 적중/미스", ["result"])
+EMPTY_FILTERS = REGISTRY.counter("rag_empty_filter_total", "패싯상 결과가 없어 검색 없이 반환한 필터 요청 수", ["source"])
+AGENT_ROUNDS = REGISTRY.histogram("rag_agent_tool_rounds", "에이전트 실행당 도구 호출 횟수", [], buckets=COUNT_BUCKETS)
+ADMISSION_ACTIVE = REGISTRY.gauge("rag_admission_active", "입장 제어기별 실행 중인 호출 수", ["limiter"])
+ADMISSION_QUEUE = REGISTRY.gauge("rag_admission_queue_depth", "입장 제어기별 대기 중인 호출 수", ["limiter"])
+ADMISSION_WAIT = REGISTRY.histogram("rag_admission_wait_seconds", "입장 제어기 대기 시간(초)", ["limiter"])
+ADMISSION_REJECTED = REGISTRY.counter("rag_admission_rejected_total", "입장 제어기 거절 횟수 (queue_full/deadline)", ["limiter", "reason"])
+UPSTREAM_RATE_LIMITED = REGISTRY.counter("rag_upstream_rate_limited_total", "LLM/임베딩 공급자 rate limit 오류 횟수", [])
+RESILIENCE_EVENTS = REGISTRY.counter("rag_resilience_total", "단계별 타임아웃/재시도/헤징 횟수 (timeout/retry/hedge/hedge_win)", ["stage", "event"])
+HEDGE_DELAY = REGISTRY.gauge("rag_hedge_delay_seconds", "단계별 헤징 요청 지연 시간(초, 최근 지연 시간 분위)", ["stage"])
+
+
+class AdmissionMetrics:
+    """AdmissionController의 observer: 실행/대기 수, 대기 시간, 거절 횟수를 ADMISSION_* 지표로 기록합니다."""
+
+    def update(self, name: str, active: int, queued: int):
+        ADMISSION_ACTIVE.set(active, limiter=name)
+        ADMISSION_QUEUE.set(queued, limiter=name)
+
+    def admitted(self, name: str, waited: float):
+        ADMISSION_WAIT.observe(waited, limiter=name)
+
+    def rejected(self, name: str, reason: str):
+        ADMISSION_REJECTED.inc(limiter=name, reason=reason)
+
+# 요청 단위 단계 기록 [(단계, 초)] (Server-Timing 헤더용)
+_request_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_spans", default=None)
+
+
+def start_request() -> List[Tuple[str, float]]:
+    """현재 요청(컨텍스트)의 단계 기록을 시작하고 기록 리스트를 반환합니다."""
+    spans: List[Tuple[str, float]] = []
+    _request_spans.set(spans)
+    return spans
+
+
+def record_stage(stage: str, seconds: float):
+    """단계 소요 시간을 히스토그램과 현재 요청 기록에 남깁니다."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((stage, seconds))
+
+
+@contextmanager
+def span(stage: str):
+    """with 블록의 소요 시간을 단계(stage)로 기록합니다. (async 코드 안에서도 사용 가능)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def filter_label(filt: Optional[dict]) -> str:
+    """필터의 컬럼 조합을 레이블 값으로 변환합니다. (예: main_category+sub_category, 없으면 none)"""
+    return "+".join(sorted(filt)) if filt else "none"
+
+
+def record_usage(message, source: str):
+    """LLM 응답 메시지의 usage_metadata(입력/출력 토큰 수)를 기록합니다."""
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return
+    LLM_TOKENS.observe(usage.get("input_tokens", 0), source=source, kind="input")
+    LLM_TOKENS.observe(usage.get("output_tokens", 0), source=source, kind="output")
+
+
+def server_timing_header(spans: List[Tuple[str, float]]) -> str:
+    """단계 기록을 Server-Timing 헤더 값으로 변환합니다. (같은 단계는 합산)"""
+    totals: Dict[str, float] = {}
+    for stage, seconds in spans:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items())
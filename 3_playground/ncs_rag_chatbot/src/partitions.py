@@ -0,0 +1,325 @@
+from langchain_postgres import Column
+from langchain_postgres.v2.indexes import QueryOptions
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import hashlib
+import math
+import os
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# 파티션 키로 쓸 수 있는 컬럼
+PARTITION_KEYS = ("main_category", "sub_category")
+
+# (대분류, 중분류)별 행 수를 기록하는 테이블 (적재 후 갱신, 검색 계획에 사용)
+PARTITION_STATS_TABLE = "partition_stats"
+
+# 필터에 걸리는 행이 이 수 이하이면 ANN 대신 정확한(exact) 검색
+EXACT_SCAN_MAX_ROWS = int(os.getenv("EXACT_SCAN_MAX_ROWS", "20000"))
+
+# 필터 선택도에 맞춰 늘리는 HNSW ef_search의 범위와 단계 (단계별로 저장소를 캐시하므로 값 종류를 제한)
+EF_SEARCH_STEPS = (40, 80, 160, 320, 640, 1000)
+
+# pgvector 0.8 이상의 반복 인덱스 스캔 사용 여부 (필터로 결과가 k개보다 적게 나오는 것을 방지)
+HNSW_ITERATIVE_SCAN = os.getenv("HNSW_ITERATIVE_SCAN", "false").lower() == "true"
+
+
+def partition_name(table_name: str, value: str) -> str:
+    """파티션 값(한글 분류명)으로 파티션 테이블 이름을 만듭니다. (식별자 길이 제한 때문에 해시 사용)"""
+    digest = hashlib.sha1(value.encode("utf-8")).hexdigest()[:10]
+    return f"{table_name}_p_{digest}"
+
+
+def _literal(value: str) -> str:
+    # DDL(FOR VALUES IN)에는 바인드 파라미터를 쓸 수 없으므로 문자열 리터럴로 이스케이프
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+async def acreate_partitioned_table(
+    engine: AsyncEngine,
+    table_name: str,
+    vector_size: int,
+    metadata_columns: List[Column],
+    partition_by: str,
+    overwrite: bool = False,
+):
+    """PGVectorStore와 같은 컬럼 구성의 LIST 파티션 테이블을 만듭니다. 이미 있으면 ProgrammingError가 발생합니다.
+
+    기본 키는 (langchain_id, 파티션 키)이고, 목록에 없는 값은 DEFAULT 파티션에 들어갑니다.
+    """
+    if partition_by not in PARTITION_KEYS:
+        raise ValueError(f"파티션 키로 쓸 수 없는 컬럼입니다: {partition_by}")
+
+    columns = ",\n".join(
+        f'"{col.name}" {col.data_type}{" NOT NULL" if not col.nullable or col.name == partition_by else ""}'
+        for col in metadata_columns
+    )
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        if overwrite:
+            await conn.execute(text(f'DROP TABLE IF EXISTS "{table_name}" CASCADE'))
+        await conn.execute(text(
+            f'CREATE TABLE "{table_name}" (\n'
+            '"langchain_id" UUID NOT NULL,\n'
+            '"content" TEXT NOT NULL,\n'
+            f'"embedding" vector({vector_size}) NOT NULL,\n'
+            f"{columns},\n"
+            '"langchain_metadata" JSON,\n'
+            f'PRIMARY KEY ("langchain_id", "{partition_by}")\n'
+            f') PARTITION BY LIST ("{partition_by}")'
+        ))
+        await conn.execute(text(f'CREATE TABLE "{table_name}_default" PARTITION OF "{table_name}" DEFAULT'))
+
+
+async def apartition_key(engine: AsyncEngine, table_name: str) -> Optional[str]:
+    """테이블의 파티션 키 컬럼을 반환합니다. 파티션 테이블이 아니면 None."""
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT a.attname FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0] "
+                "WHERE c.relname = :table_name"
+            ),
+            {"table_name": table_name},
+        )
+        return result.scalar_one_or_none()
+
+
+async def aensure_partitions(engine: AsyncEngine, table_name: str, partition_by: str, values: List[str]) -> List[str]:
+    """값별 파티션이 없으면 만들고, 새로 만든 파티션 값 목록을 반환합니다. (적재 전에 호출)"""
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table_name"
+            ),
+            {"table_name": table_name},
+        )
+        existing = {row[0] for row in result}
+
+    created = []
+    async with engine.begin() as conn:
+        for value in sorted(set(values)):
+            name = partition_name(table_name, value)
+            if name in existing:
+                continue
+            await conn.execute(text(
+                f'CREATE TABLE "{name}" PARTITION OF "{table_name}" FOR VALUES IN ({_literal(value)})'
+            ))
+            created.append(value)
+    return created
+
+
+async def arefresh_partition_stats(engine: AsyncEngine, table_name: str) -> Dict[Tuple[str, str], int]:
+    """테이블의 (대분류, 중분류)별 행 수를 다시 세어 기록하고 반환합니다. (적재 후 호출)"""
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{PARTITION_STATS_TABLE}" ('
+            "table_name VARCHAR NOT NULL, "
+            "main_category VARCHAR NOT NULL, "
+            "sub_category VARCHAR NOT NULL, "
+            "row_count BIGINT NOT NULL, "
+            "updated_at TIMESTAMPTZ NOT NULL DEFAULT now(), "
+            "PRIMARY KEY (table_name, main_category, sub_category))"
+        ))
+        await conn.execute(
+            text(f'DELETE FROM "{PARTITION_STATS_TABLE}" WHERE table_name = :table_name'),
+            {"table_name": table_name},
+        )
+        await conn.execute(
+            text(
+                f'INSERT INTO "{PARTITION_STATS_TABLE}" (table_name, main_category, sub_category, row_count) '
+                f"SELECT :table_name, COALESCE(main_category, ''), COALESCE(sub_category, ''), count(*) "
+                f'FROM "{table_name}" GROUP BY 2, 3'
+            ),
+            {"table_name": table_name},
+        )
+    return await aload_partition_stats(engine, table_name)
+
+
+async def aload_partition_stats(engine: AsyncEngine, table_name: str) -> Dict[Tuple[str, str], int]:
+    """기록된 (대분류, 중분류)별 행 수를 읽습니다. 기록이 없으면 빈 딕셔너리."""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(
+                text(
+                    f'SELECT main_category, sub_category, row_count FROM "{PARTITION_STATS_TABLE}" '
+                    "WHERE table_name = :table_name"
+                ),
+                {"table_name": table_name},
+            )
+        except ProgrammingError:
+            # 아직 통계를 기록한 적이 없음
+            return {}
+        return {(row[0], row[1]): row[2] for row in result}
+
+
+class ExactScanQueryOptions(QueryOptions):
+    """ANN 인덱스를 쓰지 않고 정확한 거리 순으로 정렬하도록 하는 검색 옵션
+
+    인덱스 스캔만 끄므로 메타데이터 B-tree 인덱스의 비트맵 스캔과 파티션 제외(pruning)는 그대로 사용합니다.
+    """
+
+    def to_parameter(self) -> List[str]:
+        return ["enable_indexscan = off"]
+
+    def to_string(self) -> str:
+        return "enable_indexscan = off"
+
+
+class FilteredHNSWQueryOptions(QueryOptions):
+    """필터 선택도에 맞춘 ef_search (+ 선택적으로 반복 인덱스 스캔) 검색 옵션"""
+
+    def __init__(self, ef_search: int, iterative_scan: bool = False):
+        self.ef_search = ef_search
+        self.iterative_scan = iterative_scan
+
+    def to_parameter(self) -> List[str]:
+        params = [f"hnsw.ef_search = {self.ef_search}"]
+        if self.iterative_scan:
+            params.append("hnsw.iterative_scan = relaxed_order")
+        return params
+
+    def to_string(self) -> str:
+        return ", ".join(self.to_parameter())
+
+
+class SearchPlan:
+    """필터 검색 계획
+
+    - mode: "exact"(정확 검색) / "ann"(ANN 인덱스) / "default"(통계 없음, 기본 검색)
+    - rows: 필터에 걸리는 행 수 추정치
+    - scanned: 파티션 제외 후 검색 대상 파티션의 행 수
+    - filter: 파티션 제외가 가능하도록 보강한 필터
+    """
+
+    def __init__(self, mode: str, filter: Optional[dict], rows: Optional[int] = None,
+                 scanned: Optional[int] = None, ef_search: Optional[int] = None):
+        self.mode = mode
+        self.filter = filter
+        self.rows = rows
+        self.scanned = scanned
+        self.ef_search = ef_search
+
+    def to_dict(self) -> dict:
+        return {"mode": self.mode, "rows": self.rows, "scanned": self.scanned, "ef_search": self.ef_search}
+
+
+def _values(cond) -> Optional[set]:
+    if isinstance(cond, dict):
+        if "$eq" in cond:
+            return {cond["$eq"]}
+        if "$in" in cond:
+            return set(cond["$in"])
+        return None
+    return {cond}
+
+
+class PartitionPlanner:
+    """적재 시 기록한 (대분류, 중분류)별 행 수로 필터 검색 방식을 정하는 클래스
+
+    필터에 걸리는 행이 exact_max_rows 이하이면 인덱스 없이 정확히 검색하고(작은 파티션/분류는 전부 훑어도 빠르고
+    k개를 확실히 채움), 그보다 크면 ANN 인덱스로 검색하되 파티션 안에서 필터가 거르는 비율만큼 ef_search를 늘립니다.
+    파티션 키가 아닌 분류로만 필터하면(예: 중분류 파티션에 대분류 필터) 파티션 키 $in 조건을 추가해 해당 파티션만 검색하게 합니다.
+    적재로 테이블이 바뀌면(generation 변경) 통계를 다시 읽습니다.
+    """
+
+    def __init__(
+        self,
+        exact_max_rows: int = EXACT_SCAN_MAX_ROWS,
+        iterative_scan: bool = HNSW_ITERATIVE_SCAN,
+        check_interval: float = 5.0,
+    ):
+        self.exact_max_rows = exact_max_rows
+        self.iterative_scan = iterative_scan
+        self.check_interval = check_interval
+        self.counts: Dict[Tuple[str, str], int] = {}
+        self.partition_by: Optional[str] = None
+        self.generation: Optional[int] = None
+        self._last_check = 0.0
+        self.plans: Dict[str, int] = {}
+
+    async def sync(
+        self,
+        fetch_generation: Callable[[], Awaitable[int]],
+        load: Callable[[], Awaitable[Tuple[Dict[Tuple[str, str], int], Optional[str]]]],
+    ):
+        """generation을 check_interval 간격으로 확인하고, 바뀌었으면 통계와 파티션 키를 다시 읽습니다."""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        generation = await fetch_generation()
+        if generation != self.generation:
+            self.counts, self.partition_by = await load()
+            self.generation = generation
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.counts.values())
+
+    def _matches(self, filter: dict) -> List[Tuple[str, str]]:
+        mains = _values(filter["main_category"]) if "main_category" in filter else None
+        subs = _values(filter["sub_category"]) if "sub_category" in filter else None
+        return [
+            (main, sub) for main, sub in self.counts
+            if (mains is None or main in mains) and (subs is None or sub in subs)
+        ]
+
+    def plan(self, filter: Optional[dict], k: int) -> SearchPlan:
+        """필터와 k로 검색 계획을 세웁니다."""
+        if not filter or not self.counts:
+            return self._count(SearchPlan("default", filter or None))
+
+        matched = self._matches(filter)
+        rows = sum(self.counts[pair] for pair in matched)
+
+        filter = dict(filter)
+        index = PARTITION_KEYS.index(self.partition_by) if self.partition_by in PARTITION_KEYS else None
+        if index is not None and self.partition_by not in filter and matched and set(filter) & set(PARTITION_KEYS):
+            # 파티션 키가 아닌 분류로만 필터해도 해당 파티션만 검색하도록 파티션 키 조건 추가
+            filter[self.partition_by] = {"$in": sorted({pair[index] for pair in matched})}
+
+        # 파티션 제외 후 남는 파티션의 행 수
+        if index is not None and self.partition_by in filter:
+            touched = {pair[index] for pair in matched}
+            scanned = sum(count for pair, count in self.counts.items() if pair[index] in touched)
+        else:
+            scanned = self.total_rows
+
+        if rows <= self.exact_max_rows:
+            return self._count(SearchPlan("exact", filter, rows, scanned))
+
+        # source/page 조건은 통계가 없으므로 선택도를 알 수 없음 → 최대값 사용
+        if set(filter) - {"main_category", "sub_category"}:
+            ef_search = EF_SEARCH_STEPS[-1]
+        else:
+            selectivity = rows / scanned if scanned else 1.0
+            needed = math.ceil(2 * k / max(selectivity, 1e-6))
+            ef_search = next((step for step in EF_SEARCH_STEPS if step >= needed), EF_SEARCH_STEPS[-1])
+        return self._count(SearchPlan("ann", filter, rows, scanned, ef_search))
+
+    def query_options(self, plan: SearchPlan) -> Optional[QueryOptions]:
+        """계획에 맞는 PGVectorStore 검색 옵션 (기본 검색이면 None)"""
+        if plan.mode == "exact":
+            return ExactScanQueryOptions()
+        if plan.mode == "ann":
+            return FilteredHNSWQueryOptions(plan.ef_search, self.iterative_scan)
+        return None
+
+    def _count(self, plan: SearchPlan) -> SearchPlan:
+        self.plans[plan.mode] = self.plans.get(plan.mode, 0) + 1
+        return plan
+
+    def stats(self) -> dict:
+        return {
+            "partition_by": self.partition_by,
+            "rows": self.total_rows,
+            "slices": len(self.counts),
+            "exact_max_rows": self.exact_max_rows,
+            "plans": dict(self.plans),
+        }
@@ -0,0 +1,428 @@
+from loader import DocumentLoader
+from splitter import DocumentSplitter
+from manifest import ChunkIdAssigner, IngestManifest, file_sha256
+from dedup import MinHasher, NearDuplicateIndex
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
+import asyncio
+import os
+import sys
+import time
+
+# 청크 하나의 임베딩 벡터가 차지하는 메모리 추정치 (1536차원 float 리스트, 원소당 약 32바이트)
+VECTOR_BYTES_ESTIMATE = 1536 * 32
+
+# 프로세스 풀 워커마다 한 번만 생성하는 분할기
+_worker_splitter: Optional[DocumentSplitter] = None
+# 중복 제거를 켠 경우에만 만드는 MinHash 서명 계산기
+_worker_hasher: Optional[MinHasher] = None
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int, dedup_params: Optional[dict] = None):
+    """프로세스 풀 워커 초기화: 분할기(와 MinHash 서명 계산기)를 미리 만들어 둡니다."""
+    global _worker_splitter, _worker_hasher
+    _worker_splitter = DocumentSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    if dedup_params is not None:
+        _worker_hasher = MinHasher(dedup_params["num_perm"], dedup_params["shingle"])
+
+
+def inspect_pdf(entry: dict):
+    """(프로세스 풀 워커) PDF의 해시와 문서 메타데이터, 페이지 라벨을 계산합니다. (본문은 읽지 않음)
+
+    Returns:
+        (entry, file_hash, 문서 메타데이터(total_pages 포함), 전체 페이지 라벨)
+    """
+    doc_metadata, page_labels = DocumentLoader(file_path=entry["file_path"]).document_info()
+    return entry, file_sha256(entry["file_path"]), doc_metadata, page_labels
+
+
+def parse_pdf_pages(
+    entry: dict,
+    start_page: int,
+    end_page: int,
+    doc_metadata: Optional[dict] = None,
+    page_labels: Optional[List[str]] = None,
+):
+    """(프로세스 풀 워커) PDF의 start_page ~ end_page(미포함) 페이지를 로드/분할하고 적재용 메타데이터를 채웁니다.
+
+    페이지를 하나씩 읽어 바로 분할하므로, 워커가 한 번에 들고 있는 데이터는 이 페이지 범위로 제한됩니다.
+    doc_metadata/page_labels(이 구간의 라벨)를 넘기면 구간마다 문서 정보를 다시 계산하지 않습니다.
+
+    중복 제거를 켰으면 청크별 MinHash 서명도 함께 계산합니다.
+
+    Returns:
+        (청크 리스트, 서명 리스트 또는 None, 소요 시간)
+    """
+    started = time.perf_counter()
+    splitter = _worker_splitter or DocumentSplitter()
+
+    pages = DocumentLoader(file_path=entry["file_path"]).lazy_load(start_page, end_page, doc_metadata, page_labels)
+    splits = []
+    # 메타데이터 추가 + null byte 제거
+    for doc in splitter.lazy_split_documents(pages):
+        doc.page_content = doc.page_content.replace("\x00", "")
+        doc.metadata["main_category"] = entry["main_category"]
+        doc.metadata["sub_category"] = entry["sub_category"]
+        doc.metadata["source"] = entry["source"]
+        doc.metadata["page"] = doc.metadata.get("page", 0)
+        splits.append(doc)
+
+    signatures = None
+    if _worker_hasher is not None:
+        signatures = [_worker_hasher.signature(doc.page_content) for doc in splits]
+    return splits, signatures, time.perf_counter() - started
+
+
+class MemoryBudget:
+    """처리 중인(큐 대기 + 임베딩/쓰기 중) 청크의 메모리 추정치를 max_bytes 이하로 제한하는 비동기 세마포어
+
+    한도를 넘으면 새 배치를 넣는 쪽(파싱 결과 분배)이 기다리므로, 파싱도 그만큼 멈춥니다.
+    처리 중인 것이 없으면 한도보다 큰 배치도 하나는 통과시킵니다.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.peak = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self, size: int):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.used == 0 or self.used + size <= self.max_bytes)
+            self.used += size
+            self.peak = max(self.peak, self.used)
+
+    async def release(self, size: int):
+        async with self._cond:
+            self.used -= size
+            self._cond.notify_all()
+
+
+class _FileState:
+    """적재 중인 파일 하나의 진행 상태"""
+
+    def __init__(self, entry: dict, file_hash: str, old_ids: List[str], was_pending: bool):
+        self.entry = entry
+        self.file_hash = file_hash
+        self.key = IngestManifest.file_key(entry)
+        self.old_ids = old_ids
+        # 이전 실행이 중단된 파일은 기존 행을 모두 지우고 다시 적재하므로 유지할 ID가 없음
+        self.old_set = set() if was_pending else set(old_ids)
+        self.assigner = ChunkIdAssigner(self.key)
+        # 테이블에 저장하는(유지 + 새로 추가) 청크 ID
+        self.new_ids: List[str] = []
+        # 저장하지 않고 다른 청크로 대신한 중복 청크의 [대표 청크 ID, 페이지]
+        self.duplicates: List[list] = []
+        # 매니페스트에 pending으로 기록한 ID (테이블에 존재할 수 있는 모든 ID)
+        self.recorded: Dict[str, None] = dict.fromkeys(old_ids)
+        self.buffer: list = []
+        self.pages = 0
+        self.added = 0
+        self.kept = 0
+        self.remaining = 0
+        self.dispatched = False
+
+
+class StageStats:
+    """파이프라인 단계별 처리량을 집계하는 클래스"""
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.units = 0
+        self.busy = 0.0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    def record(self, units: int, elapsed: float):
+        """처리 1건(units개 단위, elapsed초 소요)을 기록합니다."""
+        now = time.perf_counter()
+        if self.first_start is None:
+            self.first_start = now - elapsed
+        self.last_end = now
+        self.items += 1
+        self.units += units
+        self.busy += elapsed
+
+    @property
+    def wall(self) -> float:
+        if self.first_start is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    def summary(self) -> str:
+        rate = self.units / self.wall if self.wall > 0 else 0.0
+        return (
+            f"  {self.name:<6} {self.items:>6} items  {self.units:>8} {self.unit}  "
+            f"busy {self.busy:8.1f}s  wall {self.wall:8.1f}s  {rate:8.1f} {self.unit}/s"
+        )
+
+
+class IngestPipeline:
+    """PDF 파싱(프로세스 풀) → 청크 큐 → 임베딩/쓰기 워커로 이어지는 단계별 적재 파이프라인
+
+    - parse: CPU 작업인 PDF 로드/분할을 프로세스 풀에서 pages_per_task 페이지 단위로 병렬 수행
+    - embed / write: 네트워크 작업인 임베딩과 DB 쓰기를 embed_concurrency개의 비동기 워커가 수행
+    두 단계는 크기가 제한된 큐로 연결되어 서로를 기다리지 않고 겹쳐서 실행됩니다.
+
+    파일 전체를 한 번에 메모리에 올리지 않고 페이지 구간 단위로 읽어 배치로 흘려보내며,
+    처리 중인 청크의 메모리 추정치는 max_inflight_bytes를 넘지 않습니다.
+
+    writer를 지정하면(예: CopyWriter) 임베딩한 배치를 vector_store 대신 writer.aadd_embeddings로 쓰고,
+    embed_batch_size를 지정하면 쓰기 배치(batch_size)를 이 크기로 나누어 동시에 임베딩합니다.
+
+    dedup(NearDuplicateIndex)을 지정하면 분할과 임베딩 사이에서, 코퍼스 전체에 이미 저장된 청크와
+    거의 같은 청크는 임베딩/저장하지 않고 대표 청크의 중복 출처로만 기록합니다.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        embedding_model,
+        manifest: IngestManifest,
+        parse_workers: Optional[int] = None,
+        embed_concurrency: int = 4,
+        batch_size: int = 64,
+        queue_size: int = 16,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        pages_per_task: int = 16,
+        max_inflight_bytes: int = 256 * 1024 * 1024,
+        dedup: Optional[NearDuplicateIndex] = None,
+        writer=None,
+        embed_batch_size: Optional[int] = None,
+    ):
+        self.vector_store = vector_store
+        self.embedding_model = embedding_model
+        self.manifest = manifest
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.embed_concurrency = embed_concurrency
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.pages_per_task = max(1, pages_per_task)
+        self.max_inflight_bytes = max_inflight_bytes
+        self.dedup = dedup
+        self.writer = writer or vector_store
+        self.embed_batch_size = embed_batch_size or batch_size
+
+        self.stats = {
+            "parse": StageStats("parse", "chunks"),
+            "embed": StageStats("embed", "chunks"),
+            "write": StageStats("write", "chunks"),
+        }
+        self.added = 0
+        self.deduplicated = 0
+        # 중복 출처가 바뀐 대표 청크 ID (적재 후 메타데이터 갱신 대상)
+        self.touched: Set[str] = set()
+        self.budget: Optional[MemoryBudget] = None
+
+    async def run(self, entries: List[dict]) -> int:
+        """파이프라인을 실행하고 새로 임베딩한 청크 수를 반환합니다."""
+        if not entries:
+            return 0
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.budget = MemoryBudget(self.max_inflight_bytes)
+        if self.dedup is not None:
+            # 다시 적재하는 파일의 기존 청크는 지워질 수 있으므로, 어떤 파일도 그 청크를 대표로 쓰지 않도록 먼저 제거
+            # (유지되는 청크는 파일을 처리하면서 다시 등록)
+            for entry in entries:
+                self.dedup.remove_file(IngestManifest.file_key(entry))
+        with ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            initializer=_init_worker,
+            initargs=(self.chunk_size, self.chunk_overlap, self.dedup.params if self.dedup is not None else None),
+        ) as pool:
+            tasks = [asyncio.create_task(self._produce(pool, entries, queue))]
+            tasks += [asyncio.create_task(self._write_worker(queue)) for _ in range(self.embed_concurrency)]
+
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
+
+        self.report()
+        return self.added
+
+    def report(self):
+        """단계별 처리량과 처리 중 청크 메모리 최대치를 출력합니다."""
+        print("\nPipeline throughput:")
+        for stage in self.stats.values():
+            print(stage.summary())
+        if hasattr(self.writer, "summary"):
+            print(self.writer.summary())
+        if self.budget is not None:
+            print(
+                f"  peak in-flight memory {self.budget.peak / 1024 / 1024:.1f} MB "
+                f"(limit {self.max_inflight_bytes / 1024 / 1024:.0f} MB)"
+            )
+        if self.dedup is not None:
+            print(
+                f"  near-duplicates skipped {self.deduplicated} chunks "
+                f"(index {len(self.dedup)} chunks, threshold {self.dedup.threshold})"
+            )
+
+    async def _produce(self, pool: ProcessPoolExecutor, entries: List[dict], queue: asyncio.Queue):
+        """파일을 페이지 구간 단위로 프로세스 풀에서 파싱하고, 결과를 배치로 나누어 큐에 넣습니다."""
+        # 파싱이 끝났지만 아직 큐에 들어가지 못한 페이지 구간이 메모리에 쌓이지 않도록 동시 파싱 수를 제한
+        slots = asyncio.Semaphore(self.parse_workers * 2)
+        await asyncio.gather(*(self._ingest_file(pool, entry, queue, slots) for entry in entries))
+
+        # 모든 워커에게 종료 신호 전달
+        for _ in range(self.embed_concurrency):
+            await queue.put(None)
+
+    async def _ingest_file(
+        self,
+        pool: ProcessPoolExecutor,
+        entry: dict,
+        queue: asyncio.Queue,
+        slots: asyncio.Semaphore,
+    ):
+        """파일 하나를 페이지 구간 순서대로 파싱해 배치로 큐에 넣고, 오래된 청크를 지웁니다."""
+        loop = asyncio.get_running_loop()
+        entry, file_hash, doc_metadata, page_labels = await loop.run_in_executor(pool, inspect_pdf, entry)
+        total_pages = doc_metadata["total_pages"]
+
+        key = IngestManifest.file_key(entry)
+        was_pending = self.manifest.is_pending(key)
+        state = _FileState(entry, file_hash, self.manifest.chunk_ids(key), was_pending)
+        state.pages = total_pages
+        if was_pending and state.old_ids:
+            # 이전 실행이 도중에 중단됨: 기록된 행을 모두 지우고 다시 적재
+            await self.vector_store.adelete(ids=state.old_ids)
+        # 파일 반영 시작 기록 (매니페스트 전체 저장은 파일당 한 번, 구간별 새 ID는 _dispatch에서 저널에 덧붙임)
+        self.manifest.mark_pending(entry, list(state.recorded))
+
+        # 페이지 구간 제출(submit)과 순서대로 받기(consume)를 분리해야, 다른 파일이 슬롯을 모두 잡고 있어도
+        # 이미 제출한 구간은 끝까지 처리되어 슬롯이 반환됨
+        windows: asyncio.Queue = asyncio.Queue()
+
+        async def submit():
+            for start in range(0, total_pages, self.pages_per_task):
+                await slots.acquire()
+                end = min(start + self.pages_per_task, total_pages)
+                await windows.put(loop.run_in_executor(
+                    pool, parse_pdf_pages, entry, start, end, doc_metadata, page_labels[start:end]
+                ))
+            await windows.put(None)
+
+        submitter = asyncio.create_task(submit())
+        try:
+            while True:
+                future = await windows.get()
+                if future is None:
+                    break
+                try:
+                    splits, signatures, elapsed = await future
+                finally:
+                    slots.release()
+                self.stats["parse"].record(len(splits), elapsed)
+                await self._dispatch(state, splits, signatures, queue)
+            await submitter
+        finally:
+            if not submitter.done():
+                submitter.cancel()
+
+        # 남은 청크를 마지막 배치로
+        if state.buffer:
+            await self._enqueue(state, state.buffer, queue)
+            state.buffer = []
+
+        seen = set(state.new_ids)
+        stale_ids = [cid for cid in state.old_set if cid not in seen]
+        if stale_ids:
+            await self.vector_store.adelete(ids=stale_ids)
+        if was_pending:
+            stale_ids = state.old_ids
+
+        print(
+            f"  Parsed {entry['source']}: {total_pages} pages -> {len(state.new_ids)} chunks "
+            f"(+{state.added} / -{len(stale_ids)}, kept {state.kept}"
+            + (f", duplicates {len(state.duplicates)})" if self.dedup is not None else ")")
+        )
+
+        state.dispatched = True
+        if state.remaining == 0:
+            self._complete(state)
+
+    async def _dispatch(self, state: _FileState, splits: list, signatures: Optional[list], queue: asyncio.Queue):
+        """페이지 구간의 청크에 ID를 붙이고, 새 청크(중복 제외)를 batch_size 단위로 큐에 넣습니다."""
+        ids = state.assigner.assign(splits)
+
+        # 중단되더라도 다음 실행에서 정리할 수 있도록, 테이블에 쓰기 전에 새 ID를 먼저 기록
+        fresh = [cid for cid in dict.fromkeys(ids) if cid not in state.recorded]
+        if fresh:
+            state.recorded.update(dict.fromkeys(fresh))
+            self.manifest.append_pending(state.entry, fresh)
+
+        for i, (doc, cid) in enumerate(zip(splits, ids)):
+            signature = signatures[i] if signatures is not None else None
+            if cid in state.old_set:
+                state.kept += 1
+            elif signature is not None and (canonical := self.dedup.find(signature)) is not None:
+                # 이미 저장된(또는 저장 중인) 청크와 거의 같음: 임베딩/저장하지 않고 출처만 기록
+                state.duplicates.append([canonical, doc.metadata["page"]])
+                self.touched.add(canonical)
+                self.deduplicated += 1
+                continue
+            else:
+                state.buffer.append((doc, cid))
+            state.new_ids.append(cid)
+            if signature is not None:
+                self.dedup.add(cid, state.key, signature)
+
+        while len(state.buffer) >= self.batch_size:
+            batch, state.buffer = state.buffer[:self.batch_size], state.buffer[self.batch_size:]
+            await self._enqueue(state, batch, queue)
+
+    async def _enqueue(self, state: _FileState, batch: list, queue: asyncio.Queue):
+        """메모리 한도 안에서 배치를 큐에 넣습니다."""
+        size = sum(sys.getsizeof(doc.page_content) + VECTOR_BYTES_ESTIMATE for doc, _ in batch)
+        await self.budget.acquire(size)
+        state.remaining += 1
+        state.added += len(batch)
+        await queue.put((state, batch, size))
+
+    def _complete(self, state: _FileState):
+        self.manifest.mark_done(state.entry, state.file_hash, state.new_ids, state.duplicates)
+        print(f"  Done {state.entry['source']}")
+
+    async def _write_worker(self, queue: asyncio.Queue):
+        """큐에서 배치를 꺼내 임베딩하고 벡터 저장소에 씁니다."""
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+
+            state, batch, size = item
+            docs = [doc for doc, _ in batch]
+            ids = [cid for _, cid in batch]
+            texts = [doc.page_content for doc in docs]
+
+            started = time.perf_counter()
+            parts = await asyncio.gather(*(
+                self.embedding_model.aembed_documents(texts[i:i + self.embed_batch_size])
+                for i in range(0, len(texts), self.embed_batch_size)
+            ))
+            embeddings = [vector for part in parts for vector in part]
+            self.stats["embed"].record(len(texts), time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await self.writer.aadd_embeddings(
+                texts=texts,
+                embeddings=embeddings,
+                metadatas=[doc.metadata for doc in docs],
+                ids=ids,
+            )
+            self.stats["write"].record(len(texts), time.perf_counter() - started)
+            self.added += len(texts)
+            await self.budget.release(size)
+
+            state.remaining -= 1
+            if state.remaining == 0 and state.dispatched:
+                self._complete(state)
@@ -0,0 +1,397 @@
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from langchain_postgres import Column, PGEngine, PGVectorStore
+from langchain_postgres.v2.indexes import DEFAULT_INDEX_NAME_SUFFIX
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import math
+import os
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# 축소 차원으로 저장할 때 원본(전체 차원) 벡터를 보관하는 컬럼 (정확한 재정렬용)
+FULL_EMBEDDING_COLUMN = "embedding_full"
+
+# 1차 검색 벡터의 양자화 방식: none(float32) / halfvec(float16) / binary(부호 비트)
+QUANTIZATIONS = ("none", "halfvec", "binary")
+
+
+def truncate_embedding(embedding: List[float], dimensions: int) -> List[float]:
+    """임베딩의 앞 dimensions개 원소만 남기고 다시 정규화합니다.
+
+    text-embedding-3 계열은 앞쪽 차원에 정보가 몰리도록(Matryoshka) 학습되어 있어,
+    API의 dimensions 파라미터 결과와 같은 벡터를 전체 벡터에서 바로 만들 수 있습니다.
+    """
+    head = [float(x) for x in embedding[:dimensions]]
+    norm = math.sqrt(sum(x * x for x in head))
+    return [x / norm for x in head] if norm > 0 else head
+
+
+def _vector_literal(embedding: List[float]) -> str:
+    return str([float(x) for x in embedding])
+
+
+class VectorStorageConfig:
+    """벡터 저장 방식 설정 (1차 검색용 축소/양자화 벡터 + 원본 벡터 재정렬)
+
+    - dimensions: 1차 검색 벡터 차원 (None이면 전체 차원). 줄이면 embedding 컬럼에 축소 벡터를,
+      embedding_full 컬럼에 원본 벡터를 저장합니다.
+    - quantization: 1차 검색 인덱스의 벡터 형식. halfvec/binary는 embedding 컬럼의 식(expression) 인덱스로 만듭니다.
+    - oversample: 1차 검색에서 k * oversample개 후보를 가져와 원본 벡터 코사인 거리로 다시 정렬합니다.
+    """
+
+    def __init__(
+        self,
+        dimensions: Optional[int] = None,
+        quantization: str = "none",
+        full_dimensions: int = 1536,
+        oversample: int = 4,
+    ):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"지원하지 않는 양자화 방식입니다: {quantization}")
+        if dimensions is not None and not 0 < dimensions <= full_dimensions:
+            raise ValueError(f"dimensions는 1 ~ {full_dimensions} 사이여야 합니다: {dimensions}")
+        self.dimensions = dimensions if dimensions and dimensions < full_dimensions else None
+        self.quantization = quantization
+        self.full_dimensions = full_dimensions
+        self.oversample = max(1, oversample)
+
+    @classmethod
+    def from_env(cls, full_dimensions: int = 1536) -> "VectorStorageConfig":
+        """VECTOR_DIMENSIONS / VECTOR_QUANTIZATION / RERANK_OVERSAMPLE 환경 변수로 설정을 만듭니다."""
+        dimensions = os.getenv("VECTOR_DIMENSIONS")
+        return cls(
+            dimensions=int(dimensions) if dimensions else None,
+            quantization=os.getenv("VECTOR_QUANTIZATION", "none"),
+            full_dimensions=full_dimensions,
+            oversample=int(os.getenv("RERANK_OVERSAMPLE", "4")),
+        )
+
+    @property
+    def compact(self) -> bool:
+        """기본 저장 방식(전체 차원 float32)이 아닌지 여부"""
+        return self.dimensions is not None or self.quantization != "none"
+
+    @property
+    def search_dimensions(self) -> int:
+        """embedding 컬럼(1차 검색 벡터)의 차원"""
+        return self.dimensions or self.full_dimensions
+
+    @property
+    def rerank_column(self) -> str:
+        """재정렬에 사용할 원본 벡터 컬럼"""
+        return FULL_EMBEDDING_COLUMN if self.dimensions else "embedding"
+
+    def extra_columns(self) -> List[Column]:
+        """테이블 생성 시 추가할 컬럼 (축소 차원이면 원본 벡터 컬럼)"""
+        if not self.dimensions:
+            return []
+        return [Column(FULL_EMBEDDING_COLUMN, f"vector({self.full_dimensions})", nullable=True)]
+
+    def first_pass_expression(self, column: str = "embedding") -> str:
+        """1차 검색 정렬/인덱스에 쓰는 SQL 식 (인덱스 식과 정확히 같아야 인덱스를 사용함)"""
+        d = self.search_dimensions
+        if self.quantization == "halfvec":
+            return f'("{column}"::halfvec({d}))'
+        if self.quantization == "binary":
+            return f'(binary_quantize("{column}")::bit({d}))'
+        return f'"{column}"'
+
+    def query_expression(self, param: str) -> str:
+        """1차 검색 질의 벡터 SQL 식"""
+        d = self.search_dimensions
+        if self.quantization == "halfvec":
+            return f"CAST(:{param} AS halfvec({d}))"
+        if self.quantization == "binary":
+            return f"binary_quantize(CAST(:{param} AS vector({d})))::bit({d})"
+        return f"CAST(:{param} AS vector({d}))"
+
+    @property
+    def operator(self) -> str:
+        """1차 검색 거리 연산자 (binary는 해밍 거리, 나머지는 코사인 거리)"""
+        return "<~>" if self.quantization == "binary" else "<=>"
+
+    @property
+    def operator_class(self) -> str:
+        return {"none": "vector_cosine_ops", "halfvec": "halfvec_cosine_ops", "binary": "bit_hamming_ops"}[self.quantization]
+
+    def bytes_per_row(self) -> dict:
+        """행당 벡터 저장 크기 추정치 (1차 검색 인덱스 / 테이블)"""
+        d = self.search_dimensions
+        index = {"none": 4 * d, "halfvec": 2 * d, "binary": math.ceil(d / 8)}[self.quantization]
+        table = 4 * d + (4 * self.full_dimensions if self.dimensions else 0)
+        return {"index": index, "table": table}
+
+    def to_dict(self) -> dict:
+        return {
+            "dimensions": self.search_dimensions,
+            "full_dimensions": self.full_dimensions,
+            "quantization": self.quantization,
+            "oversample": self.oversample,
+        }
+
+
+class CompactVectorStore(VectorStore):
+    """축소/양자화 벡터로 1차 검색하고 원본 벡터로 정확히 재정렬하는 PGVectorStore 래퍼
+
+    검색/추가/삭제 메서드는 PGVectorStore와 같은 형태라서 서버, 도구, 하이브리드 검색에서 그대로 쓸 수 있습니다.
+    1차 검색(ANN 인덱스)과 재정렬은 쿼리 한 번(CTE)으로 DB 안에서 처리하므로 원본 벡터를 주고받지 않습니다.
+
+    내부 PGVectorStore는 embedding 컬럼을 전체 차원 float32 벡터로 보고 검색하므로 검색 메서드를 위임하지 않습니다.
+    as_retriever()는 아래 압축 검색을 쓰고, 압축 검색으로 처리할 수 없는 동기 검색/MMR은 NotImplementedError를 냅니다.
+    인덱스 관리 메서드(ais_valid_index/areindex/adrop_vector_index)만 내부 저장소로 넘깁니다.
+    """
+
+    def __init__(
+        self,
+        vector_store: PGVectorStore,
+        async_engine: AsyncEngine,
+        table_name: str,
+        config: VectorStorageConfig,
+        metadata_columns: Optional[List[str]] = None,
+        write_store: Optional[PGVectorStore] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        exact: bool = False,
+    ):
+        self.vector_store = vector_store
+        self.async_engine = async_engine
+        self.table_name = table_name
+        self.config = config
+        self.metadata_columns = list(metadata_columns or [])
+        # 원본 벡터 컬럼까지 쓰는 저장소 (검색용 저장소는 이 컬럼을 메타데이터로 돌려주지 않도록 제외)
+        self.write_store = write_store or vector_store
+        self.ef_search = ef_search
+        self.probes = probes
+        # True면 1차 검색 없이 원본 벡터로 정확히 검색 (필터에 걸리는 행이 적을 때)
+        self.exact = exact
+        self._option_stores: Dict[Tuple[Optional[int], Optional[int], bool], "CompactVectorStore"] = {}
+
+    @classmethod
+    async def create(
+        cls,
+        engine: PGEngine,
+        async_engine: AsyncEngine,
+        table_name: str,
+        embedding_service,
+        config: VectorStorageConfig,
+        metadata_columns: Optional[List[str]] = None,
+    ) -> "CompactVectorStore":
+        kwargs = {"metadata_columns": metadata_columns} if metadata_columns else {}
+        vector_store = await PGVectorStore.create(
+            engine=engine, table_name=table_name, embedding_service=embedding_service, **kwargs
+        )
+        write_store = None
+        if config.dimensions:
+            write_store = await PGVectorStore.create(
+                engine=engine,
+                table_name=table_name,
+                embedding_service=embedding_service,
+                metadata_columns=list(metadata_columns or []) + [FULL_EMBEDDING_COLUMN],
+            )
+        return cls(vector_store, async_engine, table_name, config, metadata_columns, write_store)
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding, metadatas: Optional[List[dict]] = None, **kwargs: Any):
+        raise NotImplementedError("CompactVectorStore.create()로 만든 뒤 aadd_texts()를 사용하세요.")
+
+    @property
+    def embeddings(self):
+        return self.vector_store.embeddings
+
+    def with_options(
+        self, ef_search: Optional[int] = None, probes: Optional[int] = None, exact: bool = False
+    ) -> "CompactVectorStore":
+        """검색 옵션(HNSW ef_search / IVFFlat probes / 정확 검색)이 적용된 저장소를 반환합니다."""
+        if ef_search is None and probes is None and not exact:
+            return self
+        key = (ef_search, probes, exact)
+        if key not in self._option_stores:
+            self._option_stores[key] = CompactVectorStore(
+                self.vector_store, self.async_engine, self.table_name, self.config,
+                self.metadata_columns, self.write_store, ef_search=ef_search, probes=probes, exact=exact,
+            )
+        return self._option_stores[key]
+
+    # ─── 쓰기 ─────────────────────────────────────────────
+
+    async def aadd_embeddings(self, texts, embeddings, metadatas=None, ids=None, **kwargs) -> List[str]:
+        """원본 임베딩을 받아 1차 검색용 축소 벡터와 (축소 차원이면) 원본 벡터 컬럼을 함께 저장합니다."""
+        dimensions = self.config.dimensions
+        if not dimensions:
+            return await self.vector_store.aadd_embeddings(texts, embeddings, metadatas=metadatas, ids=ids, **kwargs)
+
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        return await self.write_store.aadd_embeddings(
+            texts,
+            [truncate_embedding(e, dimensions) for e in embeddings],
+            metadatas=[{**m, FULL_EMBEDDING_COLUMN: _vector_literal(e)} for m, e in zip(metadatas, embeddings)],
+            ids=ids,
+            **kwargs,
+        )
+
+    async def aadd_texts(self, texts, metadatas=None, ids=None, **kwargs) -> List[str]:
+        texts = list(texts)
+        embeddings = await self.embeddings.aembed_documents(texts)
+        return await self.aadd_embeddings(texts, embeddings, metadatas=metadatas, ids=ids, **kwargs)
+
+    async def aadd_documents(self, documents: List[Document], **kwargs) -> List[str]:
+        return await self.aadd_texts(
+            [doc.page_content for doc in documents],
+            metadatas=[doc.metadata for doc in documents],
+            ids=[doc.id for doc in documents],
+            **kwargs,
+        )
+
+    async def adelete(self, ids: Optional[List[str]] = None, **kwargs) -> Optional[bool]:
+        return await self.vector_store.adelete(ids=ids, **kwargs)
+
+    # ─── 인덱스 ───────────────────────────────────────────
+
+    @property
+    def index_name(self) -> str:
+        # PGVectorStore 기본 인덱스 이름과 같게 만들어 ais_valid_index/areindex/adrop_vector_index를 그대로 사용
+        return self.table_name + DEFAULT_INDEX_NAME_SUFFIX
+
+    async def ais_valid_index(self, index_name: Optional[str] = None) -> bool:
+        return await self.vector_store.ais_valid_index(index_name)
+
+    async def areindex(self, index_name: Optional[str] = None):
+        await self.vector_store.areindex(index_name)
+
+    async def adrop_vector_index(self, index_name: Optional[str] = None):
+        await self.vector_store.adrop_vector_index(index_name)
+
+    async def aapply_index(
+        self,
+        kind: str = "hnsw",
+        m: int = 16,
+        ef_construction: int = 64,
+        lists: int = 100,
+        concurrently: bool = False,
+    ):
+        """1차 검색 식(축소/양자화 벡터)에 ANN 인덱스를 생성합니다."""
+        if kind == "hnsw":
+            params = f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)})"
+        elif kind == "ivfflat":
+            params = f"WITH (lists = {int(lists)})"
+        else:
+            raise ValueError(f"지원하지 않는 인덱스 종류입니다: {kind}")
+
+        stmt = (
+            f'CREATE INDEX {"CONCURRENTLY" if concurrently else ""} "{self.index_name}" '
+            f'ON "{self.table_name}" USING {kind} '
+            f"({self.config.first_pass_expression()} {self.config.operator_class}) {params}"
+        )
+        async with self.async_engine.connect() as conn:
+            if concurrently:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(stmt))
+            if not concurrently:
+                await conn.commit()
+
+    # ─── 검색 ─────────────────────────────────────────────
+
+    async def asimilarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs
+    ) -> List[Tuple[Document, float]]:
+        """k * oversample개 후보를 1차 검색한 뒤 원본 벡터 코사인 거리로 재정렬해 상위 k개를 반환합니다."""
+        # 순환 import 방지
+        from vector_store import CONTENT_COLUMN, ID_COLUMN, METADATA_JSON_COLUMN, build_filter_clause, row_to_document
+
+        config = self.config
+        fetch_k = k * config.oversample
+        params = {
+            "first_query": _vector_literal(truncate_embedding(embedding, config.search_dimensions)),
+            "full_query": _vector_literal(embedding),
+            "fetch_k": fetch_k,
+            "k": k,
+        }
+        where, filter_params = build_filter_clause(filter, self.metadata_columns)
+        params.update(filter_params)
+
+        columns = [ID_COLUMN, CONTENT_COLUMN, METADATA_JSON_COLUMN] + self.metadata_columns
+        select_columns = ", ".join(f'"{col}"' for col in columns)
+        if self.exact:
+            return await self._aexact_search(select_columns, where, params)
+        stmt = (
+            f"WITH candidates AS ("
+            f'SELECT {select_columns}, "{config.rerank_column}" AS rerank_vector FROM "{self.table_name}" '
+            f'{"WHERE " + where if where else ""} '
+            f"ORDER BY {config.first_pass_expression()} {config.operator} {config.query_expression('first_query')} "
+            f"LIMIT :fetch_k) "
+            f"SELECT {select_columns}, "
+            f"rerank_vector <=> CAST(:full_query AS vector({config.full_dimensions})) AS distance "
+            f"FROM candidates ORDER BY distance LIMIT :k"
+        )
+
+        async with self.async_engine.connect() as conn:
+            # HNSW는 ef_search개까지만 후보를 돌려주므로 over-fetch 수 이상으로 설정
+            ef_search = max(self.ef_search or 40, fetch_k)
+            await conn.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+            if self.probes is not None:
+                await conn.execute(text(f"SET LOCAL ivfflat.probes = {int(self.probes)}"))
+            result = await conn.execute(text(stmt), params)
+            rows = result.mappings().fetchall()
+        return [(row_to_document(row, self.metadata_columns), float(row["distance"])) for row in rows]
+
+    async def _aexact_search(self, select_columns: str, where: str, params: dict) -> List[Tuple[Document, float]]:
+        """1차 검색 없이 원본 벡터 거리로 필터에 걸리는 행 전체를 정렬합니다."""
+        from vector_store import row_to_document
+
+        stmt = (
+            f'SELECT {select_columns}, "{self.config.rerank_column}" <=> '
+            f"CAST(:full_query AS vector({self.config.full_dimensions})) AS distance "
+            f'FROM "{self.table_name}" {"WHERE " + where if where else ""} ORDER BY distance LIMIT :k'
+        )
+        async with self.async_engine.connect() as conn:
+            await conn.execute(text("SET LOCAL enable_indexscan = off"))
+            result = await conn.execute(text(stmt), params)
+            rows = result.mappings().fetchall()
+        return [(row_to_document(row, self.metadata_columns), float(row["distance"])) for row in rows]
+
+    async def asimilarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs
+    ) -> List[Document]:
+        results = await self.asimilarity_search_with_score_by_vector(embedding, k=k, filter=filter, **kwargs)
+        return [doc for doc, _ in results]
+
+    async def asimilarity_search(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs
+    ) -> List[Document]:
+        embedding = await self.embeddings.aembed_query(query)
+        return await self.asimilarity_search_by_vector(embedding, k=k, filter=filter, **kwargs)
+
+    async def asimilarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs
+    ) -> List[Tuple[Document, float]]:
+        embedding = await self.embeddings.aembed_query(query)
+        return await self.asimilarity_search_with_score_by_vector(embedding, k=k, filter=filter, **kwargs)
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # 재정렬 거리는 항상 원본 벡터의 코사인 거리
+        return self._cosine_relevance_score_fn
+
+    # ─── 지원하지 않는 검색 ────────────────────────────────
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        raise NotImplementedError("CompactVectorStore는 비동기 검색(asimilarity_search, retriever.ainvoke)만 지원합니다.")
+
+    def similarity_search_with_score(self, *args, **kwargs) -> List[Tuple[Document, float]]:
+        raise NotImplementedError("CompactVectorStore는 비동기 검색(asimilarity_search_with_score)만 지원합니다.")
+
+    def similarity_search_by_vector(self, *args, **kwargs) -> List[Document]:
+        raise NotImplementedError("CompactVectorStore는 비동기 검색(asimilarity_search_by_vector)만 지원합니다.")
+
+    async def amax_marginal_relevance_search(self, *args, **kwargs) -> List[Document]:
+        # MMR은 후보의 원본 벡터가 필요한데 압축 검색은 거리만 돌려줌
+        raise NotImplementedError("CompactVectorStore는 MMR 검색을 지원하지 않습니다.")
+
+    async def amax_marginal_relevance_search_by_vector(self, *args, **kwargs) -> List[Document]:
+        raise NotImplementedError("CompactVectorStore는 MMR 검색을 지원하지 않습니다.")
+
+    def max_marginal_relevance_search(self, *args, **kwargs) -> List[Document]:
+        raise NotImplementedError("CompactVectorStore는 MMR 검색을 지원하지 않습니다.")
+
+    def max_marginal_relevance_search_by_vector(self, *args, **kwargs) -> List[Document]:
+        raise NotImplementedError("CompactVectorStore는 MMR 검색을 지원하지 않습니다.")
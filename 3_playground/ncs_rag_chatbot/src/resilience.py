@@ -0,0 +1,321 @@
+from langchain_core.embeddings import Embeddings
+from admission import remaining
+from metrics import HEDGE_DELAY, RESILIENCE_EVENTS
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, TypeVar
+import asyncio
+import openai
+import os
+import random
+import time
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+T = TypeVar("T")
+
+# 단계별 기본 (시도당 타임아웃(초), 재시도 횟수). {STAGE}_TIMEOUT / {STAGE}_RETRIES 환경 변수로 변경
+# LLM은 클라이언트가 자체 재시도를 하므로 기본 0회 (스트리밍은 첫 토큰 전까지만 재시도)
+# 시도는 요청 마감(서버 REQUEST_DEADLINE 기본 30초)까지만 기다리므로 LLM 타임아웃도 같은 30초로 둠
+DEFAULT_POLICIES = {
+    "embed": (10.0, 2),
+    "search": (5.0, 1),
+    "llm": (30.0, 0),
+}
+
+# 재시도할 수 있는 일시적 오류 (rate limit은 재시도하지 않고 입장 제어/503으로 넘김)
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+    OperationalError,
+    InterfaceError,
+)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, StageTimeout):
+        # 안쪽 단계가 이미 타임아웃/재시도를 모두 쓴 결과 (asyncio.TimeoutError의 하위 클래스라 따로 제외)
+        return False
+    if isinstance(exc, RETRYABLE_ERRORS):
+        return True
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
+
+
+class StageTimeout(asyncio.TimeoutError):
+    """단계 타임아웃(재시도 포함)을 넘김 → 504"""
+
+    def __init__(self, stage: str, timeout: Optional[float]):
+        limit = f"{timeout:.1f}초" if timeout is not None else "요청 마감"
+        super().__init__(f"{stage} 단계가 {limit} 안에 끝나지 않았습니다.")
+        self.stage = stage
+        self.timeout = timeout
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, "true" if default else "false").lower() in ("1", "true", "yes")
+
+
+class StagePolicy:
+    """단계(임베딩/검색/LLM)별 타임아웃, 재시도, 헤징 설정
+
+    - timeout: 시도 한 번의 제한 시간(초, None이면 제한 없음). 요청 마감이 더 가까우면 마감까지만 기다림
+    - retries: 일시적 오류/타임아웃 후 다시 시도할 횟수. 대기는 full jitter 지수 백오프
+      (0 ~ min(max_backoff, backoff * 2^시도) 사이 무작위)
+    - hedge: 최근 지연 시간의 hedge_quantile 분위(최소 hedge_min_delay초)가 지나도 끝나지 않으면
+      같은 요청을 한 번 더 보내 먼저 끝난 결과를 사용 (최근 기록이 hedge_min_samples개 이상일 때만)
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        retries: int = 0,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.05,
+        hedge_min_samples: int = 20,
+    ):
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+
+    @classmethod
+    def from_env(cls, prefix: str, timeout: float, retries: int, hedge: bool = False) -> "StagePolicy":
+        """{prefix}_TIMEOUT / {prefix}_RETRIES / {prefix}_HEDGE 환경 변수(없으면 인자 기본값)로 설정을 만듭니다.
+
+        백오프/헤징 세부 값은 단계 공통 RETRY_BACKOFF / RETRY_MAX_BACKOFF / HEDGE_QUANTILE / HEDGE_MIN_DELAY를 씁니다.
+        """
+        return cls(
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT", str(timeout))),
+            retries=int(os.getenv(f"{prefix}_RETRIES", str(retries))),
+            backoff=float(os.getenv("RETRY_BACKOFF", "0.1")),
+            max_backoff=float(os.getenv("RETRY_MAX_BACKOFF", "2.0")),
+            hedge=_env_flag(f"{prefix}_HEDGE", hedge),
+            hedge_quantile=float(os.getenv("HEDGE_QUANTILE", "0.95")),
+            hedge_min_delay=float(os.getenv("HEDGE_MIN_DELAY", "0.05")),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "timeout": self.timeout,
+            "retries": self.retries,
+            "hedge": self.hedge,
+            "hedge_quantile": self.hedge_quantile if self.hedge else None,
+        }
+
+
+class LatencyTracker:
+    """최근 window개 호출의 지연 시간(초) 분위 추정"""
+
+    def __init__(self, window: int = 256):
+        self._samples: deque = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _consume(task: asyncio.Task):
+    # 취소되지 않고 실패한 헤징 작업의 예외를 회수 (never retrieved 경고 방지)
+    if not task.cancelled():
+        task.exception()
+
+
+async def _aclose(iterator):
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception:
+            pass
+
+
+class Resilience:
+    """한 단계의 비동기 호출에 StagePolicy(타임아웃/재시도/헤징)를 적용하는 실행기"""
+
+    def __init__(self, stage: str, policy: StagePolicy):
+        self.stage = stage
+        self.policy = policy
+        self.latency = LatencyTracker()
+        self.counts = {"timeout": 0, "retry": 0, "hedge": 0, "hedge_win": 0}
+
+    @classmethod
+    def from_env(cls, stage: str) -> "Resilience":
+        """DEFAULT_POLICIES의 기본값과 {STAGE}_* 환경 변수로 단계 실행기를 만듭니다."""
+        timeout, retries = DEFAULT_POLICIES[stage]
+        return cls(stage, StagePolicy.from_env(stage.upper(), timeout=timeout, retries=retries))
+
+    def _event(self, event: str):
+        self.counts[event] += 1
+        RESILIENCE_EVENTS.inc(stage=self.stage, event=event)
+
+    def _attempt_timeout(self) -> Optional[float]:
+        """이번 시도의 제한 시간: 단계 타임아웃과 요청 마감까지 남은 시간 중 짧은 쪽"""
+        left = remaining()
+        if left is None:
+            return self.policy.timeout
+        if left <= 0:
+            raise StageTimeout(self.stage, None)
+        return left if self.policy.timeout is None else min(self.policy.timeout, left)
+
+    def hedge_delay(self) -> Optional[float]:
+        """헤징 요청을 보낼 때까지 기다릴 시간 (헤징을 하지 않으면 None)"""
+        if not self.policy.hedge or len(self.latency) < self.policy.hedge_min_samples:
+            return None
+        delay = max(self.policy.hedge_min_delay, self.latency.quantile(self.policy.hedge_quantile))
+        HEDGE_DELAY.set(delay, stage=self.stage)
+        return delay
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.policy.max_backoff, self.policy.backoff * (2 ** attempt)))
+
+    async def _retry_or_raise(self, attempt: int, exc: BaseException, timeout: Optional[float]):
+        """재시도할 수 있으면 백오프만큼 기다리고, 아니면 예외를 다시 발생시킵니다."""
+        # 요청 마감 때문에 짧아진 시도였으면 단계 타임아웃 대신 요청 마감으로 보고
+        limit = timeout if timeout == self.policy.timeout else None
+        if attempt >= self.policy.retries or not is_retryable(exc):
+            if isinstance(exc, asyncio.TimeoutError) and not isinstance(exc, StageTimeout):
+                raise StageTimeout(self.stage, limit) from exc
+            raise exc
+        delay = self._backoff(attempt)
+        left = remaining()
+        # 백오프 후 마감을 넘기면 재시도하지 않음. 타임아웃된 시도는 단계 타임아웃 전체를 다시 쓸 수 있을 때만 재시도
+        # (남은 시간이 더 짧으면 같은 호출이 더 짧은 제한 시간으로 다시 타임아웃될 가능성이 큼)
+        needed = delay + (self.policy.timeout or 0.0) if isinstance(exc, asyncio.TimeoutError) else delay
+        if left is not None and left <= needed:
+            raise StageTimeout(self.stage, limit) from exc
+        self._event("retry")
+        await asyncio.sleep(delay)
+
+    async def call(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """factory()로 만든 코루틴을 실행합니다. (시도마다 새 코루틴이 필요하므로 함수를 받음)"""
+        attempt = 0
+        while True:
+            timeout = self._attempt_timeout()
+            try:
+                return await asyncio.wait_for(self._hedged(factory), timeout)
+            except asyncio.TimeoutError as e:
+                self._event("timeout")
+                if timeout is not None:
+                    # 타임아웃된 호출도 지연 시간 분위에 반영 (느려질 때 헤징 지연이 따라 늘도록)
+                    self.latency.observe(timeout)
+                await self._retry_or_raise(attempt, e, timeout)
+            except Exception as e:
+                await self._retry_or_raise(attempt, e, timeout)
+            attempt += 1
+
+    async def _hedged(self, factory: Callable[[], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        delay = self.hedge_delay()
+        if delay is None:
+            result = await factory()
+            self.latency.observe(time.monotonic() - started)
+            return result
+
+        primary = asyncio.ensure_future(factory())
+        primary.add_done_callback(_consume)
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self._event("hedge")
+                hedge = asyncio.ensure_future(factory())
+                hedge.add_done_callback(_consume)
+                pending.add(hedge)
+
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._event("hedge_win")
+                        self.latency.observe(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # 늦게 끝나는 쪽은 취소 (타임아웃으로 이 코루틴이 취소될 때도)
+            for task in pending:
+                task.cancel()
+
+    async def astream(self, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """스트림을 실행합니다. 첫 청크 전까지는 타임아웃/재시도를 적용하고, 이후에는 청크 간격에만 타임아웃을 적용합니다.
+
+        이미 전송한 청크를 되돌릴 수 없으므로 첫 청크 이후의 오류는 재시도하지 않습니다.
+        """
+        attempt = 0
+        while True:
+            timeout = self._attempt_timeout()
+            iterator = factory().__aiter__()
+            try:
+                first = await asyncio.wait_for(iterator.__anext__(), timeout)
+                break
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError as e:
+                self._event("timeout")
+                await _aclose(iterator)
+                await self._retry_or_raise(attempt, e, timeout)
+            except Exception as e:
+                await _aclose(iterator)
+                await self._retry_or_raise(attempt, e, timeout)
+            attempt += 1
+
+        yield first
+        while True:
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), self.policy.timeout)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError as e:
+                self._event("timeout")
+                raise StageTimeout(self.stage, self.policy.timeout) from e
+            yield chunk
+
+    def stats(self) -> dict:
+        p95 = self.latency.quantile(0.95)
+        delay = self.hedge_delay()
+        return {
+            "policy": self.policy.to_dict(),
+            "events": dict(self.counts),
+            "samples": len(self.latency),
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+        }
+
+
+class ResilientEmbeddings(Embeddings):
+    """임베딩 모델의 비동기 호출에 Resilience(타임아웃/재시도/헤징)를 적용하는 래퍼"""
+
+    def __init__(self, underlying: Embeddings, resilience: Resilience):
+        self.underlying = underlying
+        self.resilience = resilience
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.resilience.call(lambda: self.underlying.aembed_documents(texts))
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.resilience.call(lambda: self.underlying.aembed_query(text))
@@ -0,0 +1,137 @@
+from langchain_core.documents import Document
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import re
+
+# NCS 능력단위/학습모듈 코드 (예: LM2001020101, 2001020101_16v4)
+NCS_CODE_PATTERN = re.compile(r"(?<![0-9A-Za-z])(?:[A-Za-z]{2})?\d{8,12}(?:_\d{2}v\d+)?(?![0-9A-Za-z])")
+# 어휘 검색에 사용할 단어 (영숫자/한글만 남겨 LIKE 와일드카드가 섞이지 않도록 함)
+TERM_PATTERN = re.compile(r"[0-9A-Za-z가-힣]{2,}")
+# 단어 끝에서 떼어낼 조사 (긴 것부터 검사)
+PARTICLES = ("에서", "으로", "의", "를", "을", "은", "는", "이", "가", "에", "로", "와", "과", "도")
+# 검색 의미가 거의 없는 질의 표현
+STOPWORDS = {"알려줘", "알려주세요", "설명해줘", "무엇", "뭐야", "대해", "대한", "관련", "내용", "어떻게", "있어", "해줘"}
+
+CODE_WEIGHT = 3.0
+TERM_WEIGHT = 1.0
+
+
+def extract_codes(query: str) -> List[str]:
+    """질의에서 NCS 코드를 추출합니다."""
+    return list(dict.fromkeys(m.group(0) for m in NCS_CODE_PATTERN.finditer(query)))
+
+
+def strip_particle(word: str) -> str:
+    """한글 단어 끝의 조사를 떼어냅니다. (남는 부분이 2글자 이상일 때만)"""
+    for particle in PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= 2:
+            return word[:-len(particle)]
+    return word
+
+
+def extract_terms(query: str, max_terms: int = 6) -> Dict[str, float]:
+    """질의에서 어휘 검색어와 가중치를 추출합니다. (NCS 코드는 높은 가중치)"""
+    terms = {code: CODE_WEIGHT for code in extract_codes(query)}
+    words = [strip_particle(w) for w in TERM_PATTERN.findall(query) if w not in STOPWORDS and w not in terms]
+    words = [w for w in words if w not in STOPWORDS]
+    # 긴 단어일수록 변별력이 높으므로 우선
+    for word in sorted(dict.fromkeys(words), key=len, reverse=True)[:max(0, max_terms - len(terms))]:
+        terms[word] = TERM_WEIGHT
+    return terms
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Document]], k: int, rrf_k: int = 60) -> List[Document]:
+    """여러 검색 결과를 Reciprocal Rank Fusion(1 / (rrf_k + 순위)) 점수로 합쳐 상위 k개를 반환합니다."""
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = doc.id or doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            docs.setdefault(key, doc)
+    ranked = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [docs[key] for key in ranked[:k]]
+
+
+class HybridRetriever:
+    """어휘(본문/파일명 부분 문자열) 검색과 벡터 검색을 함께 사용하는 하이브리드 검색기
+
+    - 질의에 NCS 코드가 있으면 어휘 검색을 먼저 수행하고, 결과가 결정적이면(모든 코드가 포함된 문서가 있으면)
+      임베딩 호출과 벡터 검색 없이 바로 반환합니다.
+    - 그 외에는 어휘 검색과 벡터 검색을 동시에 실행하고 RRF로 합칩니다.
+    """
+
+    def __init__(self, manager, rrf_k: int = 60, lexical_fetch_factor: int = 2):
+        self.manager = manager
+        self.rrf_k = rrf_k
+        self.lexical_fetch_factor = lexical_fetch_factor
+
+    async def alexical_search(self, query: str, k: int = 4, filter: Optional[dict] = None) -> List[Document]:
+        """질의에서 추출한 검색어로 어휘 검색을 수행합니다."""
+        return await self.manager.alexical_search(extract_terms(query), k=k * self.lexical_fetch_factor, filter=filter or None)
+
+    @staticmethod
+    def decisive_docs(query: str, docs: List[Document]) -> List[Document]:
+        """질의의 NCS 코드를 모두 포함하는(본문 또는 파일명) 문서만 반환합니다. 코드가 없으면 빈 리스트."""
+        codes = [code.lower() for code in extract_codes(query)]
+        if not codes:
+            return []
+        return [
+            doc for doc in docs
+            if all(
+                code in doc.page_content.lower() or code in str(doc.metadata.get("source", "")).lower()
+                for code in codes
+            )
+        ]
+
+    async def aprefilter(self, query: str, k: int = 4, filter: Optional[dict] = None) -> Tuple[Optional[List[Document]], List[Document]]:
+        """NCS 코드 질의면 어휘 검색을 먼저 수행합니다.
+
+        Returns:
+            (어휘 검색 결과 또는 None(코드 없음), 결정적 결과(있으면 임베딩 생략 가능))
+        """
+        if not extract_codes(query):
+            return None, []
+        lexical_docs = await self.alexical_search(query, k, filter)
+        return lexical_docs, self.decisive_docs(query, lexical_docs)[:k]
+
+    async def asearch(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[dict] = None,
+        query_vector: Optional[List[float]] = None,
+        lexical_docs: Optional[List[Document]] = None,
+        search_store=None,
+    ) -> List[Document]:
+        """하이브리드 검색을 수행합니다.
+
+        Args:
+            query_vector: 미리 계산한 질의 임베딩 (없으면 벡터 저장소가 임베딩)
+            lexical_docs: aprefilter()에서 이미 얻은 어휘 검색 결과
+            search_store: 검색 옵션이 적용된 벡터 저장소 (없으면 기본 저장소)
+        """
+        filter = filter or None
+        if lexical_docs is None and query_vector is None:
+            lexical_docs, decisive = await self.aprefilter(query, k, filter)
+            if decisive:
+                return decisive
+
+        store = search_store or self.manager.get_vector_store()
+        lexical_task = None
+        if lexical_docs is None:
+            lexical_task = asyncio.ensure_future(self.alexical_search(query, k, filter))
+
+        try:
+            if query_vector is None:
+                dense_docs = await store.asimilarity_search(query, k=k, filter=filter)
+            else:
+                dense_docs = await self.manager.asearch_by_vector(store, query_vector, k=k, filter=filter)
+        except BaseException:
+            if lexical_task is not None:
+                lexical_task.cancel()
+            raise
+
+        if lexical_task is not None:
+            lexical_docs = await lexical_task
+        return reciprocal_rank_fusion([dense_docs, lexical_docs], k, self.rrf_k)
@@ -1,17 +1,186 @@
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from langchain_core.documents import Document
+import bisect
+import re
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+def token_length_function(model_name: str = "text-embedding-3-small") -> Callable[[str], int]:
+    """tiktoken으로 토큰 수를 세는 길이 함수를 반환합니다. (청크 크기를 토큰 단위로 맞출 때 사용)"""
+    import tiktoken
+
+    encoding = tiktoken.encoding_for_model(model_name)
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class FastRecursiveSplitter:
+    """RecursiveCharacterTextSplitter와 같은 청크를 만드는 단일 패스 제너레이터 분할기
+
+    분할 결과를 부분 문자열 대신 원문 오프셋 구간(start, end)으로 다루고, 구분자 위치는 텍스트마다
+    한 번만 찾아(오프셋 배열) 재귀 단계에서는 이진 탐색으로 재사용합니다. 청크는 만들어지는 대로 yield하며
+    start_index는 text.find() 추정 대신 실제 원문 오프셋입니다.
+
+    RecursiveCharacterTextSplitter의 기본 설정(keep_separator=True, strip_whitespace=True)과 같은 결과를 냅니다.
+    단, chunk_size 이상인데 더 나눌 구분자가 없는 조각(구분자 목록에 ""가 없거나 chunk_size=1인 경우)은
+    RecursiveCharacterTextSplitter가 공백을 제거하지 않고 그대로(공백만 있는 조각도) 내보내는 것과 달리,
+    다른 청크처럼 앞뒤 공백을 제거하고 빈 청크는 버립니다.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: Optional[List[str]] = None,
+        length_function: Callable[[str], int] = len,
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"chunk_overlap({chunk_overlap})이 chunk_size({chunk_size})보다 큽니다.")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators or DEFAULT_SEPARATORS
+        self.length_function = length_function
+        self._patterns = {sep: re.compile(re.escape(sep)) for sep in self.separators if sep}
+        self._char_length = length_function is len
+
+    # ─── 구분자 위치 ────────────────────────────────────────
+
+    def _positions(self, text: str, cache: Dict[str, List[int]], sep: str) -> List[int]:
+        """원문 전체에서 구분자가 나오는 위치(겹치지 않게 왼쪽부터)를 한 번만 계산합니다."""
+        positions = cache.get(sep)
+        if positions is None:
+            positions = cache[sep] = [m.start() for m in self._patterns[sep].finditer(text)]
+        return positions
+
+    def _occurrences(self, text: str, cache: Dict[str, List[int]], sep: str, start: int, end: int) -> List[int]:
+        """구간 [start, end) 안의 구분자 위치 목록"""
+        if len(sep) > 1 and start > 0:
+            # 여러 글자 구분자는 구간 시작에 따라 매칭 위치가 달라질 수 있으므로 구간에서 직접 탐색
+            return [m.start() for m in self._patterns[sep].finditer(text, start, end)]
+        positions = self._positions(text, cache, sep)
+        lo = bisect.bisect_left(positions, start)
+        hi = bisect.bisect_right(positions, end - len(sep))
+        return positions[lo:hi]
+
+    # ─── 분할 ──────────────────────────────────────────────
+
+    def _length(self, text: str, start: int, end: int) -> int:
+        return end - start if self._char_length else self.length_function(text[start:end])
+
+    def _split_spans(self, text: str, cache: Dict[str, List[int]], start: int, end: int, separators: List[str]):
+        """구간을 구분자로 나눈 뒤 병합해 (청크 시작, 청크 끝) 구간을 순서대로 yield합니다."""
+        separator = separators[-1]
+        new_separators: List[str] = []
+        for i, sep in enumerate(separators):
+            if not sep:
+                separator = sep
+                break
+            if self._occurrences(text, cache, sep, start, end):
+                separator = sep
+                new_separators = separators[i + 1:]
+                break
+
+        # 구분자는 다음 조각의 앞에 붙임 (keep_separator=True)
+        if separator:
+            cuts = [start] + [p for p in self._occurrences(text, cache, separator, start, end) if p > start] + [end]
+            pieces = [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+        else:
+            pieces = [(i, i + 1) for i in range(start, end)]
+
+        good: List[Tuple[int, int, int]] = []
+        for a, b in pieces:
+            length = self._length(text, a, b)
+            if length < self.chunk_size:
+                good.append((a, b, length))
+                continue
+            if good:
+                yield from self._merge_spans(text, good)
+                good = []
+            if not new_separators:
+                yield a, b
+            else:
+                yield from self._split_spans(text, cache, a, b, new_separators)
+        if good:
+            yield from self._merge_spans(text, good)
+
+    def _merge_spans(self, text: str, pieces: List[Tuple[int, int, int]]):
+        """연속된 작은 조각들을 chunk_size 이하 청크로 병합합니다. (chunk_overlap만큼 앞 조각을 남김)"""
+        window_start = 0
+        total = 0
+        for i, (_, _, length) in enumerate(pieces):
+            if total + length > self.chunk_size:
+                if i > window_start:
+                    yield pieces[window_start][0], pieces[i - 1][1]
+                    while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                        total -= pieces[window_start][2]
+                        window_start += 1
+            total += length
+        yield pieces[window_start][0], pieces[-1][1]
+
+    def iter_chunks(self, text: str) -> Iterator[Tuple[int, str]]:
+        """(start_index, 청크) 를 순서대로 yield합니다. (앞뒤 공백 제거, 빈 청크 제외)"""
+        cache: Dict[str, List[int]] = {}
+        for a, b in self._split_spans(text, cache, 0, len(text), self.separators):
+            raw = text[a:b]
+            chunk = raw.strip()
+            if chunk:
+                yield a + len(raw) - len(raw.lstrip()), chunk
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for _, chunk in self.iter_chunks(text)]
+
+    def lazy_split_documents(self, docs: Iterable[Document]) -> Iterator[Document]:
+        """문서를 하나씩 받아 청크 Document(start_index 포함)를 yield합니다."""
+        for doc in docs:
+            for start, chunk in self.iter_chunks(doc.page_content):
+                yield Document(page_content=chunk, metadata={**doc.metadata, "start_index": start})
+
+    def split_documents(self, docs: Iterable[Document]) -> List[Document]:
+        return list(self.lazy_split_documents(docs))
+
 
 class DocumentSplitter:
-    """문서를 청크로 분할하는 클래스"""
+    """문서를 청크로 분할하는 클래스
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            add_start_index=True,
-        )
+    Args:
+        fast: True면 FastRecursiveSplitter(단일 패스, 제너레이터) 사용, False면 RecursiveCharacterTextSplitter 사용
+        length_unit: "chars"(글자 수) 또는 "tokens"(tiktoken 토큰 수)로 chunk_size/chunk_overlap 측정
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        fast: bool = True,
+        length_unit: str = "chars",
+    ):
+        if length_unit not in ("chars", "tokens"):
+            raise ValueError(f"지원하지 않는 length_unit입니다: {length_unit}")
+        length_function = token_length_function() if length_unit == "tokens" else len
+
+        if fast:
+            self.text_splitter = FastRecursiveSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                length_function=length_function,
+            )
+        else:
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                length_function=length_function,
+                add_start_index=True,
+            )
 
     def split_documents(self, docs: List[Document]) -> List[Document]:
         """문서 리스트를 받아 청크로 분할하여 반환합니다."""
         return self.text_splitter.split_documents(docs)
+
+    def lazy_split_documents(self, docs: Iterable[Document]) -> Iterator[Document]:
+        """문서를 하나씩 받아 청크를 하나씩 반환합니다."""
+        if isinstance(self.text_splitter, FastRecursiveSplitter):
+            yield from self.text_splitter.lazy_split_documents(docs)
+        else:
+            for doc in docs:
+                yield from self.text_splitter.split_documents([doc])
@@ -1,18 +1,282 @@
 from langchain.tools import tool
+from langchain_core.documents import Document
 from langchain_core.tools import Tool
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Tuple
+from retrieval import HybridRetriever
+from metrics import (
+    EMPTY_FILTERS, FILTER_USAGE, PREFETCH_RESULTS, RETRIEVED_DOCS, SEARCH_PLANS, TOOL_CACHE, filter_label, span,
+)
+from collections import OrderedDict
+import asyncio
+import json
+import re
+
+# 도구 검색 결과 수
+TOOL_K = 2
+# 추측 검색(prefetch)에서 미리 가져올 결과 수 (필터가 있는 도구 호출도 이 안에서 k개를 채울 수 있으면 재사용)
+PREFETCH_K = 8
+# 다중 질의 도구에서 한 번에 받을 하위 요청 수
+MULTI_QUERY_MAX = 5
+# 세션(ToolBuilder) 단위 검색 결과 메모 크기
+SESSION_CACHE_SIZE = 256
+
+
+def _normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def _matches(doc: Document, filter_dict: dict) -> bool:
+    for col, cond in filter_dict.items():
+        value = doc.metadata.get(col)
+        if "$eq" in cond and value != cond["$eq"]:
+            return False
+        if "$in" in cond and value not in cond["$in"]:
+            return False
+    return True
+
+
+def _build_filter(
+    main_category: Optional[str] = None,
+    sub_category: Optional[str] = None,
+    source: Optional[str] = None,
+    page: Optional[int] = None,
+) -> dict:
+    """도구 인자로 메타데이터 필터를 구성합니다."""
+    filter_dict = {}
+    if main_category is not None:
+        filter_dict["main_category"] = {"$eq": main_category}
+    if sub_category is not None:
+        filter_dict["sub_category"] = {"$eq": sub_category}
+    if source is not None:
+        filter_dict["source"] = {"$eq": source}
+    if page is not None:
+        filter_dict["page"] = {"$eq": page}
+    return filter_dict
+
+
+def _doc_key(doc: Document):
+    return doc.id or (doc.page_content, doc.metadata.get("source"), doc.metadata.get("page"))
+
+
+def _serialize(docs: List[Document]) -> str:
+    return "\n\n".join(f"Source: {doc.metadata}\nContent: {doc.page_content}" for doc in docs)
+
+
+class SubQuery(BaseModel):
+    """retrieve_context_multi의 하위 검색 요청"""
+
+    query: str = Field(description="search query")
+    main_category: Optional[str] = Field(default=None, description="대분류 filter")
+    sub_category: Optional[str] = Field(default=None, description="중분류 filter")
+    source: Optional[str] = Field(default=None, description="원본 파일명 filter")
+    page: Optional[int] = Field(default=None, description="page number filter")
+
 
 class ToolBuilder:
     """에이전트가 사용할 도구를 생성하는 클래스"""
 
-    def __init__(self, vector_store):
+    def __init__(
+        self,
+        vector_store,
+        manager=None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        hybrid: bool = False,
+        speculative: bool = False,
+        multi_query: bool = False,
+    ):
+        """
+        Args:
+            vector_store: 검색에 사용할 벡터 저장소
+            manager: VectorStoreManager (ef_search/probes 검색 옵션을 쓰려면 필요)
+            ef_search: HNSW 검색 후보 수 (클수록 정확하지만 느림, 이 도구의 모든 호출에 적용)
+            probes: IVFFlat 검색 리스트 수 (클수록 정확하지만 느림, 이 도구의 모든 호출에 적용)
+            hybrid: 어휘 + 벡터 하이브리드 검색 사용 여부 (manager 필요)
+            speculative: prefetch()로 미리 시작한 검색 결과를 같은 질의의 도구 호출에 재사용할지 여부
+            multi_query: 여러 (질의, 필터)를 한 번에 검색하는 retrieve_context_multi 도구도 만들지 여부
+        """
         self.vector_store = vector_store
+        self.manager = manager
+        self.ef_search = ef_search
+        self.probes = probes
+        self.hybrid_retriever = HybridRetriever(manager) if hybrid and manager is not None else None
+        self.speculative = speculative
+        # 정규화한 질의 -> 필터 없는 추측 검색 작업
+        self._prefetched: Dict[str, asyncio.Task] = {}
+        self.multi_query = multi_query
+        # (정규화한 질의, 필터, k) -> 검색 결과 (세션 동안 같은 검색을 반복하지 않도록)
+        self._memo: "OrderedDict[Tuple[str, str, int], List[Document]]" = OrderedDict()
+
+    def clear_session(self):
+        """세션 단위 검색 결과 메모를 비웁니다. (새 대화를 시작할 때)"""
+        self._memo.clear()
+
+    @staticmethod
+    def _memo_key(query: str, filter_dict: dict, k: int) -> Tuple[str, str, int]:
+        return _normalize_query(query), json.dumps(filter_dict, sort_keys=True, ensure_ascii=False), k
+
+    def _memo_get(self, key: Tuple[str, str, int]) -> Optional[List[Document]]:
+        docs = self._memo.get(key)
+        if docs is None:
+            return None
+        self._memo.move_to_end(key)
+        return docs
+
+    def _memo_put(self, key: Tuple[str, str, int], docs: List[Document]):
+        self._memo[key] = docs
+        self._memo.move_to_end(key)
+        while len(self._memo) > SESSION_CACHE_SIZE:
+            self._memo.popitem(last=False)
+
+    async def _aembed_queries(self, queries: List[str]) -> List[List[float]]:
+        """질의 여러 개를 한 번의 임베딩 요청으로 벡터화합니다. (질의 캐시가 있으면 캐시를 거침)"""
+        embeddings = getattr(self.manager, "embedding_model", None) or self.vector_store.embeddings
+        if hasattr(embeddings, "aembed_queries"):
+            return await embeddings.aembed_queries(queries)
+        return await embeddings.aembed_documents(queries)
+
+    async def _search(
+        self, query: str, k: int, filter_dict: dict, query_vector: Optional[List[float]] = None
+    ) -> List[Document]:
+        """도구와 같은 방식(검색 옵션/필터 검색 계획/하이브리드)으로 검색합니다. (query_vector가 있으면 임베딩 생략)"""
+        search_store = self.vector_store
+        if self.manager is not None:
+            search_store, planned_filter, plan = await self.manager.aplan_search(
+                filter_dict, k=k, ef_search=self.ef_search, probes=self.probes
+            )
+            filter_dict = planned_filter or {}
+            SEARCH_PLANS.inc(source="tool", mode=plan.mode)
+
+        if self.hybrid_retriever is not None:
+            return await self.hybrid_retriever.asearch(
+                query, k=k, filter=filter_dict, query_vector=query_vector, search_store=search_store
+            )
+        if self.manager is not None and getattr(self.manager, "search_resilience", None) is not None:
+            # 검색 단계 타임아웃/재시도/헤징은 벡터 검색에만 걸리므로 질의를 먼저 임베딩
+            if query_vector is None:
+                embeddings = getattr(self.manager, "embedding_model", None) or self.vector_store.embeddings
+                query_vector = await embeddings.aembed_query(query)
+            return await self.manager.asearch_by_vector(search_store, query_vector, k=k, filter=filter_dict)
+        if query_vector is not None:
+            return await search_store.asimilarity_search_by_vector(query_vector, k=k, filter=filter_dict or None)
+        if filter_dict:
+            return await search_store.asimilarity_search(query, k=k, filter=filter_dict)
+        return await search_store.asimilarity_search(query, k=k)
+
+    def prefetch(self, query: str):
+        """에이전트의 첫 모델 호출과 동시에, 원래 질의로 필터 없는 검색을 미리 시작합니다. (speculative일 때만)"""
+        if not self.speculative:
+            return
+        key = _normalize_query(query)
+        if key not in self._prefetched:
+            # 하이브리드 검색은 결과를 필터로 다시 거를 수 없으므로 도구와 같은 k개만 가져옴
+            k = TOOL_K if self.hybrid_retriever is not None else PREFETCH_K
+            self._prefetched[key] = asyncio.ensure_future(self._search(query, k, {}))
+
+    def discard(self, query: str):
+        """사용하지 않은 추측 검색을 정리합니다. (에이전트 실행이 끝날 때 호출)"""
+        task = self._prefetched.pop(_normalize_query(query), None)
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            # 실패한 작업의 예외를 소비 (경고 방지)
+            task.exception()
+        PREFETCH_RESULTS.inc(result="unused")
+
+    async def _take_prefetched(self, query: str, filter_dict: dict, k: int) -> Optional[List[Document]]:
+        """도구 호출이 추측 검색과 호환되면 그 결과로 k개를 반환하고, 아니면 None을 반환합니다.
+
+        필터 없는 상위 PREFETCH_K개 중 필터에 맞는 문서가 k개 이상이면, 그 k개는 필터 검색의 상위 k개와 같습니다.
+        (나머지 문서는 모두 이들보다 거리가 멂)
+        """
+        task = self._prefetched.pop(_normalize_query(query), None)
+        if task is None:
+            return None
+        fetched_k = TOOL_K if self.hybrid_retriever is not None else PREFETCH_K
+        if filter_dict and self.hybrid_retriever is not None:
+            task.cancel()
+            PREFETCH_RESULTS.inc(result="miss")
+            return None
+        try:
+            docs = await task
+        except Exception:
+            # 추측 검색이 실패하면 일반 검색으로 진행
+            PREFETCH_RESULTS.inc(result="miss")
+            return None
+
+        # 가져온 수가 fetched_k보다 적으면 테이블 전체를 본 것이므로 필터 결과가 부족해도 그대로 사용
+        matched = [doc for doc in docs if _matches(doc, filter_dict)] if filter_dict else docs
+        if len(matched) < k and len(docs) == fetched_k:
+            PREFETCH_RESULTS.inc(result="miss")
+            return None
+        PREFETCH_RESULTS.inc(result="hit")
+        return matched[:k]
+
+    async def _aempty_filter(self, filter_dict: dict) -> bool:
+        """패싯상 필터에 맞는 문서가 없으면 True (임베딩/검색을 생략)"""
+        if not filter_dict or self.manager is None or not await self.manager.ais_empty_filter(filter_dict):
+            return False
+        EMPTY_FILTERS.inc(source="tool")
+        return True
+
+    async def _amemo_search(self, query: str, k: int, filter_dict: dict) -> List[Document]:
+        """세션 메모 → 추측 검색 결과 → 검색 순으로 결과를 찾습니다. (필터에 맞는 문서가 없으면 바로 빈 결과)"""
+        if await self._aempty_filter(filter_dict):
+            return []
+        key = self._memo_key(query, filter_dict, k)
+        docs = self._memo_get(key)
+        if docs is not None:
+            TOOL_CACHE.inc(result="hit")
+            return docs
+        TOOL_CACHE.inc(result="miss")
+        docs = await self._take_prefetched(query, filter_dict, k)
+        if docs is None:
+            docs = await self._search(query, k, filter_dict)
+        self._memo_put(key, docs)
+        return docs
+
+    async def amulti_search(self, requests: List[Tuple[str, dict]], k: int = TOOL_K) -> List[List[Document]]:
+        """(질의, 필터) 여러 개를 검색합니다.
+
+        메모에 없는 질의만 한 번에 임베딩하고, 검색은 동시에 실행합니다. 같은 (질의, 필터)는 한 번만 검색합니다.
+        """
+        keys = [self._memo_key(query, filter_dict, k) for query, filter_dict in requests]
+        results: Dict[Tuple[str, str, int], List[Document]] = {}
+        pending: Dict[Tuple[str, str, int], Tuple[str, dict]] = {}
+        for key, request in zip(keys, requests):
+            if key in results or key in pending:
+                continue
+            if await self._aempty_filter(request[1]):
+                results[key] = []
+                continue
+            docs = self._memo_get(key)
+            if docs is not None:
+                TOOL_CACHE.inc(result="hit")
+                results[key] = docs
+            else:
+                TOOL_CACHE.inc(result="miss")
+                pending[key] = request
+
+        if pending:
+            with span("tool_embed_batch"):
+                vectors = await self._aembed_queries([query for query, _ in pending.values()])
+            found = await asyncio.gather(*(
+                self._search(query, k, filter_dict, query_vector=vector)
+                for (query, filter_dict), vector in zip(pending.values(), vectors)
+            ))
+            for key, docs in zip(pending, found):
+                self._memo_put(key, docs)
+                results[key] = docs
+        return [results[key] for key in keys]
 
     def build_tools(self) -> List[Tool]:
-        """검색 도구(retrieve_context)를 생성하여 리스트로 반환합니다."""
+        """검색 도구(retrieve_context, multi_query면 retrieve_context_multi도)를 생성하여 리스트로 반환합니다."""
 
-        # vector_store 객체를 클로저로 캡처하여 도구 함수 내부에서 사용
-        store = self.vector_store
+        # ToolBuilder를 클로저로 캡처하여 도구 함수 내부에서 사용
+        builder = self
 
         @tool(response_format="content_and_artifact")
         async def retrieve_context(
@@ -30,32 +294,58 @@ class ToolBuilder:
             - page: 특정 페이지 번호
             """
             # 필터 구성
-            filter_dict = {}
-            if main_category is not None:
-                filter_dict["main_category"] = {"$eq": main_category}
-            if sub_category is not None:
-                filter_dict["sub_category"] = {"$eq": sub_category}
-            if source is not None:
-                filter_dict["source"] = {"$eq": source}
-            if page is not None:
-                filter_dict["page"] = {"$eq": page}
-
-            # 필터가 있으면 적용, 없으면 전체 검색
-            if filter_dict:
-                retrieved_docs = await store.asimilarity_search(
-                    query, k=2, filter=filter_dict
-                )
-            else:
-                retrieved_docs = await store.asimilarity_search(query, k=2)
+            filter_dict = _build_filter(main_category, sub_category, source, page)
+            FILTER_USAGE.inc(source="tool", filter=filter_label(filter_dict))
 
-            serialized = "\n\n".join(
-                (f"Source: {doc.metadata}\nContent: {doc.page_content}")
-                for doc in retrieved_docs
-            )
+            # 세션 메모/추측 검색 결과를 쓸 수 있으면 사용, 아니면 하이브리드 검색 또는 벡터 검색 (필터가 있으면 적용)
+            with span("tool_search"):
+                retrieved_docs = await builder._amemo_search(query, TOOL_K, filter_dict)
+            RETRIEVED_DOCS.observe(len(retrieved_docs), source="tool")
+
+            serialized = _serialize(retrieved_docs)
 
             if not serialized:
                 serialized = "No documents found matching the filter criteria."
 
             return serialized, retrieved_docs
 
+        @tool(response_format="content_and_artifact")
+        async def retrieve_context_multi(requests: List[SubQuery]):
+            """Retrieve information for several queries at once (up to 5).
+            Use this instead of calling retrieve_context repeatedly when the question needs
+            multiple phrasings or multiple categories. Each request has a query and optional
+            metadata filters (main_category, sub_category, source, page) like retrieve_context.
+            Documents already returned for an earlier request are not repeated.
+            """
+            requests = requests[:MULTI_QUERY_MAX]
+            parsed = []
+            for request in requests:
+                filter_dict = _build_filter(request.main_category, request.sub_category, request.source, request.page)
+                FILTER_USAGE.inc(source="tool_multi", filter=filter_label(filter_dict))
+                parsed.append((request.query, filter_dict))
+
+            with span("tool_multi_search"):
+                results = await builder.amulti_search(parsed, TOOL_K)
+
+            # 하위 요청 사이에 중복된 문서는 처음 나온 곳에만 표시
+            seen = set()
+            sections, retrieved_docs = [], []
+            for i, ((query, filter_dict), docs) in enumerate(zip(parsed, results), start=1):
+                new_docs = [doc for doc in docs if _doc_key(doc) not in seen]
+                seen.update(_doc_key(doc) for doc in new_docs)
+                retrieved_docs.extend(new_docs)
+                header = f"[{i}] {query.strip()}" + (f" (filter: {filter_dict})" if filter_dict else "")
+                if new_docs:
+                    body = _serialize(new_docs)
+                elif docs:
+                    body = "Same documents as an earlier request."
+                else:
+                    body = "No documents found matching the filter criteria."
+                sections.append(f"{header}\n{body}")
+            RETRIEVED_DOCS.observe(len(retrieved_docs), source="tool_multi")
+
+            return "\n\n".join(sections), retrieved_docs
+
+        if self.multi_query:
+            return [retrieve_context, retrieve_context_multi]
         return [retrieve_context]
@@ -1,15 +1,137 @@
 from langchain_postgres import PGEngine, PGVectorStore, PGVector, Column
-from typing import List, Optional
+from langchain_postgres.v2.indexes import HNSWIndex, IVFFlatIndex, HNSWQueryOptions, IVFFlatQueryOptions
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import time
 from langchain_core.documents import Document
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.exc import ProgrammingError
+from db_pool import create_pooled_engine, pool_stats
+from quantization import CompactVectorStore, VectorStorageConfig
+from partitions import EF_SEARCH_STEPS, PartitionPlanner, SearchPlan, aload_partition_stats, apartition_key
+from facets import FacetIndex, aload_facets, local_facets
+
+# 메타데이터 필터용 B-tree 인덱스를 만들 컬럼
+METADATA_INDEX_COLUMNS = ["main_category", "sub_category", "source", "page"]
+
+# 요청으로 지정한 IVFFlat probes를 맞추는 단계 (ef_search는 EF_SEARCH_STEPS, 단계별로 저장소를 캐시하므로 값 종류를 제한)
+PROBES_STEPS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+# PGVectorStore 기본 컬럼 이름
+ID_COLUMN = "langchain_id"
+CONTENT_COLUMN = "content"
+EMBEDDING_COLUMN = "embedding"
+METADATA_JSON_COLUMN = "langchain_metadata"
+
+
+def build_filter_clause(filter: Optional[dict], columns: List[str], prefix: str = "f") -> Tuple[str, dict]:
+    """메타데이터 필터({컬럼: {"$eq": 값}} / {"$in": [...]} / 값)를 SQL WHERE 조건과 파라미터로 변환합니다."""
+    clauses, params = [], {}
+    for i, (col, cond) in enumerate((filter or {}).items()):
+        if col not in columns:
+            raise ValueError(f"필터를 지원하지 않는 컬럼입니다: {col}")
+        name = f"{prefix}{i}"
+        if isinstance(cond, dict) and "$in" in cond:
+            values = list(cond["$in"])
+            placeholders = ", ".join(f":{name}_{j}" for j in range(len(values)))
+            clauses.append(f'"{col}" IN ({placeholders})' if values else "FALSE")
+            params.update({f"{name}_{j}": v for j, v in enumerate(values)})
+        elif isinstance(cond, dict) and "$eq" in cond:
+            clauses.append(f'"{col}" = :{name}')
+            params[name] = cond["$eq"]
+        elif isinstance(cond, dict):
+            raise ValueError(f"지원하지 않는 필터 연산자입니다: {list(cond)}")
+        else:
+            clauses.append(f'"{col}" = :{name}')
+            params[name] = cond
+    return " AND ".join(clauses), params
+
+
+def snap_to_step(value: Optional[int], steps: Tuple[int, ...]) -> Optional[int]:
+    """검색 옵션 값을 그 이상인 가장 작은 단계로 올립니다. (마지막 단계보다 크면 마지막 단계, 1 미만은 ValueError)"""
+    if value is None:
+        return None
+    if value < 1:
+        raise ValueError(f"검색 옵션은 1 이상이어야 합니다: {value}")
+    return next((step for step in steps if step >= value), steps[-1])
+
+
+def row_to_document(row, metadata_columns: List[str]) -> Document:
+    """테이블 행을 PGVectorStore 검색 결과와 같은 형태의 Document로 변환합니다."""
+    metadata = dict(row[METADATA_JSON_COLUMN] or {}) if METADATA_JSON_COLUMN in row else {}
+    for col in metadata_columns:
+        metadata[col] = row[col]
+    return Document(id=str(row[ID_COLUMN]), page_content=row[CONTENT_COLUMN], metadata=metadata)
+
+
+# 테이블별 적재 세대(generation)를 기록하는 테이블. 적재로 내용이 바뀔 때마다 1씩 증가합니다.
+INGEST_STATE_TABLE = "ingest_state"
+
+
+async def abump_generation(engine: AsyncEngine, table_name: str) -> int:
+    """테이블의 적재 세대를 1 증가시키고 새 값을 반환합니다. (ingest에서 호출)"""
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{INGEST_STATE_TABLE}" ('
+            "table_name VARCHAR PRIMARY KEY, "
+            "generation BIGINT NOT NULL DEFAULT 0, "
+            "updated_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        ))
+        result = await conn.execute(
+            text(
+                f'INSERT INTO "{INGEST_STATE_TABLE}" (table_name, generation) VALUES (:table_name, 1) '
+                f'ON CONFLICT (table_name) DO UPDATE SET generation = "{INGEST_STATE_TABLE}".generation + 1, '
+                "updated_at = now() RETURNING generation"
+            ),
+            {"table_name": table_name},
+        )
+        return result.scalar_one()
+
+
+async def aget_generation(engine: AsyncEngine, table_name: str) -> int:
+    """테이블의 현재 적재 세대를 반환합니다. 기록이 없으면 0을 반환합니다."""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(
+                text(f'SELECT generation FROM "{INGEST_STATE_TABLE}" WHERE table_name = :table_name'),
+                {"table_name": table_name},
+            )
+        except ProgrammingError:
+            # 아직 한 번도 적재하지 않아 상태 테이블이 없음
+            return 0
+        return result.scalar_one_or_none() or 0
+
 
 class VectorStoreManager:
-    """벡터 저장소(PostgreSQL)를 관리하는 클래스 (Async)"""
+    """벡터 저장소(PostgreSQL 또는 로컬 NumPy 인덱스)를 관리하는 클래스 (Async)"""
 
-    def __init__(self, engine, vector_store):
+    def __init__(
+        self,
+        engine,
+        vector_store,
+        async_engine: Optional[AsyncEngine] = None,
+        table_name: Optional[str] = None,
+        embedding_model=None,
+        metadata_columns: Optional[List[str]] = None,
+    ):
         self.pg_engine = engine
         self.vector_store = vector_store
+        self.async_engine = async_engine
+        self.table_name = table_name
+        self.embedding_model = embedding_model
+        self.metadata_columns = metadata_columns
+        # (ef_search, probes)별로 검색 옵션이 적용된 벡터 저장소 캐시
+        self._option_stores: Dict[Tuple[Optional[int], Optional[int]], PGVectorStore] = {}
+        # 필터 검색 계획 (파티션/분류별 행 수로 정확 검색 또는 ANN 선택)
+        self.planner = PartitionPlanner()
+        self._plan_stores: Dict[Tuple[str, Optional[int]], PGVectorStore] = {}
+        # 벡터 검색 타임아웃/재시도/헤징 (resilience.Resilience, 없으면 그대로 검색)
+        self.search_resilience = None
+        # 적재 시 기록한 (대분류, 중분류, 파일)별 청크/페이지 수 (분류 목록, 빈 필터 판단)
+        self.facets = FacetIndex()
 
     @classmethod
     async def create(
@@ -18,12 +140,24 @@ class VectorStoreManager:
         table_name: str,
         embedding_model,
         metadata_columns: Optional[List[str]] = None,
+        pool_options: Optional[dict] = None,
+        storage: Optional[VectorStorageConfig] = None,
     ):
-        """비동기적으로 VectorStoreManager 인스턴스를 생성합니다."""
-        engine = create_async_engine(connection_string)
+        """비동기적으로 VectorStoreManager 인스턴스를 생성합니다.
+
+        pool_options: create_pooled_engine()에 넘길 커넥션 풀 설정
+            (pool_size, max_overflow, pool_timeout, pool_recycle, pool_pre_ping, statement_cache_size)
+        storage: 축소/양자화 벡터 저장 설정 (적재 시 설정과 같아야 함, 기본 저장 방식이면 None)
+        """
+        engine = create_pooled_engine(connection_string, **(pool_options or {}))
         pg_engine = PGEngine.from_engine(engine)
 
-        if metadata_columns:
+        if storage is not None and storage.compact:
+            # 1차 검색(축소/양자화 벡터) + 원본 벡터 재정렬
+            vector_store = await CompactVectorStore.create(
+                pg_engine, engine, table_name, embedding_model, storage, metadata_columns=metadata_columns
+            )
+        elif metadata_columns:
             vector_store = await PGVectorStore.create(
                 engine=pg_engine,
                 table_name=table_name,
@@ -37,7 +171,56 @@ class VectorStoreManager:
                 embedding_service=embedding_model,
             )
 
-        return cls(pg_engine, vector_store)
+        return cls(
+            pg_engine,
+            vector_store,
+            async_engine=engine,
+            table_name=table_name,
+            embedding_model=embedding_model,
+            metadata_columns=metadata_columns,
+        )
+
+    @classmethod
+    async def create_local(
+        cls,
+        embedding_model,
+        snapshot_path: Optional[str] = None,
+        metadata_columns: Optional[List[str]] = None,
+    ):
+        """Postgres 없이 동작하는 로컬 인메모리 벡터 저장소(LocalVectorStore)로 생성합니다.
+
+        snapshot_path에 스냅샷이 있으면 로드하고, 없으면 빈 저장소로 시작합니다.
+        """
+        # numpy는 로컬 백엔드에서만 필요하므로 여기서 import
+        from local_store import FILTER_COLUMNS, LocalVectorStore
+
+        filter_columns = metadata_columns or FILTER_COLUMNS
+        if snapshot_path and os.path.exists(snapshot_path):
+            vector_store = LocalVectorStore.load(snapshot_path, embedding_model, filter_columns=filter_columns)
+        else:
+            vector_store = LocalVectorStore(embedding_model, filter_columns=filter_columns)
+
+        return cls(
+            None,
+            vector_store,
+            table_name=snapshot_path,
+            embedding_model=embedding_model,
+            metadata_columns=metadata_columns,
+        )
+
+    @property
+    def is_compact(self) -> bool:
+        """축소/양자화 벡터 저장 방식인지 여부"""
+        return isinstance(self.vector_store, CompactVectorStore)
+
+    @property
+    def is_local(self) -> bool:
+        """로컬 인메모리 백엔드인지 여부"""
+        return self.pg_engine is None
+
+    def _require_postgres(self):
+        if self.is_local:
+            raise RuntimeError("이 기능은 PostgreSQL 백엔드에서만 지원합니다.")
 
     async def init_table(self, table_name: str, vector_size: int, metadata_columns: List[Column]):
         """메타데이터 컬럼이 포함된 벡터 저장소 테이블을 초기화합니다."""
@@ -51,9 +234,315 @@ class VectorStoreManager:
         """문서를 벡터 저장소에 추가합니다. (비동기)"""
         return await self.vector_store.aadd_documents(documents=documents)
 
+    async def aget_generation(self) -> int:
+        """테이블의 현재 적재 세대를 반환합니다. (캐시 무효화 판단용)"""
+        if self.is_local:
+            return self.vector_store.generation
+        return await aget_generation(self.async_engine, self.table_name)
+
+    async def _aload_facets(self):
+        if self.is_local:
+            return local_facets(self.vector_store)
+        return await aload_facets(self.async_engine, self.table_name)
+
+    async def afacets(self) -> FacetIndex:
+        """적재 세대가 바뀌었으면 다시 읽은 패싯 인덱스를 반환합니다."""
+        await self.facets.sync(self.aget_generation, self._aload_facets)
+        return self.facets
+
+    async def ais_empty_filter(self, filter: Optional[dict]) -> bool:
+        """필터에 맞는 문서가 확실히 없는지 확인합니다. (임베딩/검색 없이 바로 빈 결과를 돌려줄 때)"""
+        if not filter:
+            return False
+        return (await self.afacets()).is_empty(filter)
+
+    def pool_stats(self) -> Optional[dict]:
+        """커넥션 풀 통계를 반환합니다. (로컬 백엔드는 None)"""
+        if self.is_local:
+            return None
+        return pool_stats(self.async_engine)
+
+    async def awarmup(self, connections: Optional[int] = None) -> dict:
+        """커넥션 풀을 미리 채우고 더미 유사도 검색을 한 번 실행합니다. (서버 시작 시 첫 요청 지연 감소)
+
+        connections개(기본: pool_size)의 커넥션을 동시에 열어 연결 수립 비용을 미리 치르고,
+        임의의 단위 벡터로 검색해 쿼리 계획/인덱스 페이지를 데워 둡니다.
+        """
+        start = time.perf_counter()
+        if self.is_local:
+            dims = self.vector_store.dimension
+            connections = 0
+        else:
+            connections = connections or self.async_engine.pool.size()
+
+            async def touch():
+                async with self.async_engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+
+            await asyncio.gather(*(touch() for _ in range(connections)))
+            async with self.async_engine.connect() as conn:
+                result = await conn.execute(
+                    text(f'SELECT vector_dims("{EMBEDDING_COLUMN}") FROM "{self.table_name}" LIMIT 1')
+                )
+                dims = result.scalar_one_or_none()
+            if dims and self.is_compact:
+                # embedding 컬럼은 축소 벡터이고 검색에는 원본 차원의 질의 벡터를 넘김
+                dims = self.vector_store.config.full_dimensions
+
+        # 테이블이 비어 있으면 차원을 알 수 없으므로 검색은 생략
+        if dims:
+            await self.vector_store.asimilarity_search_by_vector([1.0] + [0.0] * (dims - 1), k=1)
+        return {
+            "connections": connections,
+            "search": bool(dims),
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        }
+
     def get_vector_store(self):
         """벡터 저장소 객체를 반환합니다."""
         return self.vector_store
+
+    async def aget_vector_store(self, ef_search: Optional[int] = None, probes: Optional[int] = None):
+        """검색 옵션(HNSW ef_search / IVFFlat probes)이 적용된 벡터 저장소를 반환합니다.
+
+        옵션이 없으면 기본 저장소를 반환하고, 옵션 조합별 저장소는 한 번만 만들어 재사용합니다.
+        값은 EF_SEARCH_STEPS/PROBES_STEPS 중 그 이상인 단계로 올려서 쓰므로 캐시되는 저장소 수가 제한됩니다.
+        로컬 백엔드는 항상 정확한(exact) 검색이므로 옵션을 무시합니다.
+        """
+        if self.is_local or (ef_search is None and probes is None):
+            return self.vector_store
+        if ef_search is not None and probes is not None:
+            raise ValueError("ef_search(HNSW)와 probes(IVFFlat)는 동시에 지정할 수 없습니다.")
+        ef_search = snap_to_step(ef_search, EF_SEARCH_STEPS)
+        probes = snap_to_step(probes, PROBES_STEPS)
+
+        if self.is_compact:
+            return self.vector_store.with_options(ef_search=ef_search, probes=probes)
+
+        key = (ef_search, probes)
+        if key not in self._option_stores:
+            if ef_search is not None:
+                query_options = HNSWQueryOptions(ef_search=ef_search)
+            else:
+                query_options = IVFFlatQueryOptions(probes=probes)
+
+            kwargs = {"metadata_columns": self.metadata_columns} if self.metadata_columns else {}
+            self._option_stores[key] = await PGVectorStore.create(
+                engine=self.pg_engine,
+                table_name=self.table_name,
+                embedding_service=self.embedding_model or self.vector_store.embeddings,
+                index_query_options=query_options,
+                **kwargs,
+            )
+        return self._option_stores[key]
+
+    async def asearch_by_vector(
+        self, store, embedding: List[float], k: int = 4, filter: Optional[dict] = None
+    ) -> List[Document]:
+        """store(aplan_search 등이 돌려준 저장소)에서 벡터 검색을 합니다.
+
+        search_resilience가 설정되어 있으면 단계 타임아웃, 재시도, 헤징을 적용합니다.
+        """
+        filter = filter or None
+        if self.search_resilience is None:
+            return await store.asimilarity_search_by_vector(embedding, k=k, filter=filter)
+        return await self.search_resilience.call(
+            lambda: store.asimilarity_search_by_vector(embedding, k=k, filter=filter)
+        )
+
+    async def _aload_plan_stats(self):
+        return (
+            await aload_partition_stats(self.async_engine, self.table_name),
+            await apartition_key(self.async_engine, self.table_name),
+        )
+
+    async def aplan_search(
+        self,
+        filter: Optional[dict] = None,
+        k: int = 4,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+    ):
+        """필터 검색 계획을 세우고 (검색할 저장소, 검색에 쓸 필터, 계획)을 반환합니다.
+
+        필터에 걸리는 행이 적으면 정확 검색, 많으면 선택도에 맞춘 ef_search로 ANN 검색하는 저장소를 돌려주며,
+        반환된 필터는 파티션 제외가 되도록 보강되어 있을 수 있습니다.
+        ef_search/probes를 직접 지정했거나 필터가 없거나 로컬 백엔드면 계획 없이 aget_vector_store()와 같습니다.
+        """
+        if self.is_local or not filter or ef_search is not None or probes is not None:
+            store = await self.aget_vector_store(ef_search=ef_search, probes=probes)
+            return store, filter or None, SearchPlan("default", filter or None)
+
+        await self.planner.sync(self.aget_generation, self._aload_plan_stats)
+        plan = self.planner.plan(filter, k)
+        return await self._aplanned_store(plan), plan.filter, plan
+
+    async def _aplanned_store(self, plan: SearchPlan):
+        if plan.mode == "default":
+            return self.vector_store
+        if self.is_compact:
+            return self.vector_store.with_options(ef_search=plan.ef_search, exact=plan.mode == "exact")
+
+        key = (plan.mode, plan.ef_search)
+        if key not in self._plan_stores:
+            kwargs = {"metadata_columns": self.metadata_columns} if self.metadata_columns else {}
+            self._plan_stores[key] = await PGVectorStore.create(
+                engine=self.pg_engine,
+                table_name=self.table_name,
+                embedding_service=self.embedding_model or self.vector_store.embeddings,
+                index_query_options=self.planner.query_options(plan),
+                **kwargs,
+            )
+        return self._plan_stores[key]
+
+    async def acreate_ann_index(
+        self,
+        kind: str = "hnsw",
+        m: int = 16,
+        ef_construction: int = 64,
+        lists: int = 100,
+        concurrently: bool = False,
+    ):
+        """벡터 컬럼에 ANN 인덱스(hnsw 또는 ivfflat)를 생성합니다. (축소/양자화 저장이면 1차 검색 식에 생성)"""
+        self._require_postgres()
+        if self.is_compact:
+            await self.vector_store.aapply_index(
+                kind, m=m, ef_construction=ef_construction, lists=lists, concurrently=concurrently
+            )
+            return
+        if kind == "hnsw":
+            index = HNSWIndex(m=m, ef_construction=ef_construction)
+        elif kind == "ivfflat":
+            index = IVFFlatIndex(lists=lists)
+        else:
+            raise ValueError(f"지원하지 않는 인덱스 종류입니다: {kind}")
+        await self.vector_store.aapply_vector_index(index, concurrently=concurrently)
+
+    async def arebuild_ann_index(self, index_name: Optional[str] = None):
+        """ANN 인덱스를 다시 빌드합니다. (대량 적재/삭제 후 품질 회복용)"""
+        self._require_postgres()
+        await self.vector_store.areindex(index_name)
+
+    async def adrop_ann_index(self, index_name: Optional[str] = None):
+        """ANN 인덱스를 삭제합니다."""
+        self._require_postgres()
+        await self.vector_store.adrop_vector_index(index_name)
+
+    async def acreate_metadata_indexes(self, columns: Optional[List[str]] = None):
+        """메타데이터 필터 컬럼에 B-tree 인덱스를 생성합니다. (이미 있으면 건너뜀)"""
+        self._require_postgres()
+        async with self.async_engine.begin() as conn:
+            for column in columns or METADATA_INDEX_COLUMNS:
+                await conn.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS "{self.table_name}_{column}_idx" '
+                    f'ON "{self.table_name}" ("{column}")'
+                ))
+
+    async def acreate_lexical_index(self):
+        """본문/파일명에 pg_trgm GIN 인덱스를 생성합니다. (부분 문자열 검색 ILIKE 가속, 한국어에도 동작)"""
+        self._require_postgres()
+        async with self.async_engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for column in [CONTENT_COLUMN, "source"]:
+                if column != CONTENT_COLUMN and column not in (self.metadata_columns or METADATA_INDEX_COLUMNS):
+                    continue
+                await conn.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS "{self.table_name}_{column}_trgm_idx" '
+                    f'ON "{self.table_name}" USING gin ("{column}" gin_trgm_ops)'
+                ))
+
+    async def alexical_search(self, terms: Dict[str, float], k: int = 4, filter: Optional[dict] = None) -> List[Document]:
+        """검색어가 본문 또는 파일명에 포함된 문서를 가중치 합이 큰 순서로 반환합니다.
+
+        Args:
+            terms: {검색어: 가중치} (검색어는 영숫자/한글만 포함해야 함)
+        """
+        if not terms:
+            return []
+        if self.is_local:
+            return self.vector_store.lexical_search(terms, k=k, filter=filter)
+
+        columns = self.metadata_columns or METADATA_INDEX_COLUMNS
+        match_sql, score_sql, params = [], [], {"k": k}
+        for i, (term, weight) in enumerate(terms.items()):
+            cond = f'"{CONTENT_COLUMN}" ILIKE :t{i}'
+            if "source" in columns:
+                cond = f'({cond} OR "source" ILIKE :t{i})'
+            match_sql.append(cond)
+            score_sql.append(f"CASE WHEN {cond} THEN :w{i} ELSE 0 END")
+            params[f"t{i}"] = f"%{term}%"
+            params[f"w{i}"] = weight
+
+        where = f"({' OR '.join(match_sql)})"
+        filter_sql, filter_params = build_filter_clause(filter, columns)
+        if filter_sql:
+            where += f" AND {filter_sql}"
+            params.update(filter_params)
+
+        select_columns = ", ".join(f'"{col}"' for col in [ID_COLUMN, CONTENT_COLUMN, METADATA_JSON_COLUMN] + columns)
+        stmt = (
+            f'SELECT {select_columns}, ({" + ".join(score_sql)}) AS score '
+            f'FROM "{self.table_name}" WHERE {where} ORDER BY score DESC LIMIT :k'
+        )
+        async with self.async_engine.connect() as conn:
+            result = await conn.execute(text(stmt), params)
+            return [row_to_document(row, columns) for row in result.mappings()]
+
+    async def aupdate_metadata(self, updates: Dict[str, dict]):
+        """행의 JSON 메타데이터(langchain_metadata)에 키를 덮어씁니다. 값이 None인 키는 지웁니다.
+
+        Args:
+            updates: {청크 ID: {키: 값}} (메타데이터 컬럼이 아닌 키만)
+        """
+        if not updates:
+            return
+        if self.is_local:
+            self.vector_store.update_metadata(updates)
+            return
+
+        params = []
+        for doc_id, patch in updates.items():
+            params.append({
+                "id": doc_id,
+                "removed": [key for key, value in patch.items() if value is None],
+                "patch": json.dumps({k: v for k, v in patch.items() if v is not None}, ensure_ascii=False),
+            })
+        stmt = (
+            f'UPDATE "{self.table_name}" SET "{METADATA_JSON_COLUMN}" = '
+            f'((COALESCE("{METADATA_JSON_COLUMN}"::jsonb, \'{{}}\'::jsonb) - CAST(:removed AS text[])) '
+            f'|| CAST(:patch AS jsonb))::json '
+            f'WHERE "{ID_COLUMN}" = :id'
+        )
+        async with self.async_engine.begin() as conn:
+            await conn.execute(text(stmt), params)
+
+    async def alist_indexes(self) -> List[dict]:
+        """테이블의 인덱스 목록(이름, 정의, 크기, 유효 여부)을 반환합니다. (파티션 테이블이면 크기는 파티션 인덱스 합계)"""
+        self._require_postgres()
+        async with self.async_engine.connect() as conn:
+            result = await conn.execute(
+                text(
+                    "SELECT i.relname AS name, pg_get_indexdef(i.oid) AS definition, "
+                    "COALESCE((SELECT sum(pg_relation_size(p.relid)) FROM pg_partition_tree(i.oid) p), 0)::bigint AS size_bytes, "
+                    "x.indisvalid AS is_valid "
+                    "FROM pg_index x "
+                    "JOIN pg_class i ON i.oid = x.indexrelid "
+                    "JOIN pg_class t ON t.oid = x.indrelid "
+                    "WHERE t.relname = :table_name ORDER BY i.relname"
+                ),
+                {"table_name": self.table_name},
+            )
+            return [dict(row._mapping) for row in result]
+
+    async def aensure_indexes(self, kind: str = "hnsw", **index_kwargs) -> bool:
+        """ANN 인덱스와 메타데이터/본문 trigram 인덱스가 없으면 생성합니다. ANN 인덱스를 새로 만들었으면 True를 반환합니다."""
+        self._require_postgres()
+        await self.acreate_metadata_indexes()
+        await self.acreate_lexical_index()
+        if await self.vector_store.ais_valid_index():
+            return False
+        await self.acreate_ann_index(kind=kind, **index_kwargs)
+        return True
     
     def as_retriever(self, search_kwargs: dict = None):
         """Retriever 인터페이스로 변환합니다."""
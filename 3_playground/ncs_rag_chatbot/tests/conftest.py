@@ -0,0 +1,65 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 앱과 같은 방식으로 src/ 모듈을 이름만으로 import (server.py와 같은 sys.path 구성)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
+# 벤치마크용 가짜 임베딩/채팅 모델 (bench/fakes.py)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+
+def write_pdf(path, pages, info=None, page_labels=None):
+    """페이지별 텍스트 줄 목록으로 간단한 PDF를 만듭니다. (Helvetica, ASCII 텍스트만)
+
+    info: 문서 정보 사전 본문 (예: "/Title (a) /CreationDate (D:20240102030405+09'00')")
+    page_labels: 카탈로그 /PageLabels 사전 본문 (예: "/Nums [0 << /S /r >> 2 << /S /D >>]")
+    """
+    labels = f" /PageLabels << {page_labels} >>" if page_labels else ""
+    objects = {
+        1: f"<< /Type /Catalog /Pages 2 0 R{labels} >>".encode(),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for i, lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_id} 0 R")
+        body = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(
+            "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") Tj T*"
+            for line in lines
+        ) + " ET"
+        stream = body.encode("latin-1")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+    trailer_info = b""
+    if info:
+        info_id = max(objects) + 1
+        objects[info_id] = f"<< {info} >>".encode("latin-1")
+        trailer_info = b" /Info %d 0 R" % info_id
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for number in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[number]
+    out += b"trailer\n<< /Size %d /Root 1 0 R%s >>\nstartxref\n%d\n%%%%EOF\n" % (size, trailer_info, xref)
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+    return str(path)
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """make_pdf(이름, [[1쪽 줄, ...], [2쪽 줄, ...]], info=..., page_labels=...) → tmp_path 아래 PDF 경로"""
+    return lambda name, pages, **kwargs: write_pdf(tmp_path / name, pages, **kwargs)
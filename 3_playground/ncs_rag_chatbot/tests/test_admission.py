@@ -0,0 +1,149 @@
+from admission import AdmissionController, AdmissionObserver, Overloaded, set_deadline
+from metrics import ADMISSION_ACTIVE, ADMISSION_REJECTED, AdmissionMetrics
+import asyncio
+import pytest
+import time
+
+
+class RecordingObserver(AdmissionObserver):
+    def __init__(self):
+        self.events = []
+
+    def admitted(self, name, waited):
+        self.events.append(("admitted", name))
+
+    def rejected(self, name, reason):
+        self.events.append(("rejected", reason))
+
+
+def test_admits_in_arrival_order_and_hands_over_slots():
+    async def scenario():
+        controller = AdmissionController("t", max_concurrency=1, max_queue=5)
+        order = []
+
+        async def job(i):
+            async with controller.slot():
+                order.append(i)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(job(i) for i in range(4)))
+        return controller, order
+
+    controller, order = asyncio.run(scenario())
+    assert order == [0, 1, 2, 3]
+    assert controller.active == 0 and controller.admitted == 4
+    assert controller.stats()["total_wait_seconds"] > 0
+
+
+def test_rejects_when_queue_is_full():
+    async def scenario():
+        observer = RecordingObserver()
+        controller = AdmissionController("t", max_concurrency=1, max_queue=1, observer=observer)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as exc:
+            controller.check()
+        with pytest.raises(Overloaded):
+            await controller.acquire()
+        controller.release()
+        await waiter
+        return controller, observer, exc.value
+
+    controller, observer, error = asyncio.run(scenario())
+    assert error.status_code == 429 and error.reason == "queue_full" and error.retry_after >= 1
+    assert controller.rejected == {"queue_full": 2, "deadline": 0}
+    assert observer.events == [("admitted", "t"), ("rejected", "queue_full"), ("rejected", "queue_full"), ("admitted", "t")]
+
+
+@pytest.mark.parametrize("timeout,max_wait,deadline", [(0.05, None, None), (5, 0.05, None), (None, 5, 0.05)])
+def test_waits_until_shortest_limit(timeout, max_wait, deadline):
+    async def scenario():
+        set_deadline(deadline)
+        controller = AdmissionController("t", max_concurrency=1, max_queue=1, max_wait=max_wait)
+        await controller.acquire()
+        started = time.monotonic()
+        with pytest.raises(Overloaded) as exc:
+            await controller.acquire(timeout)
+        return controller, exc.value, time.monotonic() - started
+
+    controller, error, waited = asyncio.run(scenario())
+    assert error.status_code == 503 and error.reason == "deadline"
+    assert 0.04 <= waited < 1
+    assert controller.stats()["queued"] == 0
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def scenario():
+        controller = AdmissionController("t", max_concurrency=1, max_queue=2)
+        await controller.acquire()
+        cancelled = asyncio.create_task(controller.acquire())
+        second = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        # 슬롯을 넘겨받은 직후 취소되면 다음 대기자에게 넘어감
+        controller.release()
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        await asyncio.wait_for(second, 1)
+        controller.release()
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.active == 0 and not controller._waiters
+
+
+def test_metrics_observer_records_gauges_and_rejections():
+    async def scenario():
+        controller = AdmissionController("metrics-test", 1, 0, observer=AdmissionMetrics())
+        await controller.acquire()
+        with pytest.raises(Overloaded):
+            await controller.acquire()
+        return controller
+
+    asyncio.run(scenario())
+    assert ADMISSION_ACTIVE._values[("metrics-test",)] == 1
+    assert ADMISSION_REJECTED.value(limiter="metrics-test", reason="queue_full") == 1
+
+
+def test_slot_handed_over_at_deadline_is_not_lost(monkeypatch):
+    """마감 시점에 release()가 슬롯을 넘겨준 뒤 TimeoutError가 나도(Python 3.12+의 wait_for) 슬롯을 잃지 않음"""
+
+    async def scenario():
+        controller = AdmissionController("t", max_concurrency=1, max_queue=1)
+        await controller.acquire()
+
+        async def wait_for(fut, timeout):
+            await asyncio.sleep(timeout)
+            # 마감과 동시에 보유자가 슬롯을 반환
+            controller.release()
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(asyncio, "wait_for", wait_for)
+        await controller.acquire(timeout=0.01)
+        monkeypatch.undo()
+        admitted = controller.stats()
+        controller.release()
+        return controller, admitted
+
+    controller, admitted = asyncio.run(scenario())
+    assert admitted["active"] == 1 and admitted["queued"] == 0 and admitted["admitted"] == 2
+    assert controller.rejected["deadline"] == 0
+    assert controller.active == 0 and not controller._waiters
+
+
+def test_release_exactly_at_deadline_keeps_capacity():
+    async def scenario():
+        controller = AdmissionController("t", max_concurrency=1, max_queue=1)
+        await controller.acquire()
+        loop = asyncio.get_running_loop()
+        loop.call_at(loop.time() + 0.02, controller.release)
+        try:
+            await controller.acquire(timeout=0.02)
+            controller.release()
+        except Overloaded:
+            pass
+        return controller
+
+    controller = asyncio.run(scenario())
+    # 입장했든 거절됐든 슬롯은 모두 반환됨
+    assert controller.active == 0 and not controller._waiters
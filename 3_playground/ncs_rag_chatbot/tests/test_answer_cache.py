@@ -0,0 +1,60 @@
+from answer_cache import SemanticAnswerCache, filter_key
+import asyncio
+import time
+
+
+def test_filter_key_is_order_independent():
+    assert filter_key({"a": 1, "b": 2}) == filter_key({"b": 2, "a": 1})
+    assert filter_key(None) == filter_key({})
+
+
+def test_lookup_matches_similar_vector_in_same_filter():
+    cache = SemanticAnswerCache(threshold=0.95)
+    filt = {"main_category": {"$eq": "정보기술"}}
+    cache.store([1.0, 0.0, 0.0], filt, {"answer": "a"})
+    cache.store([0.0, 1.0, 0.0], filt, {"answer": "b"})
+
+    # 크기가 달라도 방향이 같으면 적중
+    assert cache.lookup([0.0, 3.0, 0.1], filt) == {"answer": "b"}
+    assert cache.lookup([0.7, 0.7, 0.0], filt) is None
+    # 다른 필터의 항목은 쓰지 않음
+    assert cache.lookup([1.0, 0.0, 0.0], None) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_lookup_picks_best_match():
+    cache = SemanticAnswerCache(threshold=0.5)
+    cache.store([1.0, 0.2], None, {"answer": "near"})
+    cache.store([1.0, 0.9], None, {"answer": "far"})
+    assert cache.lookup([1.0, 0.1], None) == {"answer": "near"}
+
+
+def test_expired_and_evicted_entries_are_removed():
+    cache = SemanticAnswerCache(ttl=0.0)
+    cache.store([1.0, 0.0], None, {"answer": "a"})
+    time.sleep(0.001)
+    assert cache.lookup([1.0, 0.0], None) is None
+    assert cache.stats()["size"] == 0
+
+    cache = SemanticAnswerCache(max_size=2)
+    for i, vector in enumerate([[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0]]):
+        cache.store(vector, None, {"answer": i})
+    assert cache.lookup([1.0, 0.0], None) is None
+    assert cache.lookup([-1.0, 0.0], None) == {"answer": 2}
+    assert len(cache._buckets[filter_key(None)]) == 2
+
+
+def test_sync_generation_clears_on_change():
+    cache = SemanticAnswerCache(check_interval=0.0)
+    generations = iter([1, 1, 2])
+
+    async def fetch():
+        return next(generations)
+
+    asyncio.run(cache.sync_generation(fetch))
+    cache.store([1.0, 0.0], None, {"answer": "a"})
+    asyncio.run(cache.sync_generation(fetch))
+    assert cache.stats()["size"] == 1
+    asyncio.run(cache.sync_generation(fetch))
+    assert cache.stats()["size"] == 0
+    assert cache.lookup([1.0, 0.0], None) is None
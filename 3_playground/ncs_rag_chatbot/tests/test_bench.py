@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+import run_bench
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench", "run_bench.py")
+
+
+def test_corpus_and_queries_are_deterministic():
+    assert run_bench.build_corpus(30, seed=1) == run_bench.build_corpus(30, seed=1)
+    assert run_bench.build_corpus(30, seed=1) != run_bench.build_corpus(30, seed=2)
+    queries = run_bench.build_queries(50, seed=1, repeat_ratio=0.5)
+    assert queries == run_bench.build_queries(50, seed=1, repeat_ratio=0.5)
+    assert len({json.dumps(q, ensure_ascii=False) for q in queries}) < len(queries)
+
+
+def test_percentiles():
+    assert run_bench.percentiles([0.001, 0.002, 0.003])["p50"] == 2.0
+
+
+def test_local_bench_smoke():
+    # 벤치마크는 server 모듈 전역을 바꾸므로 별도 프로세스에서 실행
+    result = subprocess.run(
+        [
+            sys.executable, BENCH, "--docs", "60", "--dim", "16", "--requests", "20", "--warmup", "2",
+            "--concurrency", "4", "--embed-latency-ms", "0", "--llm-latency-ms", "0", "--output-tokens", "3",
+        ],
+        capture_output=True, text=True, timeout=120, check=True,
+    )
+    report = json.loads(result.stdout)
+    assert report["requests"] == 20 and report["errors"] == 0
+    assert report["latency_ms"]["p50"] > 0
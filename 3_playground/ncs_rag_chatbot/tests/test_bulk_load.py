@@ -0,0 +1,99 @@
+from bulk_load import CopyWriter
+from quantization import VectorStorageConfig
+import asyncio
+import contextlib
+import json
+import pytest
+import uuid
+
+COLUMNS = ["main_category", "sub_category", "source", "page"]
+
+
+class FakeConnection:
+    """COPY/SQL 호출만 기록하는 asyncpg 연결 대역"""
+
+    def __init__(self):
+        self.copies = []
+        self.statements = []
+        self.transactions = 0
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies.append((table, list(records), columns))
+
+    async def execute(self, sql):
+        self.statements.append(sql)
+
+    @contextlib.asynccontextmanager
+    async def _transaction(self):
+        self.transactions += 1
+        yield
+
+    def transaction(self):
+        return self._transaction()
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    @contextlib.asynccontextmanager
+    async def _acquire(self):
+        yield self.conn
+
+    def acquire(self):
+        return self._acquire()
+
+
+def _writer(**kwargs):
+    return CopyWriter(FakePool(), "t", COLUMNS, ["langchain_id"], **kwargs)
+
+
+def test_record_splits_metadata_columns_from_json():
+    writer = _writer()
+    doc_id = str(uuid.uuid4())
+    record = writer._record(doc_id, "본문", [0.1, 0.2], {
+        "main_category": "대", "page": 3, "start_index": 10, "duplicates": [{"source": "b.pdf"}],
+    })
+    assert writer.columns == ["langchain_id", "content", "embedding"] + COLUMNS + ["langchain_metadata"]
+    assert record[:7] == (uuid.UUID(doc_id), "본문", [0.1, 0.2], "대", None, None, 3)
+    assert json.loads(record[7]) == {"start_index": 10, "duplicates": [{"source": "b.pdf"}]}
+
+
+def test_record_truncates_and_keeps_full_embedding():
+    writer = _writer(storage=VectorStorageConfig(dimensions=2, full_dimensions=4))
+    assert writer.columns[-2:] == ["embedding_full", "langchain_metadata"]
+    record = writer._record(str(uuid.uuid4()), "x", [3.0, 4.0, 0.0, 1.0], {"embedding_full": "[...]"})
+    assert record[2] == pytest.approx([0.6, 0.8])
+    assert record[-2] == [3.0, 4.0, 0.0, 1.0]
+    assert json.loads(record[-1]) == {}
+
+
+def test_merge_sql_updates_all_but_primary_key():
+    writer = CopyWriter(FakePool(), "t", COLUMNS, ["langchain_id", "main_category"])
+    sql = writer._merge_sql("stage")
+    assert sql.startswith('INSERT INTO "t" ("langchain_id", "content", "embedding", "main_category"')
+    assert 'FROM "stage" ON CONFLICT ("langchain_id", "main_category") DO UPDATE SET "content" = EXCLUDED."content"' in sql
+    assert '"main_category" = EXCLUDED' not in sql and '"langchain_id" = EXCLUDED' not in sql
+
+
+@pytest.mark.parametrize("upsert", [False, True])
+def test_writes_in_batches(upsert):
+    writer = _writer(batch_size=2, upsert=upsert)
+    ids = [str(uuid.uuid4()) for _ in range(5)]
+    returned = asyncio.run(writer.aadd_embeddings(
+        [f"t{i}" for i in range(5)], [[float(i)] for i in range(5)], [{"page": i} for i in range(5)], ids=ids,
+    ))
+    conn = writer.pool.conn
+
+    assert returned == ids and writer.rows == 5 and writer.copies == 3
+    assert [len(records) for _, records, _ in conn.copies] == [2, 2, 1]
+    assert [records[0][0] for _, records, _ in conn.copies] == [uuid.UUID(ids[i]) for i in (0, 2, 4)]
+    if upsert:
+        # 임시 테이블에 COPY한 뒤 배치마다 트랜잭션 안에서 합침
+        assert {table for table, _, _ in conn.copies} == {"t_copy_stage"}
+        assert conn.transactions == 3
+        assert sum("ON CONFLICT" in sql for sql in conn.statements) == 3
+    else:
+        assert {table for table, _, _ in conn.copies} == {"t"}
+        assert conn.statements == []
+    assert ("upsert" if upsert else "direct") in writer.summary()
@@ -0,0 +1,67 @@
+from context import ContextAssembler, _approx_count, _approx_truncate
+from langchain_core.documents import Document
+import pytest
+
+TEXT = "".join(f"문장{i:03d}. " for i in range(200))
+
+
+def _chunk(start, end, doc_id=None, page=1):
+    return Document(
+        id=doc_id or f"{start}-{end}", page_content=TEXT[start:end],
+        metadata={"source": "a.pdf", "page": page, "start_index": start},
+    )
+
+
+def _words(text):
+    return len(text.split())
+
+
+def test_merges_overlapping_adjacent_and_contained_chunks():
+    assembler = ContextAssembler(token_counter=_words)
+    merged = assembler.merge([_chunk(100, 200), _chunk(0, 120), _chunk(150, 180), _chunk(200, 260)])
+    assert len(merged) == 1
+    assert merged[0].page_content == TEXT[0:260]
+    assert merged[0].metadata["start_index"] == 0
+    assert merged[0].metadata["merged_ids"] == ["0-120", "100-200", "150-180", "200-260"]
+
+
+def test_keeps_separate_pages_in_rank_order_and_drops_duplicates():
+    assembler = ContextAssembler(token_counter=_words)
+    docs = [_chunk(0, 50, "p2", page=2), _chunk(50, 100, "p1"), _chunk(0, 50, "p2", page=2), Document(page_content="메모")]
+    merged = assembler.merge(docs)
+    assert [d.id for d in merged] == ["p2", "p1", None]
+
+
+def test_packs_by_rank_and_truncates_last_segment_with_custom_counter():
+    assembler = ContextAssembler(max_tokens=100, token_counter=_words)
+    first = Document(id="a", page_content=" ".join(["가"] * 30), metadata={"source": "a.pdf"})
+    second = Document(id="b", page_content=" ".join(f"w{i}" for i in range(200)), metadata={"source": "b.pdf"})
+    third = Document(id="c", page_content="버려짐", metadata={"source": "c.pdf"})
+
+    packed = assembler.assemble([first, second, third])
+    assert [d.id for d in packed] == ["a", "b"]
+    assert packed[1].metadata["truncated"] is True
+    # 지정한 토큰 수 계산 함수 기준으로 남은 예산(70)에 정확히 맞게 자름
+    assert _words(packed[1].page_content) == 70
+    assert sum(_words(d.page_content) for d in packed) <= 100
+
+    # 남은 예산이 너무 적으면 자르지 않고 버림
+    assert [d.id for d in assembler.assemble([first, second], max_tokens=40)] == ["a"]
+
+
+def test_custom_truncator_is_used():
+    calls = []
+
+    def truncate(text, max_tokens):
+        calls.append(max_tokens)
+        return text[:max_tokens]
+
+    assembler = ContextAssembler(max_tokens=80, token_counter=len, token_truncator=truncate)
+    packed = assembler.assemble([Document(page_content="x" * 200)])
+    assert calls == [80] and packed[0].page_content == "x" * 80
+
+
+@pytest.mark.parametrize("text", ["한글 문장입니다", "english words here", "혼합 mixed 텍스트"])
+def test_approx_truncate_fits_approx_count(text):
+    for limit in range(1, _approx_count(text) + 1):
+        assert _approx_count(_approx_truncate(text, limit)) <= limit
@@ -0,0 +1,27 @@
+from db_pool import MonitoredQueuePool, create_pooled_engine, pool_stats
+from fakes import FakeEmbeddings
+from vector_store import VectorStoreManager
+import asyncio
+
+
+def test_pooled_engine_applies_settings_without_connecting():
+    engine = create_pooled_engine(
+        "postgresql+asyncpg://user:pw@localhost:1/db", pool_size=3, max_overflow=2, pool_timeout=1.5,
+    )
+    pool = engine.pool
+    assert isinstance(pool, MonitoredQueuePool)
+    assert pool.size() == 3 and pool._max_overflow == 2 and pool._timeout == 1.5
+
+    stats = pool_stats(engine)
+    assert stats["pool_size"] == 3
+    assert (stats["checked_out"], stats["waiting"], stats["acquires"], stats["avg_wait_ms"]) == (0, 0, 0, 0.0)
+
+
+def test_local_warmup_searches_only_when_dimension_is_known():
+    manager = asyncio.run(VectorStoreManager.create_local(FakeEmbeddings(dim=8)))
+    assert manager.pool_stats() is None
+    assert asyncio.run(manager.awarmup())["search"] is False
+
+    manager.vector_store.add_texts(["가"], ids=["a"])
+    result = asyncio.run(manager.awarmup())
+    assert result["search"] is True and result["connections"] == 0
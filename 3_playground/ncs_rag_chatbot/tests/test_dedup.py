@@ -0,0 +1,98 @@
+from dedup import MinHasher, NearDuplicateIndex, estimate_jaccard
+from fakes import FakeEmbeddings
+from local_store import LocalVectorStore
+from manifest import IngestManifest
+from pipeline import IngestPipeline
+import asyncio
+import pytest
+import random
+
+TEXT = " ".join(f"품질 보증 활동 {i}번 항목은 산출물을 점검한다." for i in range(40))
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def test_signature_is_deterministic_and_ignores_whitespace():
+    a, b = MinHasher(), MinHasher()
+    assert (a.signature(TEXT) == b.signature(TEXT)).all()
+    assert (a.signature("가  나\n다") == a.signature("가 나 다")).all()
+    assert a.shingles("짧음") == {"짧음"}
+
+
+def test_estimate_tracks_true_jaccard():
+    hasher = MinHasher(num_perm=256)
+    rng = random.Random(7)
+    words = TEXT.split()
+    for _ in range(10):
+        other = " ".join(w if rng.random() > 0.15 else "변경" for w in words)
+        exact = _jaccard(hasher.shingles(TEXT), hasher.shingles(other))
+        assert abs(estimate_jaccard(hasher.signature(TEXT), hasher.signature(other)) - exact) < 0.1
+
+
+def test_index_finds_near_duplicates_and_removes_files():
+    index = NearDuplicateIndex(threshold=0.8)
+    hasher = index.hasher()
+    index.add("c1", "f1", hasher.signature(TEXT))
+    index.add("c2", "f2", hasher.signature("전혀 다른 임베디드 시스템 요구사항 분석 문서입니다." * 5))
+
+    assert index.find(hasher.signature(TEXT.replace("40번", "사십번"))) == "c1"
+    assert index.find(hasher.signature("관련 없는 네트워크 보안 내용" * 10)) is None
+
+    index.remove_file("f1")
+    assert len(index) == 1 and index.find(hasher.signature(TEXT)) is None
+    assert all("c1" not in bucket for bucket in index._buckets.values())
+
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=64, bands=7)
+
+
+def test_load_keeps_only_done_chunks_with_same_params(tmp_path, make_pdf):
+    manifest = IngestManifest(str(tmp_path / "m.json"), "t")
+    entry = {"main_category": "a", "sub_category": "b", "source": "x.pdf", "file_path": make_pdf("x.pdf", [["x"]])}
+    pending = dict(entry, source="y.pdf")
+    manifest.mark_done(entry, "h", ["c1"])
+    manifest.mark_pending(pending, ["c2"])
+
+    index = NearDuplicateIndex(str(tmp_path / "dedup.json"))
+    signature = index.hasher().signature(TEXT)
+    index.add("c1", IngestManifest.file_key(entry), signature)
+    index.add("c2", IngestManifest.file_key(pending), signature)
+    index.add("c3", IngestManifest.file_key(entry), signature)
+    index.save("t")
+
+    loaded = NearDuplicateIndex.load(str(tmp_path / "dedup.json"), manifest)
+    assert list(loaded.entries) == ["c1"]
+    assert (loaded.entries["c1"][1] == signature).all()
+    assert len(NearDuplicateIndex.load(str(tmp_path / "dedup.json"), manifest, shingle=4)) == 0
+    assert len(NearDuplicateIndex.load(str(tmp_path / "dedup.json"), IngestManifest("m", "other"))) == 0
+
+
+def test_pipeline_skips_duplicate_chunks_across_files(tmp_path, make_pdf):
+    pages = [[f"page {p} line {i} about quality assurance audit records" for i in range(20)] for p in range(3)]
+    entries = [
+        {"main_category": "a", "sub_category": sub, "source": f"{sub}.pdf", "file_path": make_pdf(f"{sub}.pdf", pages)}
+        for sub in ("first", "second")
+    ]
+    store = LocalVectorStore(FakeEmbeddings(dim=16))
+    manifest = IngestManifest(str(tmp_path / "m.json"), "t")
+    dedup = NearDuplicateIndex(threshold=0.9)
+
+    def pipeline():
+        return IngestPipeline(
+            store, store.embeddings, manifest, parse_workers=1, batch_size=8, chunk_size=300, chunk_overlap=50,
+            dedup=dedup,
+        )
+
+    # 첫 파일을 저장한 뒤 같은 내용의 두 번째 파일을 적재하면 새로 저장하는 청크가 없음
+    added = asyncio.run(pipeline().run(entries[:1]))
+    assert added == len(store) > 0
+    assert asyncio.run(pipeline().run(entries[1:])) == 0
+
+    first, second = (IngestManifest.file_key(e) for e in entries)
+    duplicates = manifest.duplicates(second)
+    assert manifest.chunk_ids(second) == []
+    assert len(duplicates) == added + len(manifest.duplicates(first))
+    assert {canonical for canonical, _ in duplicates} == set(manifest.chunk_ids(first))
+    assert manifest.dependent_keys([first]) == [second]
@@ -0,0 +1,112 @@
+from embeddings import CachedEmbeddings, QueryEmbeddingCache, normalize_text
+from fakes import FakeEmbeddings
+import asyncio
+
+
+def _total(cache):
+    return cache._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embedding_cache").fetchone()[0]
+
+
+def test_normalize_text():
+    assert normalize_text("  네트워크\n\t보안  ") == "네트워크 보안"
+
+
+def test_cached_embeddings_hits_and_persists(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    fake = FakeEmbeddings(dim=8)
+    cache = CachedEmbeddings(fake, path)
+
+    first = cache.embed_documents(["가 나", "다", "가 나"])
+    assert (cache.hits, cache.misses, fake.calls) == (0, 2, 1)
+    # 공백만 다른 텍스트는 같은 키
+    assert cache.embed_documents(["가  나", "다"]) == [first[0], first[1]]
+    assert cache.hits == 2 and fake.calls == 1
+
+    reopened = CachedEmbeddings(FakeEmbeddings(dim=8), path)
+    assert reopened._total_bytes == _total(cache) == 2 * 8 * 4
+    assert asyncio.run(reopened.aembed_query("다")) == first[1]
+    assert reopened.hits == 1
+
+
+def test_cached_embeddings_replace_does_not_inflate_size(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = CachedEmbeddings(FakeEmbeddings(dim=8), path)
+    cache.embed_documents(["가", "나"])
+
+    # 다른 프로세스가 조회와 저장 사이에 같은 키를 먼저 저장한 경우 (REPLACE로 덮어씀)
+    keys, found = cache._lookup(["가", "다"])
+    cache._store([(keys[0], "가"), (keys[1], "다")], cache.underlying.embed_documents(["가", "다"]), found)
+    assert cache._total_bytes == _total(cache) == 3 * 8 * 4
+
+
+def test_cached_embeddings_evicts_least_recently_used(tmp_path):
+    # 벡터 하나가 32바이트이므로 3개까지 저장 가능
+    cache = CachedEmbeddings(FakeEmbeddings(dim=8), str(tmp_path / "cache.sqlite3"), max_bytes=100)
+    for text in ["가", "나", "다", "라"]:
+        cache.embed_documents([text])
+
+    assert cache._total_bytes == _total(cache) <= 100
+    cache.misses = 0
+    cache.embed_documents(["라"])
+    assert cache.misses == 0
+    cache.embed_documents(["가"])
+    assert cache.misses == 1
+
+
+def test_query_cache_coalesces_concurrent_queries():
+    fake = FakeEmbeddings(dim=8, latency=0.05)
+    cache = QueryEmbeddingCache(fake)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.aembed_query("네트워크 보안") for _ in range(5)))
+
+    vectors = asyncio.run(scenario())
+    assert fake.calls == 1
+    assert all(vector == vectors[0] for vector in vectors)
+    assert (cache.misses, cache.coalesced) == (1, 4)
+    assert cache.stats()["inflight"] == 0
+
+    # 정규화 후 같은 질의는 캐시 적중
+    assert asyncio.run(cache.aembed_query(" 네트워크  보안 ")) == vectors[0]
+    assert cache.hits == 1 and fake.calls == 1
+
+
+def test_query_cache_cancelled_waiter_keeps_upstream_call():
+    fake = FakeEmbeddings(dim=8, latency=0.05)
+    cache = QueryEmbeddingCache(fake)
+
+    async def scenario():
+        first = asyncio.create_task(cache.aembed_query("가"))
+        second = asyncio.create_task(cache.aembed_query("가"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == fake.embed_query("가")
+    assert cache.stats()["size"] == 1
+
+
+def test_query_cache_lru_and_ttl():
+    cache = QueryEmbeddingCache(FakeEmbeddings(dim=8), max_size=2)
+    for text in ["가", "나", "가", "다"]:
+        cache.embed_query(text)
+    # "나"가 가장 오래 사용되지 않아 밀려남
+    assert set(cache._entries) == {"가", "다"}
+
+    expired = QueryEmbeddingCache(FakeEmbeddings(dim=8), ttl=0.0)
+    expired.embed_query("가")
+    expired.embed_query("가")
+    assert (expired.hits, expired.misses) == (0, 2)
+
+
+def test_aembed_queries_batches_misses():
+    fake = FakeEmbeddings(dim=8)
+    cache = QueryEmbeddingCache(fake)
+    cache.embed_query("가")
+    calls = fake.calls
+
+    vectors = asyncio.run(cache.aembed_queries(["가", "나", "다", "나"]))
+
+    assert fake.calls == calls + 1
+    assert vectors[1] == vectors[3] == fake.embed_query("나")
+    assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,67 @@
+from facets import FacetIndex, local_facets
+from fakes import FakeEmbeddings
+from local_store import LocalVectorStore
+import asyncio
+
+FACETS = [
+    ("정보기술관리", "IT테스트", "test.pdf", 10, 4),
+    ("정보기술관리", "IT테스트", "plan.pdf", 5, 2),
+    ("정보기술관리", "IT품질보증", "qa.pdf", 7, 3),
+    ("정보기술개발", "SW아키텍쳐", "arch.pdf", 3, 1),
+]
+
+
+def _index(facets=FACETS):
+    index = FacetIndex(check_interval=0)
+
+    async def load():
+        return facets
+
+    async def generation():
+        return 1
+
+    asyncio.run(index.sync(generation, load))
+    return index
+
+
+def test_local_facets_count_live_chunks_and_distinct_pages():
+    store = LocalVectorStore(FakeEmbeddings(dim=8))
+    metadatas = [
+        {"main_category": "a", "sub_category": "b", "source": "x.pdf", "page": 1},
+        {"main_category": "a", "sub_category": "b", "source": "x.pdf", "page": 1},
+        {"main_category": "a", "sub_category": "b", "source": "x.pdf", "page": 2},
+        {"main_category": "a", "sub_category": "c", "source": "y.pdf"},
+    ]
+    store.add_texts(["1", "2", "3", "4"], metadatas=metadatas, ids=["i1", "i2", "i3", "i4"])
+    store.delete(["i3"])
+    assert sorted(local_facets(store)) == [("a", "b", "x.pdf", 2, 1), ("a", "c", "y.pdf", 1, 0)]
+
+
+def test_categories_and_tree():
+    index = _index()
+    assert index.categories() == {"정보기술개발": ["SW아키텍쳐"], "정보기술관리": ["IT테스트", "IT품질보증"]}
+    tree = index.tree()
+    assert tree["정보기술관리"]["chunks"] == 22 and tree["정보기술관리"]["pages"] == 9
+    assert tree["정보기술관리"]["sub_categories"]["IT테스트"]["sources"]["plan.pdf"] == {"chunks": 5, "pages": 2}
+    assert index.stats() == {"loaded": True, "generation": 1, "facets": 4, "chunks": 25}
+
+
+def test_count_and_is_empty():
+    index = _index()
+    assert index.count(None) == 25
+    assert index.count({"main_category": {"$eq": "정보기술관리"}, "sub_category": "IT테스트"}) == 15
+    assert index.count({"sub_category": {"$in": ["IT품질보증", "SW아키텍쳐"]}}) == 10
+    # 패싯 컬럼이 아닌 조건과 판단할 수 없는 연산자는 무시 (상한값)
+    assert index.count({"source": {"$ne": "test.pdf"}, "page": {"$eq": 99}}) == 25
+
+    assert index.is_empty({"main_category": {"$eq": "직업기초능력"}})
+    assert index.is_empty({"main_category": "정보기술개발", "sub_category": "IT테스트"})
+    assert not index.is_empty({}) and not index.is_empty(None)
+
+
+def test_unloaded_index_never_reports_empty():
+    index = _index(facets=None)
+    assert not index.loaded and index.count({"main_category": "x"}) is None
+    assert not index.is_empty({"main_category": "x"})
+    # 패싯 테이블은 있지만 비어 있으면(적재된 행 없음) 모든 필터가 빈 결과
+    assert _index(facets=[]).is_empty({"main_category": "x"})
@@ -0,0 +1,42 @@
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_community.document_loaders.parsers.pdf import _purge_metadata
+from loader import DocumentLoader, _pdf_metadata
+import pytest
+
+PAGES = [[f"page {p} line {i} (sample) text" for i in range(5)] for p in range(6)]
+INFO = "/Title ( Sample Title ) /Author (tester) /CreationDate (D:20240102030405+09'00') /ModDate (bad date)"
+
+
+@pytest.fixture
+def pdf(make_pdf):
+    return make_pdf("doc.pdf", PAGES, info=INFO, page_labels="/Nums [0 << /S /r >> 2 << /S /D /St 1 >>]")
+
+
+def test_pdf_metadata_matches_langchain_rules():
+    metadata = {
+        "/Title": " 제목 ", "/CreationDate": "D:20240102030405+09'00'", "/ModDate": "D:잘못된값",
+        "/Page_Count": 3, "file_path": "a.pdf", "/Trapped": True, "/Custom": 1.5,
+    }
+    assert _pdf_metadata(metadata) == _purge_metadata(metadata)
+
+
+def test_lazy_load_matches_pypdf_loader(pdf):
+    expected = PyPDFLoader(pdf).load()
+    assert expected[0].metadata["title"] == "Sample Title" and expected[0].metadata["page_label"] == "i"
+
+    docs = list(DocumentLoader(pdf).lazy_load())
+    assert [(d.page_content, d.metadata) for d in docs] == [(d.page_content, d.metadata) for d in expected]
+
+
+@pytest.mark.parametrize("start,end", [(0, 2), (1, 4), (4, 6), (5, 99)])
+def test_page_ranges_with_precomputed_document_info(pdf, start, end):
+    expected = PyPDFLoader(pdf).load()[start:end]
+    loader = DocumentLoader(pdf)
+    doc_metadata, page_labels = loader.document_info()
+    assert doc_metadata["total_pages"] == len(PAGES) and len(page_labels) == len(PAGES)
+
+    for docs in (
+        list(loader.lazy_load(start, end)),
+        list(loader.lazy_load(start, end, doc_metadata, page_labels[start:end])),
+    ):
+        assert [(d.page_content, d.metadata) for d in docs] == [(d.page_content, d.metadata) for d in expected]
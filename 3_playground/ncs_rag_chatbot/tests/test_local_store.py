@@ -0,0 +1,105 @@
+from fakes import FakeEmbeddings
+from local_store import LocalVectorStore
+from vector_store import VectorStoreManager
+import asyncio
+import numpy as np
+import pytest
+
+TEXTS = ["네트워크 보안 점검", "데이터베이스 백업 절차", "네트워크 장비 설정", "소프트웨어 테스트 계획"]
+METADATAS = [
+    {"main_category": "정보기술", "sub_category": "보안", "source": "a.pdf", "page": 1},
+    {"main_category": "정보기술", "sub_category": "DB", "source": "b.pdf", "page": 2},
+    {"main_category": "정보기술", "sub_category": "보안", "source": "a.pdf", "page": 3},
+    {"main_category": "경영", "sub_category": "품질", "source": "c.pdf", "page": 1},
+]
+
+
+@pytest.fixture
+def store():
+    return LocalVectorStore.from_texts(
+        TEXTS, FakeEmbeddings(dim=16), metadatas=METADATAS, ids=[f"id{i}" for i in range(len(TEXTS))]
+    )
+
+
+def _brute_force(store, query, k, rows):
+    vectors = np.asarray(store.embeddings.embed_documents([store.texts[r] for r in rows]))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    q = np.asarray(store.embeddings.embed_query(query))
+    order = np.argsort(-(vectors @ (q / np.linalg.norm(q))))[:k]
+    return [store.ids[rows[i]] for i in order]
+
+
+def test_search_matches_brute_force_with_filters(store):
+    assert [d.id for d in store.similarity_search("네트워크", k=3)] == _brute_force(store, "네트워크", 3, [0, 1, 2, 3])
+    docs = store.similarity_search("네트워크", k=4, filter={"sub_category": {"$eq": "보안"}})
+    assert {d.id for d in docs} == {"id0", "id2"}
+    docs = store.similarity_search("백업", k=4, filter={"source": {"$in": ["b.pdf", "c.pdf"]}, "main_category": "경영"})
+    assert [d.id for d in docs] == ["id3"]
+    assert store.similarity_search("x", filter={"source": "none.pdf"}) == []
+    with pytest.raises(ValueError):
+        store.similarity_search("x", filter={"unknown": "v"})
+    with pytest.raises(ValueError):
+        store.similarity_search("x", filter={"page": {"$gt": 1}})
+
+
+def test_scores_are_cosine_distance(store):
+    doc, distance = store.similarity_search_with_score_by_vector(store.embeddings.embed_query(TEXTS[1]), k=1)[0]
+    assert doc.id == "id1"
+    assert distance == pytest.approx(0.0, abs=1e-5)
+
+
+def test_overwrite_and_delete_update_bitmaps(store):
+    store.add_texts(["경영 전략"], metadatas=[{"main_category": "경영", "sub_category": "전략", "source": "d.pdf"}], ids=["id0"])
+    assert {d.id for d in store.similarity_search("x", k=4, filter={"sub_category": "보안"})} == {"id2"}
+    store.delete(["id2", "missing"])
+    assert store.similarity_search("x", k=4, filter={"sub_category": "보안"}) == []
+    assert len(store) == 3
+
+    store.update_metadata({"id1": {"note": "x"}})
+    assert store.metadatas[store._id_to_row["id1"]]["note"] == "x"
+    with pytest.raises(ValueError):
+        store.update_metadata({"id1": {"source": "z.pdf"}})
+
+
+def test_snapshot_round_trip_compacts_deleted_rows(store, tmp_path):
+    store.delete(["id1"])
+    store.save(str(tmp_path))
+    loaded = LocalVectorStore.load(str(tmp_path), store.embeddings)
+
+    assert loaded.ids == ["id0", "id2", "id3"]
+    assert loaded.dimension == 16
+    query = store.embeddings.embed_query("네트워크")
+    assert [d.id for d in loaded.similarity_search_by_vector(query, k=3)] == \
+        [d.id for d in store.similarity_search_by_vector(query, k=3)]
+    # 메모리 매핑된 스냅샷에도 추가 가능 (메모리로 복사)
+    loaded.add_texts(["추가 문서"], metadatas=[{"source": "e.pdf"}], ids=["id9"])
+    assert [d.id for d in loaded.similarity_search("추가 문서", k=1)] == ["id9"]
+
+
+def test_empty_snapshot_round_trip(tmp_path):
+    empty = LocalVectorStore(FakeEmbeddings(dim=16))
+    empty.save(str(tmp_path / "empty"))
+    loaded = LocalVectorStore.load(str(tmp_path / "empty"), empty.embeddings)
+    assert loaded.dimension is None and len(loaded) == 0
+    loaded.add_texts(["첫 문서"], ids=["a"])
+    assert loaded.dimension == 16
+
+    # 모두 삭제한 저장소도 같은 방식으로 로드됨
+    store = LocalVectorStore.from_texts(["가"], FakeEmbeddings(dim=16), ids=["a"])
+    store.delete(["a"])
+    store.save(str(tmp_path / "deleted"))
+    loaded = LocalVectorStore.load(str(tmp_path / "deleted"), store.embeddings)
+    loaded.add_texts(["나"], ids=["b"])
+    assert loaded.ids == ["b"]
+
+
+def test_dimension_mismatch_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.add_embeddings(["x"], [[1.0, 0.0]])
+
+
+def test_manager_local_backend_rejects_postgres_only_features(tmp_path):
+    manager = asyncio.run(VectorStoreManager.create_local(FakeEmbeddings(dim=16), str(tmp_path / "snap")))
+    assert manager.is_local
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.acreate_ann_index())
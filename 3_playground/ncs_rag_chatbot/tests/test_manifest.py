@@ -0,0 +1,156 @@
+from langchain_core.documents import Document
+from manifest import (
+    STATUS_DONE, STATUS_PENDING, ChunkIdAssigner, IngestManifest, assign_chunk_ids, file_sha256,
+)
+import pytest
+
+
+def _docs(*contents, page=1):
+    return [Document(page_content=c, metadata={"source": "a.pdf", "page": page}) for c in contents]
+
+
+@pytest.fixture
+def entry(tmp_path):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(b"%PDF-1.4 first")
+    return {
+        "main_category": "정보기술관리",
+        "sub_category": "IT테스트",
+        "source": "a.pdf",
+        "file_path": str(path),
+    }
+
+
+def test_chunk_ids_are_deterministic_and_distinguish_repeats():
+    docs = _docs("가", "나", "가")
+    ids = assign_chunk_ids("k", docs)
+    assert ids == assign_chunk_ids("k", docs)
+    # 같은 본문이 두 번 나와도 등장 순서로 구분
+    assert len(set(ids)) == 3
+    # 다른 파일 키면 다른 ID
+    assert set(ids).isdisjoint(assign_chunk_ids("other", docs))
+
+
+def test_chunk_ids_depend_on_metadata():
+    assert assign_chunk_ids("k", _docs("가", page=1)) != assign_chunk_ids("k", _docs("가", page=2))
+
+
+def test_streaming_assigner_matches_whole_file():
+    docs = _docs("가", "나", "가", "다", "가")
+    assigner = ChunkIdAssigner("k")
+    streamed = assigner.assign(docs[:2]) + assigner.assign(docs[2:4]) + assigner.assign(docs[4:])
+    assert streamed == assign_chunk_ids("k", docs)
+
+
+def test_roundtrip_and_table_mismatch(tmp_path, entry):
+    path = str(tmp_path / "manifest.json")
+    manifest = IngestManifest(path, "t1")
+    manifest.mark_done(entry, file_sha256(entry["file_path"]), ["id1", "id2"])
+
+    loaded = IngestManifest.load(path, "t1")
+    key = IngestManifest.file_key(entry)
+    assert loaded.files[key]["status"] == STATUS_DONE
+    assert loaded.chunk_ids(key) == ["id1", "id2"]
+    # 다른 테이블용 매니페스트는 무시
+    assert IngestManifest.load(path, "t2").files == {}
+
+
+def test_is_unchanged_uses_stat_then_hash(tmp_path, entry):
+    manifest = IngestManifest(str(tmp_path / "m.json"), "t")
+    assert not manifest.is_unchanged(entry)
+    manifest.mark_done(entry, file_sha256(entry["file_path"]), [])
+    assert manifest.is_unchanged(entry)
+
+    # 수정 시각만 바뀌면 해시로 비교해 변경 없음으로 판단하고 stat을 갱신
+    key = IngestManifest.file_key(entry)
+    manifest.files[key]["mtime"] = 0
+    assert manifest.is_unchanged(entry)
+    assert manifest.files[key]["mtime"] != 0
+
+    # 내용이 바뀌면 변경됨
+    with open(entry["file_path"], "wb") as f:
+        f.write(b"%PDF-1.4 second!")
+    assert not manifest.is_unchanged(entry)
+
+
+def test_pending_is_not_unchanged(tmp_path, entry):
+    manifest = IngestManifest(str(tmp_path / "m.json"), "t")
+    manifest.mark_pending(entry, ["id1"])
+    key = IngestManifest.file_key(entry)
+    assert manifest.is_pending(key)
+    assert manifest.files[key]["status"] == STATUS_PENDING
+    assert not manifest.is_unchanged(entry)
+
+
+def test_removed_keys(tmp_path, entry):
+    manifest = IngestManifest(str(tmp_path / "m.json"), "t")
+    manifest.mark_done(entry, "h", [])
+    other = dict(entry, source="b.pdf")
+    assert manifest.removed_keys([entry]) == []
+    assert manifest.removed_keys([other]) == [IngestManifest.file_key(entry)]
+
+
+def test_autosave_off_writes_only_on_flush(tmp_path, entry):
+    path = tmp_path / "m.json"
+    manifest = IngestManifest(str(path), "t", autosave=False)
+    manifest.mark_done(entry, "h", ["id1"])
+    assert not path.exists()
+    manifest.flush()
+    assert IngestManifest.load(str(path), "t").chunk_ids(IngestManifest.file_key(entry)) == ["id1"]
+
+
+def test_pending_ids_are_journaled_and_replayed(tmp_path, entry):
+    path = tmp_path / "m.json"
+    manifest = IngestManifest(str(path), "t")
+    manifest.mark_pending(entry, ["id1"])
+    manifest.append_pending(entry, ["id2", "id3"])
+    manifest.append_pending(entry, ["id4"])
+    key = IngestManifest.file_key(entry)
+    assert manifest.chunk_ids(key) == ["id1", "id2", "id3", "id4"]
+
+    # 중단된 실행: 매니페스트에는 id1만 있고 나머지는 저널에 있음 (마지막 줄은 쓰다가 끊김)
+    with open(manifest.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"key": "')
+    reloaded = IngestManifest.load(str(path), "t")
+    assert reloaded.is_pending(key)
+    assert reloaded.chunk_ids(key) == ["id1", "id2", "id3", "id4"]
+
+    # flush하면 저널 내용이 매니페스트에 반영되고 저널은 지워짐
+    reloaded.flush()
+    assert not (tmp_path / "m.json.pending").exists()
+    assert IngestManifest.load(str(path), "t").chunk_ids(key) == ["id1", "id2", "id3", "id4"]
+
+
+def test_journal_is_ignored_for_done_files_and_without_autosave(tmp_path, entry):
+    path = tmp_path / "m.json"
+    manifest = IngestManifest(str(path), "t", autosave=False)
+    manifest.mark_pending(entry, [])
+    manifest.append_pending(entry, ["id1"])
+    assert not (tmp_path / "m.json.pending").exists()
+
+    manifest = IngestManifest(str(path), "t")
+    manifest.mark_done(entry, "h", ["id1"])
+    with open(manifest.journal_path, "w", encoding="utf-8") as f:
+        f.write('{"key": "%s", "chunk_ids": ["stale"]}\n' % IngestManifest.file_key(entry))
+    assert IngestManifest.load(str(path), "t").chunk_ids(IngestManifest.file_key(entry)) == ["id1"]
+
+
+def test_duplicates_dependents_and_provenance(tmp_path, entry):
+    manifest = IngestManifest(str(tmp_path / "m.json"), "t")
+    other = dict(entry, sub_category="IT품질보증", source="b.pdf")
+    manifest.mark_done(entry, "h", ["c1", "c2"])
+    manifest.mark_done(other, "h", ["c3"], duplicates=[["c1", 3], ["c1", 4], ["c3", 1]])
+    key, other_key = IngestManifest.file_key(entry), IngestManifest.file_key(other)
+
+    assert manifest.duplicates(key) == [] and "duplicates" not in manifest.files[key]
+    assert manifest.duplicates(other_key) == [["c1", 3], ["c1", 4], ["c3", 1]]
+    # a.pdf를 다시 적재하면 b.pdf의 대표 청크(c1)가 사라질 수 있음
+    assert manifest.dependent_keys([key]) == [other_key]
+    assert manifest.dependent_keys([other_key]) == []
+
+    provenance = manifest.provenance(["c1", "c2"])
+    assert provenance["c2"] == []
+    assert provenance["c1"] == [
+        {"main_category": "정보기술관리", "sub_category": "IT품질보증", "source": "b.pdf", "page": page}
+        for page in (3, 4)
+    ]
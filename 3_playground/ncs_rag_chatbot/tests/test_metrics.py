@@ -0,0 +1,45 @@
+from metrics import MetricsRegistry, filter_label, server_timing_header, span, start_request
+import pytest
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("h_seconds", "help", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 2.0):
+        hist.observe(value, stage="llm")
+    text = registry.render()
+    assert 'h_seconds_bucket{stage="llm",le="0.1"} 1' in text
+    assert 'h_seconds_bucket{stage="llm",le="1"} 2' in text
+    assert 'h_seconds_bucket{stage="llm",le="+Inf"} 3' in text
+    assert 'h_seconds_count{stage="llm"} 3' in text
+    assert hist.count(stage="llm") == 3
+
+
+def test_counter_gauge_and_label_checks():
+    registry = MetricsRegistry()
+    counter = registry.counter("c_total", "help", ["source"])
+    counter.inc(source='a"b')
+    counter.inc(2, source='a"b')
+    assert counter.value(source='a"b') == 3
+    assert 'c_total{source="a\\"b"} 3' in registry.render()
+    # 같은 이름은 기존 메트릭 반환
+    assert registry.counter("c_total", "help", ["source"]) is counter
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+    gauge = registry.gauge("g", "help")
+    gauge.set(1.5)
+    assert "g 1.5" in registry.render()
+
+
+def test_spans_are_recorded_per_request():
+    spans = start_request()
+    with span("embed"):
+        pass
+    assert [name for name, _ in spans] == ["embed"]
+    assert server_timing_header([("embed", 0.0123), ("total", 0.5)]).startswith("embed;dur=12.3")
+
+
+def test_filter_label():
+    assert filter_label({}) == "none"
+    assert filter_label({"sub_category": 1, "main_category": 2}) == "main_category+sub_category"
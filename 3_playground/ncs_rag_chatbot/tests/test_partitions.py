@@ -0,0 +1,85 @@
+from partitions import (
+    EF_SEARCH_STEPS, ExactScanQueryOptions, FilteredHNSWQueryOptions, PartitionPlanner, _literal, partition_name,
+)
+import asyncio
+
+COUNTS = {
+    ("정보기술관리", "IT테스트"): 500,
+    ("정보기술관리", "IT품질보증"): 1500,
+    ("정보기술개발", "임베디드SW엔지니어링"): 60000,
+    ("정보기술개발", "응용SW엔지니어링"): 40000,
+}
+
+
+def _planner(partition_by="main_category", exact_max_rows=1000):
+    planner = PartitionPlanner(exact_max_rows=exact_max_rows, check_interval=0)
+    planner.counts = dict(COUNTS)
+    planner.partition_by = partition_by
+    return planner
+
+
+def test_partition_names_are_stable_and_literals_escaped():
+    assert partition_name("t", "정보기술관리") == partition_name("t", "정보기술관리")
+    assert partition_name("t", "정보기술관리") != partition_name("t", "정보기술개발")
+    assert _literal("a'b") == "'a''b'"
+
+
+def test_default_plan_without_filter_or_stats():
+    assert PartitionPlanner().plan({"main_category": "x"}, 4).mode == "default"
+    plan = _planner().plan(None, 4)
+    assert plan.mode == "default" and plan.filter is None
+    assert _planner().query_options(plan) is None
+
+
+def test_small_slice_uses_exact_scan():
+    planner = _planner()
+    plan = planner.plan({"sub_category": {"$eq": "IT테스트"}}, 4)
+    assert plan.mode == "exact" and plan.rows == 500
+    # 파티션 키가 아닌 중분류로만 필터해도 파티션 키 조건을 추가해 해당 파티션만 검색
+    assert plan.filter["main_category"] == {"$in": ["정보기술관리"]}
+    assert plan.scanned == 2000
+    assert isinstance(planner.query_options(plan), ExactScanQueryOptions)
+
+
+def test_large_slice_raises_ef_search_by_selectivity():
+    planner = _planner()
+    plan = planner.plan({"main_category": "정보기술개발", "sub_category": "응용SW엔지니어링"}, 10)
+    assert plan.mode == "ann" and plan.rows == 40000 and plan.scanned == 100000
+    # 선택도 0.4 → 2 * 10 / 0.4 = 50 이상인 첫 단계
+    assert plan.ef_search == 80
+    options = planner.query_options(plan)
+    assert isinstance(options, FilteredHNSWQueryOptions) and options.to_parameter() == ["hnsw.ef_search = 80"]
+
+    # 통계가 없는 조건(source)이 있으면 최대값
+    plan = planner.plan({"main_category": "정보기술개발", "source": "a.pdf"}, 10)
+    assert plan.mode == "ann" and plan.ef_search == EF_SEARCH_STEPS[-1]
+    assert planner.stats()["plans"] == {"ann": 2}
+
+
+def test_single_table_scans_everything():
+    planner = _planner(partition_by=None, exact_max_rows=10)
+    plan = planner.plan({"sub_category": "IT테스트"}, 4)
+    assert plan.filter == {"sub_category": "IT테스트"}
+    assert plan.scanned == sum(COUNTS.values())
+    # 선택도 500 / 102000 → 필요한 ef_search가 단계 최대값을 넘음
+    assert plan.mode == "ann" and plan.ef_search == EF_SEARCH_STEPS[-1]
+
+
+def test_sync_reloads_only_when_generation_changes():
+    planner = PartitionPlanner(check_interval=0)
+    generation = [1]
+    loads = []
+
+    async def fetch_generation():
+        return generation[0]
+
+    async def load():
+        loads.append(generation[0])
+        return dict(COUNTS), "sub_category"
+
+    asyncio.run(planner.sync(fetch_generation, load))
+    asyncio.run(planner.sync(fetch_generation, load))
+    generation[0] = 2
+    asyncio.run(planner.sync(fetch_generation, load))
+    assert loads == [1, 2]
+    assert planner.partition_by == "sub_category" and planner.total_rows == sum(COUNTS.values())
@@ -0,0 +1,130 @@
+from fakes import FakeEmbeddings
+from local_store import LocalVectorStore
+from manifest import STATUS_DONE, IngestManifest
+from pipeline import IngestPipeline, MemoryBudget, StageStats
+import asyncio
+import pytest
+
+
+def _lines(prefix, count):
+    return [f"{prefix} line {i} about network security testing and quality" for i in range(count)]
+
+
+@pytest.fixture
+def entries(make_pdf):
+    return [
+        {
+            "main_category": "정보기술",
+            "sub_category": f"sub{n}",
+            "source": f"doc{n}.pdf",
+            "file_path": make_pdf(f"doc{n}.pdf", [_lines(f"doc{n} page{p}", 30) for p in range(5)]),
+        }
+        for n in range(2)
+    ]
+
+
+def _pipeline(store, manifest, **kwargs):
+    params = dict(
+        parse_workers=1, embed_concurrency=2, batch_size=8, chunk_size=300, chunk_overlap=50, pages_per_task=2,
+    )
+    params.update(kwargs)
+    return IngestPipeline(store, store.embeddings, manifest, **params)
+
+
+def test_pipeline_ingests_all_chunks_and_marks_done(tmp_path, entries):
+    store = LocalVectorStore(FakeEmbeddings(dim=16))
+    manifest = IngestManifest(str(tmp_path / "manifest.json"), "t")
+
+    added = asyncio.run(_pipeline(store, manifest).run(entries))
+
+    assert added == len(store) > 0
+    for entry in entries:
+        key = IngestManifest.file_key(entry)
+        assert manifest.files[key]["status"] == STATUS_DONE
+        ids = manifest.chunk_ids(key)
+        assert ids and all(cid in store._id_to_row for cid in ids)
+        assert {store.metadatas[store._id_to_row[cid]]["source"] for cid in ids} == {entry["source"]}
+
+
+def test_pipeline_rerun_keeps_existing_chunks(tmp_path, entries):
+    store = LocalVectorStore(FakeEmbeddings(dim=16))
+    manifest = IngestManifest(str(tmp_path / "manifest.json"), "t")
+    asyncio.run(_pipeline(store, manifest).run(entries))
+    before = {key: manifest.chunk_ids(key) for key in manifest.files}
+
+    # 같은 파일을 다시 적재하면 청크 ID가 같으므로 새로 임베딩하지 않음
+    assert asyncio.run(_pipeline(store, manifest).run(entries)) == 0
+    assert {key: manifest.chunk_ids(key) for key in manifest.files} == before
+
+
+def test_pipeline_window_size_does_not_change_chunk_ids(tmp_path, entries):
+    results = []
+    for pages_per_task in (1, 16):
+        store = LocalVectorStore(FakeEmbeddings(dim=16))
+        manifest = IngestManifest(str(tmp_path / f"m{pages_per_task}.json"), "t")
+        asyncio.run(_pipeline(store, manifest, pages_per_task=pages_per_task).run(entries))
+        results.append({key: manifest.chunk_ids(key) for key in manifest.files})
+    assert results[0] == results[1]
+
+
+def test_pipeline_resumes_pending_file(tmp_path, entries):
+    store = LocalVectorStore(FakeEmbeddings(dim=16))
+    manifest = IngestManifest(str(tmp_path / "manifest.json"), "t")
+    # 이전 실행이 중단되어 일부 행만 남은 상태
+    store.add_texts(["stale"], metadatas=[{"source": "doc0.pdf"}], ids=["stale-id"])
+    manifest.mark_pending(entries[0], ["stale-id"])
+
+    asyncio.run(_pipeline(store, manifest).run(entries[:1]))
+
+    assert "stale-id" not in store._id_to_row
+    assert manifest.files[IngestManifest.file_key(entries[0])]["status"] == STATUS_DONE
+
+
+def test_pipeline_rewrites_manifest_once_per_file(tmp_path, entries, monkeypatch):
+    store = LocalVectorStore(FakeEmbeddings(dim=16))
+    manifest = IngestManifest(str(tmp_path / "manifest.json"), "t")
+    flushes = []
+    monkeypatch.setattr(manifest, "flush", lambda: flushes.append(1))
+
+    asyncio.run(_pipeline(store, manifest, pages_per_task=1).run(entries))
+
+    # 파일마다 pending 시작 + done 한 번씩 (페이지 구간의 새 ID는 저널에만 덧붙임)
+    assert len(flushes) == 2 * len(entries)
+    with open(manifest.journal_path, encoding="utf-8") as f:
+        journaled = [line for line in f]
+    assert len(journaled) == 5 * len(entries)
+
+
+def test_memory_budget_blocks_until_release():
+    async def scenario():
+        budget = MemoryBudget(100)
+        await budget.acquire(80)
+        waiter = asyncio.create_task(budget.acquire(50))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await budget.release(80)
+        await asyncio.wait_for(waiter, 1)
+        return budget
+
+    budget = asyncio.run(scenario())
+    assert budget.used == 50
+    assert budget.peak == 80
+
+
+def test_memory_budget_admits_oversized_batch_when_idle():
+    async def scenario():
+        budget = MemoryBudget(10)
+        await asyncio.wait_for(budget.acquire(50), 1)
+        return budget
+
+    assert asyncio.run(scenario()).used == 50
+
+
+def test_stage_stats_accumulates():
+    stats = StageStats("embed", "chunks")
+    assert stats.wall == 0.0
+    stats.record(10, 0.5)
+    stats.record(5, 0.25)
+    assert (stats.items, stats.units, stats.busy) == (2, 15, 0.75)
+    assert stats.wall >= 0.5
+    assert "embed" in stats.summary()
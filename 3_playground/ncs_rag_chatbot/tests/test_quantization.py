@@ -0,0 +1,84 @@
+from fakes import FakeEmbeddings
+from langchain_core.documents import Document
+from quantization import CompactVectorStore, VectorStorageConfig, truncate_embedding
+import asyncio
+import math
+import pytest
+
+
+class FakeInnerStore:
+    """인덱스 관리 메서드만 있는 내부 PGVectorStore 대역"""
+
+    def __init__(self):
+        self.embeddings = FakeEmbeddings(dim=8)
+        self.reindexed = []
+
+    async def ais_valid_index(self, index_name=None):
+        return True
+
+    async def areindex(self, index_name=None):
+        self.reindexed.append(index_name)
+
+    async def asimilarity_search(self, *args, **kwargs):
+        raise AssertionError("내부 저장소로 검색을 위임하면 안 됨")
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = CompactVectorStore(FakeInnerStore(), None, "t", VectorStorageConfig(dimensions=4, full_dimensions=8))
+    calls = []
+
+    async def compact_search(embedding, k=4, filter=None, **kwargs):
+        calls.append((len(embedding), k, filter))
+        return [(Document(page_content=f"doc{i}"), 0.1 * i) for i in range(k)]
+
+    monkeypatch.setattr(store, "asimilarity_search_with_score_by_vector", compact_search)
+    store.calls = calls
+    return store
+
+
+def test_truncate_embedding_renormalizes():
+    head = truncate_embedding([3.0, 4.0, 100.0], 2)
+    assert head == pytest.approx([0.6, 0.8])
+    assert truncate_embedding([0.0, 0.0, 1.0], 2) == [0.0, 0.0]
+
+
+def test_config_validates_and_reports_sizes():
+    with pytest.raises(ValueError):
+        VectorStorageConfig(quantization="pq")
+    with pytest.raises(ValueError):
+        VectorStorageConfig(dimensions=2000)
+    assert not VectorStorageConfig(dimensions=1536).compact
+
+    config = VectorStorageConfig(dimensions=256, quantization="binary")
+    assert config.rerank_column == "embedding_full" and config.operator == "<~>"
+    assert config.bytes_per_row() == {"index": 32, "table": 4 * 256 + 4 * 1536}
+
+
+def test_retriever_uses_compact_search(store):
+    retriever = store.as_retriever(search_kwargs={"k": 2, "filter": {"source": {"$eq": "a.pdf"}}})
+    docs = asyncio.run(retriever.ainvoke("질의"))
+    assert [d.page_content for d in docs] == ["doc0", "doc1"]
+    assert store.calls == [(8, 2, {"source": {"$eq": "a.pdf"}})]
+
+    threshold = store.as_retriever(search_type="similarity_score_threshold", search_kwargs={"k": 3, "score_threshold": 0.85})
+    assert [d.page_content for d in asyncio.run(threshold.ainvoke("질의"))] == ["doc0", "doc1"]
+
+
+def test_unsupported_searches_are_blocked(store):
+    with pytest.raises(NotImplementedError):
+        store.as_retriever().invoke("질의")
+    with pytest.raises(NotImplementedError):
+        asyncio.run(store.amax_marginal_relevance_search("질의"))
+    with pytest.raises(NotImplementedError):
+        store.similarity_search_with_score("질의")
+    with pytest.raises(AttributeError):
+        store.aapply_vector_index
+
+
+def test_index_management_is_delegated(store):
+    assert asyncio.run(store.ais_valid_index()) is True
+    asyncio.run(store.areindex("idx"))
+    assert store.vector_store.reindexed == ["idx"]
+    assert store.index_name.startswith("t")
+    assert math.isclose(store._select_relevance_score_fn()(0.25), 0.75)
@@ -0,0 +1,118 @@
+from admission import set_deadline
+from resilience import DEFAULT_POLICIES, Resilience, StagePolicy, StageTimeout, is_retryable
+import asyncio
+import pytest
+import time
+
+
+def _resilience(**kwargs):
+    params = dict(timeout=0.05, retries=1, backoff=0.001, max_backoff=0.001)
+    params.update(kwargs)
+    return Resilience("test", StagePolicy(**params))
+
+
+def _factory(*outcomes):
+    """호출마다 outcomes를 차례로 사용 (예외면 발생, 숫자면 그 시간만큼 걸린 뒤 "ok")"""
+    calls = []
+
+    async def call():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        await asyncio.sleep(outcome)
+        return "ok"
+
+    return call, calls
+
+
+def test_stage_timeout_is_not_retryable():
+    assert is_retryable(asyncio.TimeoutError()) and is_retryable(ConnectionError())
+    assert not is_retryable(StageTimeout("inner", 1.0))
+    assert not is_retryable(ValueError())
+
+    resilience = _resilience(retries=3)
+    factory, calls = _factory(StageTimeout("inner", 1.0), 0)
+    with pytest.raises(StageTimeout):
+        asyncio.run(resilience.call(factory))
+    assert len(calls) == 1 and resilience.counts["retry"] == 0
+
+
+def test_retries_transient_errors_and_timeouts_without_deadline():
+    resilience = _resilience()
+    factory, calls = _factory(ConnectionError(), 0)
+    assert asyncio.run(resilience.call(factory)) == "ok"
+
+    factory, calls = _factory(1.0, 0)
+    assert asyncio.run(resilience.call(factory)) == "ok"
+    assert len(calls) == 2
+    assert resilience.counts == {"timeout": 1, "retry": 2, "hedge": 0, "hedge_win": 0}
+
+
+async def _with_deadline(resilience, factory, seconds):
+    set_deadline(seconds)
+    return await resilience.call(factory)
+
+
+def test_timed_out_attempt_is_not_retried_without_a_full_attempt_left():
+    resilience = _resilience(timeout=0.1)
+    # 마감까지 0.15초: 첫 시도(0.1초)가 타임아웃되면 남은 시간이 단계 타임아웃보다 짧음
+    factory, calls = _factory(1.0, 0)
+    started = time.monotonic()
+    with pytest.raises(StageTimeout) as exc:
+        asyncio.run(_with_deadline(resilience, factory, 0.15))
+    assert len(calls) == 1 and resilience.counts["retry"] == 0
+    assert exc.value.timeout == 0.1
+    assert time.monotonic() - started < 0.15
+
+    # 연결 오류는 백오프 시간만 남아 있으면 재시도
+    factory, calls = _factory(ConnectionError(), 0)
+    assert asyncio.run(_with_deadline(resilience, factory, 0.15)) == "ok"
+    assert len(calls) == 2
+
+
+def test_attempt_is_cut_at_request_deadline():
+    resilience = _resilience(timeout=5.0, retries=2)
+    factory, calls = _factory(1.0, 0, 0)
+    with pytest.raises(StageTimeout) as exc:
+        asyncio.run(_with_deadline(resilience, factory, 0.05))
+    # 요청 마감으로 짧아진 시도는 요청 마감으로 보고하고 재시도하지 않음
+    assert exc.value.timeout is None and len(calls) == 1
+
+
+def test_hedge_returns_faster_duplicate():
+    resilience = _resilience(timeout=1.0, retries=0, hedge=True, hedge_min_samples=3, hedge_min_delay=0.01)
+    for _ in range(3):
+        resilience.latency.observe(0.01)
+    factory, calls = _factory(0.5, 0)
+    started = time.monotonic()
+    assert asyncio.run(resilience.call(factory)) == "ok"
+    assert time.monotonic() - started < 0.4
+    assert resilience.counts["hedge"] == 1 and resilience.counts["hedge_win"] == 1
+
+
+def test_stream_retries_only_before_first_chunk():
+    resilience = _resilience(timeout=0.05, retries=1)
+    attempts = []
+
+    async def stream():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError()
+        yield "a"
+        yield "b"
+        await asyncio.sleep(1.0)
+        yield "c"
+
+    async def consume(received):
+        async for chunk in resilience.astream(stream):
+            received.append(chunk)
+
+    received = []
+    with pytest.raises(StageTimeout):
+        asyncio.run(consume(received))
+    assert received == ["a", "b"] and len(attempts) == 2
+
+
+def test_llm_timeout_fits_request_deadline():
+    assert DEFAULT_POLICIES["llm"][0] <= 30.0
@@ -0,0 +1,75 @@
+from fakes import FakeEmbeddings
+from langchain_core.documents import Document
+from retrieval import HybridRetriever, extract_codes, extract_terms, reciprocal_rank_fusion, strip_particle
+from vector_store import VectorStoreManager
+import asyncio
+import pytest
+
+
+def _doc(doc_id):
+    return Document(id=doc_id, page_content=f"본문 {doc_id}")
+
+
+def test_extract_codes_and_terms():
+    query = "LM2001020101 능력단위의 평가 방법을 알려줘"
+    assert extract_codes(query) == ["LM2001020101"]
+    assert extract_codes("2001020101_16v4 와 2001020101_16v4") == ["2001020101_16v4"]
+    assert extract_codes("전화 01012345678x") == []
+
+    terms = extract_terms(query)
+    assert terms["LM2001020101"] == 3.0
+    assert terms["능력단위"] == 1.0 and terms["평가"] == 1.0
+    assert "알려줘" not in terms
+    assert len(extract_terms("가나 다라 마바 사아 자차 카타 파하 거너", max_terms=3)) == 3
+
+
+def test_strip_particle_keeps_short_words():
+    assert strip_particle("보안을") == "보안"
+    assert strip_particle("서버에서") == "서버"
+    # 떼어낸 나머지가 한 글자면 그대로
+    assert strip_particle("책을") == "책을"
+
+
+def test_reciprocal_rank_fusion():
+    dense = [_doc("a"), _doc("b"), _doc("c")]
+    lexical = [_doc("c"), _doc("d"), _doc("a")]
+    fused = reciprocal_rank_fusion([dense, lexical], k=3, rrf_k=60)
+    # a: 1/61 + 1/63, c: 1/63 + 1/61 (동점은 먼저 나온 순서), b: 1/62, d: 1/62
+    assert [d.id for d in fused] == ["a", "c", "b"]
+    assert reciprocal_rank_fusion([[], []], k=4) == []
+    # ID가 없으면 본문으로 같은 문서를 판단
+    fused = reciprocal_rank_fusion([[Document(page_content="x")], [Document(page_content="y"), Document(page_content="x")]], k=1)
+    assert fused[0].page_content == "x"
+
+
+@pytest.fixture
+def retriever():
+    embeddings = FakeEmbeddings(dim=16)
+    manager = asyncio.run(VectorStoreManager.create_local(embeddings))
+    manager.vector_store.add_texts(
+        ["LM2001020101 네트워크 보안 평가 기준", "네트워크 보안 장비 설정", "데이터베이스 백업", "보안 감사 절차"],
+        metadatas=[
+            {"main_category": "정보기술", "source": "LM2001020101.pdf"},
+            {"main_category": "정보기술", "source": "net.pdf"},
+            {"main_category": "정보기술", "source": "db.pdf"},
+            {"main_category": "경영", "source": "audit.pdf"},
+        ],
+        ids=["code", "net", "db", "audit"],
+    )
+    return HybridRetriever(manager), embeddings
+
+
+def test_code_query_returns_decisive_docs_without_embedding(retriever):
+    hybrid, embeddings = retriever
+    calls = embeddings.calls
+    docs = asyncio.run(hybrid.asearch("LM2001020101 평가 기준", k=2))
+    assert [d.id for d in docs] == ["code"]
+    assert embeddings.calls == calls
+
+
+def test_hybrid_search_fuses_dense_and_lexical(retriever):
+    hybrid, _ = retriever
+    docs = asyncio.run(hybrid.asearch("네트워크 보안", k=3))
+    assert {"code", "net"} <= {d.id for d in docs}
+    docs = asyncio.run(hybrid.asearch("보안", k=4, filter={"main_category": "경영"}))
+    assert [d.id for d in docs] == ["audit"]
@@ -0,0 +1,140 @@
+from fakes import FakeChatModel, FakeEmbeddings
+from local_store import LocalVectorStore
+from metrics import REQUEST_SECONDS
+import asyncio
+import httpx
+import json
+import pytest
+import server
+
+CORPUS = [
+    ("소프트웨어 테스트 계획 수립 절차", {"main_category": "정보기술관리", "sub_category": "IT테스트", "source": "test.pdf", "page": 1}),
+    ("테스트 케이스 설계 기법", {"main_category": "정보기술관리", "sub_category": "IT테스트", "source": "test.pdf", "page": 2}),
+    ("품질 보증 활동과 감사", {"main_category": "정보기술관리", "sub_category": "IT품질보증", "source": "qa.pdf", "page": 1}),
+    ("임베디드 시스템 요구사항 분석", {"main_category": "정보기술개발", "sub_category": "임베디드SW엔지니어링", "source": "emb.pdf", "page": 1}),
+]
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """가짜 임베딩/LLM과 로컬 벡터 저장소로 서버를 시작합니다."""
+    embeddings = FakeEmbeddings(dim=16)
+    snapshot = LocalVectorStore(embeddings)
+    snapshot.add_texts([text for text, _ in CORPUS], metadatas=[meta for _, meta in CORPUS])
+    snapshot.save(str(tmp_path / "local_index"))
+
+    class FakeEmbeddingModel:
+        def get_embeddings(self):
+            return embeddings
+
+    monkeypatch.setattr(server, "EmbeddingModel", FakeEmbeddingModel)
+    monkeypatch.setattr(server, "init_chat_model", lambda *a, **kw: FakeChatModel(output_tokens=5))
+    monkeypatch.setattr(server, "VECTOR_BACKEND", "local")
+    monkeypatch.setattr(server, "LOCAL_SNAPSHOT", str(tmp_path / "local_index"))
+    monkeypatch.setattr(server, "DB_WARMUP", False)
+    asyncio.run(server.startup())
+    return embeddings
+
+
+def request(method, path, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+
+    return asyncio.run(send())
+
+
+def test_chat_returns_answer_and_sources(app):
+    resp = request("POST", "/api/chat", json={"query": "테스트 계획", "main_category": "정보기술관리"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["answer"] and body["cached"] is False
+    assert body["filter"] == {"main_category": {"$eq": "정보기술관리"}}
+    assert {s["main_category"] for s in body["sources"]} == {"정보기술관리"}
+
+    # 같은 질의는 답변 캐시 적중
+    again = request("POST", "/api/chat", json={"query": "테스트 계획", "main_category": "정보기술관리"}).json()
+    assert again["cached"] is True and again["answer"] == body["answer"]
+
+
+def test_chat_rejects_conflicting_search_options(app):
+    resp = request("POST", "/api/chat", json={"query": "q", "ef_search": 40, "probes": 4})
+    assert resp.status_code == 400
+
+
+def test_batch_embeds_all_queries_at_once(app):
+    calls = app.calls
+    items = [{"query": f"질의 {i} 테스트"} for i in range(5)] + [{"query": "질의 0 테스트"}]
+    resp = request("POST", "/api/chat/batch", json={"items": items, "concurrency": 2})
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+
+    assert sorted(line["index"] for line in lines) == list(range(len(items)))
+    assert all(line["answer"] for line in lines)
+    # 중복 질의를 포함해 임베딩은 한 번만 요청
+    assert app.calls == calls + 1
+
+
+def test_batch_rejects_too_many_items(app, monkeypatch):
+    monkeypatch.setattr(server, "BATCH_MAX_ITEMS", 2)
+    resp = request("POST", "/api/chat/batch", json={"items": [{"query": "q"}] * 3})
+    assert resp.status_code == 400
+
+
+def _request_seconds(endpoint):
+    series = REQUEST_SECONDS._series.get((endpoint, "200"))
+    return (series[1], series[2]) if series else (0.0, 0)
+
+
+def test_stream_latency_is_recorded_when_stream_ends(app, monkeypatch):
+    monkeypatch.setattr(server, "llm", FakeChatModel(output_tokens=5, token_latency=0.03))
+    total, count = _request_seconds("/api/chat/stream")
+
+    resp = request("POST", "/api/chat/stream", json={"query": "품질 보증"})
+    events = [line[len("event: "):] for line in resp.text.splitlines() if line.startswith("event: ")]
+    assert events[0] == "sources" and events[-1] == "end" and events.count("token") == 5
+
+    new_total, new_count = _request_seconds("/api/chat/stream")
+    assert new_count == count + 1
+    # 헤더 전송 시점이 아니라 마지막 토큰까지의 시간
+    assert new_total - total >= 4 * 0.03
+
+
+def test_metrics_endpoint_renders_prometheus_text(app):
+    request("POST", "/api/chat", json={"query": "테스트 계획"})
+    text = request("GET", "/api/metrics").text
+    assert '# TYPE rag_request_seconds histogram' in text
+    assert 'rag_request_seconds_count{endpoint="/api/chat",status="200"}' in text
+    assert 'rag_stage_seconds_count{stage="llm"}' in text
+
+
+def test_empty_filter_skips_search_and_keeps_response_shape(app):
+    calls = app.calls
+    body = request("POST", "/api/chat", json={"query": "테스트 계획", "main_category": "없는분류"}).json()
+    assert body["empty"] is True and body["sources"] == [] and body["cached"] is False
+    # 일반 답변과 같은 필터 형태
+    assert body["filter"] == {"main_category": {"$eq": "없는분류"}}
+    assert app.calls == calls
+
+    resp = request("POST", "/api/chat/stream", json={"query": "테스트 계획", "main_category": "없는분류"})
+    lines = resp.text.splitlines()
+    sources = json.loads(lines[lines.index("event: sources") + 1][len("data: "):])
+    assert sources == {"sources": [], "filter": {"main_category": {"$eq": "없는분류"}}, "cached": False, "empty": True}
+
+
+def test_chat_without_filter_returns_none_filter(app):
+    body = request("POST", "/api/chat", json={"query": "품질 보증"}).json()
+    assert body["filter"] is None and "empty" not in body
+
+
+def test_categories_with_counts_returns_facet_tree(app):
+    tree = request("GET", "/api/categories", params={"counts": "true"}).json()
+    assert tree["정보기술관리"]["chunks"] == 3
+    assert tree["정보기술관리"]["sub_categories"]["IT테스트"]["sources"]["test.pdf"] == {"chunks": 2, "pages": 2}
+
+
+@pytest.mark.parametrize("options", [{"ef_search": 0}, {"ef_search": -5}, {"ef_search": 1001}, {"probes": 0}])
+def test_chat_rejects_invalid_search_options(app, options):
+    resp = request("POST", "/api/chat", json={"query": "q", **options})
+    assert resp.status_code == 422
@@ -0,0 +1,93 @@
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from splitter import DocumentSplitter, FastRecursiveSplitter
+import random
+import pytest
+
+SAMPLE = (
+    "제1장 소프트웨어 테스트\n\n테스트 계획은 범위, 일정, 자원을 정의한다. 테스트 케이스는 요구사항에서 도출한다.\n"
+    "결함은 추적 가능해야 한다.\n\n\n제2장 품질 보증\n\n품질 보증 활동은 프로세스와 산출물을 함께 점검한다.  "
+    "감사 결과는 문서화한다.\n" + "아주긴단어" * 40 + "\n\n  끝.  "
+)
+SEPARATORS = [None, [". ", " ", ""], ["\n\n", "\n", " "], ["\n\n", "\n"], ["다.", "\n", ""]]
+ALPHABET = ["a", "b", "가", "나", " ", "  ", "\n", "\n\n", "\n \n", ".", ". ", "ab", "다."]
+
+
+def _langchain(text, chunk_size, chunk_overlap, separators=None, length_function=len):
+    kwargs = {} if separators is None else {"separators": separators}
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=length_function, **kwargs
+    )
+    return splitter.split_text(text)
+
+
+def _fast(text, chunk_size, chunk_overlap, separators=None, length_function=len):
+    splitter = FastRecursiveSplitter(chunk_size, chunk_overlap, separators, length_function)
+    chunks = list(splitter.iter_chunks(text))
+    # start_index는 항상 실제 원문 위치
+    assert all(text[start:start + len(chunk)] == chunk for start, chunk in chunks)
+    return [chunk for _, chunk in chunks]
+
+
+@pytest.mark.parametrize("separators", SEPARATORS)
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(4, 0), (10, 3), (30, 10), (50, 50), (120, 20), (1000, 200)])
+def test_matches_langchain_on_fixed_text(chunk_size, chunk_overlap, separators):
+    expected = _langchain(SAMPLE, chunk_size, chunk_overlap, separators)
+    if separators is None or "" in separators:
+        assert _fast(SAMPLE, chunk_size, chunk_overlap, separators) == expected
+    else:
+        # 더 나눌 수 없는 긴 조각은 공백을 제거해서 내보냄 (아래 test_oversized_pieces_are_stripped 참고)
+        assert _fast(SAMPLE, chunk_size, chunk_overlap, separators) == [c.strip() for c in expected if c.strip()]
+
+
+def test_matches_langchain_on_random_texts():
+    rng = random.Random(1234)
+    for _ in range(3000):
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 80)))
+        chunk_size = rng.randint(4, 40)
+        chunk_overlap = rng.randint(0, chunk_size)
+        separators = rng.choice([None, [". ", " ", ""], ["ab", "\n", ""]])
+        length_function = rng.choice([len, lambda s: len(s.encode("utf-8"))])
+        args = (text, chunk_size, chunk_overlap, separators, length_function)
+        assert _fast(*args) == _langchain(*args), args
+
+
+def test_oversized_pieces_are_stripped():
+    """chunk_size 이상인데 더 나눌 구분자가 없는 조각은 LangChain과 달리 공백을 제거하고 빈 청크는 버림
+
+    기본 구분자("" 포함)에서는 chunk_size=1(한 글자 조각도 chunk_size 이상)일 때만 생깁니다.
+    이때 LangChain은 공백 한 글자도 청크로 내보내는데, 이 차이 외에는 결과가 같습니다.
+    """
+    rng = random.Random(99)
+    for _ in range(3000):
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 60)))
+        chunk_size = rng.randint(1, 20)
+        chunk_overlap = rng.randint(0, chunk_size)
+        separators = rng.choice([None, ["\n\n", "\n"], ["\n\n", "\n", " "]])
+        expected = _langchain(text, chunk_size, chunk_overlap, separators)
+        assert _fast(text, chunk_size, chunk_overlap, separators) == [c.strip() for c in expected if c.strip()]
+
+    assert _langchain("a b", 1, 0) == ["a", " ", "b"]
+    assert _fast("a b", 1, 0) == ["a", "b"]
+    # chunk_size가 2 이상이면 기본 구분자에서는 같음
+    for chunk_size in (2, 3):
+        for text in ("a b", " a  b ", "가\n\n나 다", "ab. cd\n"):
+            assert _fast(text, chunk_size, 1) == _langchain(text, chunk_size, 1)
+
+
+def test_overlap_larger_than_size_is_rejected():
+    with pytest.raises(ValueError):
+        FastRecursiveSplitter(chunk_size=10, chunk_overlap=11)
+
+
+def test_document_splitter_defaults_to_fast_and_matches_langchain_documents():
+    docs = [Document(page_content=SAMPLE, metadata={"source": "a.pdf", "page": 1})]
+    fast = DocumentSplitter(chunk_size=60, chunk_overlap=15)
+    slow = DocumentSplitter(chunk_size=60, chunk_overlap=15, fast=False)
+    assert isinstance(fast.text_splitter, FastRecursiveSplitter)
+
+    fast_docs = list(fast.lazy_split_documents(docs))
+    slow_docs = slow.split_documents(docs)
+    assert [d.page_content for d in fast_docs] == [d.page_content for d in slow_docs]
+    assert all(d.metadata["source"] == "a.pdf" and d.metadata["page"] == 1 for d in fast_docs)
+    assert all(SAMPLE[d.metadata["start_index"]:].startswith(d.page_content) for d in fast_docs)
@@ -0,0 +1,125 @@
+from fakes import FakeEmbeddings
+from local_store import LocalVectorStore
+from tool import ToolBuilder
+import asyncio
+import pytest
+import tool
+
+CATEGORIES = ["IT테스트", "IT품질보증", "임베디드SW엔지니어링"]
+
+
+@pytest.fixture
+def store():
+    store = LocalVectorStore(FakeEmbeddings(dim=16))
+    texts, metadatas = [], []
+    for i in range(30):
+        texts.append(f"테스트 계획 품질 문서 {i} " + " ".join(f"w{j}" for j in range(i % 7)))
+        metadatas.append({"sub_category": CATEGORIES[i % 3] if i != 29 else "희귀분류", "source": f"d{i}.pdf", "page": i})
+    store.add_texts(texts, metadatas=metadatas, ids=[f"id{i}" for i in range(30)])
+    store.embeddings.calls = 0
+    return store
+
+
+def _ids(docs):
+    return [doc.id for doc in docs]
+
+
+def _expected(store, query, k, filter_dict):
+    return _ids(store.similarity_search(query, k=k, filter=filter_dict or None))
+
+
+def test_prefetch_result_is_reused_for_filtered_call(store):
+    builder = ToolBuilder(store, speculative=True)
+    query, filter_dict = "테스트 계획", {"sub_category": {"$eq": "IT테스트"}}
+
+    async def scenario():
+        builder.prefetch(query)
+        builder.prefetch(query)
+        return await builder._amemo_search("  테스트   계획 ", 2, filter_dict)
+
+    docs = asyncio.run(scenario())
+    # 추측 검색 한 번만 임베딩
+    assert store.embeddings.calls == 1
+    assert _ids(docs) == _expected(store, query, 2, filter_dict)
+    assert not builder._prefetched
+
+
+def test_prefetch_miss_falls_back_to_filtered_search(store):
+    builder = ToolBuilder(store, speculative=True)
+    query, filter_dict = "테스트 계획", {"sub_category": {"$eq": "희귀분류"}}
+
+    async def scenario():
+        builder.prefetch(query)
+        await asyncio.sleep(0)
+        return await builder._amemo_search(query, 2, filter_dict)
+
+    docs = asyncio.run(scenario())
+    # 상위 PREFETCH_K개에 필터에 맞는 문서가 k개 미만이므로 다시 검색
+    assert store.embeddings.calls == 2
+    assert _ids(docs) == _expected(store, query, 2, filter_dict) == ["id29"]
+
+
+def test_discard_cancels_unused_prefetch(store):
+    builder = ToolBuilder(store, speculative=True)
+
+    async def scenario():
+        builder.prefetch("q")
+        builder.discard("Q ")
+        builder.discard("q")
+
+    asyncio.run(scenario())
+    assert not builder._prefetched
+
+    plain = ToolBuilder(store)
+    plain.prefetch("q")
+    assert not plain._prefetched
+
+
+def test_session_memo_is_bounded_and_clearable(store, monkeypatch):
+    monkeypatch.setattr(tool, "SESSION_CACHE_SIZE", 2)
+    builder = ToolBuilder(store)
+
+    async def search(query):
+        return await builder._amemo_search(query, 2, {})
+
+    first = asyncio.run(search("테스트 계획"))
+    assert _ids(asyncio.run(search("테스트  계획"))) == _ids(first)
+    assert store.embeddings.calls == 1
+
+    asyncio.run(search("품질"))
+    asyncio.run(search("문서"))
+    assert len(builder._memo) == 2
+    asyncio.run(search("테스트 계획"))
+    assert store.embeddings.calls == 4
+
+    builder.clear_session()
+    assert not builder._memo
+
+
+def test_multi_search_embeds_once_and_dedups_requests(store):
+    builder = ToolBuilder(store, multi_query=True)
+    requests = [
+        ("테스트 계획", {}),
+        ("품질 문서", {"sub_category": {"$eq": "IT품질보증"}}),
+        ("테스트  계획", {}),
+    ]
+    asyncio.run(builder._amemo_search("품질 문서", 2, requests[1][1]))
+    store.embeddings.calls = 0
+
+    results = asyncio.run(builder.amulti_search(requests, k=2))
+    # 메모에 없는 질의 하나만 한 번의 배치로 임베딩
+    assert store.embeddings.calls == 1
+    assert [_ids(docs) for docs in results] == [
+        _expected(store, query, 2, filter_dict) for query, filter_dict in requests
+    ]
+
+
+def test_multi_tool_marks_repeated_documents(store):
+    tools = ToolBuilder(store, multi_query=True).build_tools()
+    assert [t.name for t in tools] == ["retrieve_context", "retrieve_context_multi"]
+
+    content = asyncio.run(tools[1].ainvoke({"requests": [
+        {"query": "테스트 계획"}, {"query": "테스트 계획 "}, {"query": "문서", "sub_category": "없는분류"},
+    ]}))
+    assert "[2] 테스트 계획\nSame documents as an earlier request." in content
+    assert "(filter: {'sub_category': {'$eq': '없는분류'}})\nNo documents found" in content
@@ -0,0 +1,108 @@
+from fakes import FakeEmbeddings
+from langchain_postgres.v2.indexes import HNSWQueryOptions, IVFFlatQueryOptions
+from partitions import ExactScanQueryOptions, PartitionPlanner
+from quantization import CompactVectorStore, VectorStorageConfig
+from vector_store import VectorStoreManager, snap_to_step
+import asyncio
+import pytest
+import vector_store
+
+COUNTS = {("정보기술관리", "IT테스트"): 500, ("정보기술개발", "응용SW엔지니어링"): 40000}
+
+
+class FakeInnerStore:
+    def __init__(self):
+        self.embeddings = FakeEmbeddings(dim=8)
+
+
+@pytest.fixture
+def created(monkeypatch):
+    """PGVectorStore.create 대신 검색 옵션만 기록 (DB 없이 저장소 선택 확인)"""
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs["index_query_options"])
+        return object()
+
+    monkeypatch.setattr(vector_store.PGVectorStore, "create", create)
+    return calls
+
+
+def _manager(inner=None):
+    manager = VectorStoreManager(object(), inner or FakeInnerStore(), table_name="t", embedding_model=FakeEmbeddings(dim=8))
+    manager.planner = PartitionPlanner(exact_max_rows=1000, check_interval=0)
+
+    async def generation():
+        return 1
+
+    async def load_stats():
+        return dict(COUNTS), "main_category"
+
+    manager.aget_generation = generation
+    manager._aload_plan_stats = load_stats
+    return manager
+
+
+def test_snap_to_step():
+    steps = (40, 80, 160)
+    assert [snap_to_step(v, steps) for v in (None, 1, 40, 41, 160, 5000)] == [None, 40, 40, 80, 160, 160]
+    with pytest.raises(ValueError):
+        snap_to_step(0, steps)
+
+
+def test_option_stores_are_snapped_and_memoized(created):
+    manager = _manager()
+    assert asyncio.run(manager.aget_vector_store()) is manager.vector_store
+
+    async def scenario():
+        stores = [await manager.aget_vector_store(ef_search=v) for v in (41, 60, 80, 5000)]
+        stores.append(await manager.aget_vector_store(probes=3))
+        return stores
+
+    stores = asyncio.run(scenario())
+    # 41, 60, 80은 모두 80 단계의 저장소 하나로, 범위를 넘는 값은 마지막 단계로
+    assert stores[0] is stores[1] is stores[2] and stores[3] is not stores[0]
+    assert set(manager._option_stores) == {(80, None), (1000, None), (None, 4)}
+    assert [type(o) for o in created] == [HNSWQueryOptions, HNSWQueryOptions, IVFFlatQueryOptions]
+    assert [getattr(o, "ef_search", None) for o in created[:2]] == [80, 1000]
+
+    with pytest.raises(ValueError):
+        asyncio.run(manager.aget_vector_store(ef_search=100, probes=4))
+
+
+def test_compact_store_options_are_snapped(created):
+    inner = CompactVectorStore(FakeInnerStore(), None, "t", VectorStorageConfig(dimensions=4, full_dimensions=8))
+    manager = _manager(inner)
+    store = asyncio.run(manager.aget_vector_store(ef_search=100))
+    assert store.ef_search == 160 and store is asyncio.run(manager.aget_vector_store(ef_search=150))
+    assert created == []
+
+
+def test_plan_search_selects_store(created):
+    manager = _manager()
+
+    async def scenario():
+        results = [
+            await manager.aplan_search(None, k=4),
+            await manager.aplan_search({"sub_category": {"$eq": "IT테스트"}}, k=4),
+            await manager.aplan_search({"main_category": {"$eq": "정보기술개발"}}, k=4),
+            await manager.aplan_search({"sub_category": {"$eq": "IT테스트"}}, k=4),
+            await manager.aplan_search({"sub_category": {"$eq": "IT테스트"}}, k=4, ef_search=100),
+        ]
+        return results
+
+    (default, _, p0), (exact, exact_filter, p1), (ann, _, p2), (again, _, _), (direct, direct_filter, p4) = asyncio.run(scenario())
+    assert p0.mode == "default" and default is manager.vector_store
+    assert p1.mode == "exact" and exact_filter["main_category"] == {"$in": ["정보기술관리"]}
+    assert p2.mode == "ann" and ann is not exact and again is exact
+    # 옵션을 직접 지정하면 계획 없이 옵션 저장소와 원래 필터를 사용
+    assert p4.mode == "default" and direct is manager._option_stores[(160, None)]
+    assert direct_filter == {"sub_category": {"$eq": "IT테스트"}}
+    assert isinstance(created[0], ExactScanQueryOptions) and len(created) == 3
+
+
+def test_local_backend_ignores_options():
+    manager = asyncio.run(VectorStoreManager.create_local(FakeEmbeddings(dim=8)))
+    assert asyncio.run(manager.aget_vector_store(ef_search=100)) is manager.vector_store
+    store, filt, plan = asyncio.run(manager.aplan_search({"source": "a.pdf"}, ef_search=100))
+    assert store is manager.vector_store and plan.mode == "default"